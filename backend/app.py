@@ -1,15 +1,150 @@
 #!/usr/bin/env python3
 
-from flask import request, session
+import csv
+import io
+from flask import request
 from flask_restful import Resource
 from sqlalchemy.exc import IntegrityError
-from flask import request, jsonify
 from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity,  get_jwt
-from datetime import datetime, time
+from sqlalchemy import func, or_, select
+from datetime import date, datetime, time, timedelta, timezone
 
 
-from config import app, db, api, jwt, jwt_blacklist
-from models import User, Cuisine, Outlet, MenuItem, Table, Order, OrderItem, Reservation
+from config import app, db, api
+from caching import cached, conditional, response_cache
+from compression import compressed_cache
+from fieldsets import Fieldset, relationship_paths, USER, CUISINE, OUTLET, MENU_ITEM, ORDER, ORDER_ITEM, TABLE, RESERVATION
+from passwords import PasswordHasherBusy
+from pagination import ID_ORDER, MAX_PAGE_LIMIT, after_cursor, order_by, page_args, page_of
+from pool_metrics import MeteredQueuePool
+from request_args import int_arg
+from models import User, Cuisine, Outlet, MenuItem, Table, Order, OrderItem, Reservation, ReservationSlot, DailySales, DailyOutletOrders, HourlySales, KitchenTicket
+from menu_import import FORMATS as MENU_IMPORT_FORMATS, import_menu_items, read_rows
+from rollups import sales_hour
+from kitchen import enqueue_order, kitchen_queues, order_outlets
+from order_events import order_events
+from recommendations import recommendations
+from search import KINDS as SEARCH_KINDS, fuzzy_index, search
+import sqlite_checkpoint  # noqa: F401 (starts the WAL checkpoint thread, adds its CLI command)
+from token_blocklist import token_blocklist
+from serializers import serialize_kitchen_ticket, serialize_menu_item, serialize_order_row, serialize_order_item
+
+# Fields and relationships each resource returns, narrowed per request with
+# ?fields= and ?include= (see fieldsets.py). The defaults are the responses
+# from before those parameters existed, and their eager loads run a fixed
+# number of queries per list instead of one lazy load per row. Cached
+# resources depend on the tables of the includes each request asks for.
+USER_FIELDS = Fieldset(USER)
+CUISINE_FIELDS = Fieldset(CUISINE)
+OUTLET_LIST_FIELDS = Fieldset(OUTLET, default=('cuisine',), allowed=('cuisine',))
+OUTLET_FIELDS = Fieldset(OUTLET, allowed=('cuisine',))
+MENU_ITEM_LIST_FIELDS = Fieldset(MENU_ITEM, default=relationship_paths(MENU_ITEM))
+MENU_ITEM_FIELDS = Fieldset(MENU_ITEM)
+ORDER_LIST_FIELDS = Fieldset(ORDER, default=relationship_paths(ORDER))
+ORDER_FIELDS = Fieldset(ORDER)
+ORDER_ITEM_FIELDS = Fieldset(ORDER_ITEM)
+TABLE_FIELDS = Fieldset(TABLE)
+RESERVATION_LIST_FIELDS = Fieldset(RESERVATION, default=('user', 'table'))
+RESERVATION_FIELDS = Fieldset(RESERVATION)
+
+MICROSECOND = timedelta(microseconds=1)
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+def parse_sort(allowed):
+    # ?sort=-created_at,id: keys from allowed, "-" for descending. The id is
+    # always the last key, so the order (and the cursor) is total.
+    keys = []
+    for part in filter(None, (part.strip() for part in request.args.get('sort', '').split(','))):
+        name = part.lstrip('-')
+        if name not in allowed:
+            raise ValueError(f"Can't sort by {name}; use {', '.join(allowed)}.")
+        keys.append((name, part.startswith('-')))
+        if name == 'id':
+            break
+    if not keys or keys[-1][0] != 'id':
+        keys.append(('id', keys[-1][1] if keys else False))
+    return tuple(keys)
+
+
+def paginate(query, model, serialize, sort=ID_ORDER):
+    # Keyset pagination; see pagination.py.
+    try:
+        limit, after = page_args()
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if after is not None:
+        if len(sort) > 1 and db.session.get(model, after) is None:
+            return {"error": "The after cursor refers to a row that no longer exists; start from the first page."}, 400
+        query = query.filter(after_cursor(model, sort, after))
+    rows = query.order_by(*order_by(model, sort)).limit(limit + 1).all()
+    return page_of(rows, limit, serialize)
+
+
+def list_arg(name):
+    return [part.strip() for part in request.args.get(name, '').split(',') if part.strip()]
+
+
+def date_arg(name):
+    value = request.args.get(name)
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD).")
+
+
+def datetime_range(start_name, end_name):
+    # Inclusive ISO dates or datetimes; a bare end date covers that whole day.
+    # Returned as a half-open [start, stop) range in naive UTC, which is how
+    # created_at is stored; offsets are converted, not dropped.
+    bounds = []
+    for name in (start_name, end_name):
+        value = request.args.get(name)
+        try:
+            bound = datetime.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO date or datetime.")
+        if bound is not None and name == end_name:
+            bound += timedelta(days=1) if len(value) == 10 else MICROSECOND
+        if bound is not None and bound.tzinfo is not None:
+            bound = bound.astimezone(timezone.utc).replace(tzinfo=None)
+        bounds.append(bound)
+    return tuple(bounds)
+
+
+def booking_duration(value, booking_time):
+    # Minutes from booking_time. Bookings stay within their day, so the
+    # duration has to end by midnight rather than be cut off there.
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        value = None
+    try:
+        duration = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("duration must be a whole number of minutes.")
+    started = booking_time.hour * 3600 + booking_time.minute * 60 + booking_time.second
+    longest = (24 * 3600 - started) // 60
+    if not 0 < duration <= longest:
+        raise ValueError(f"duration must be between 1 and {longest} minutes, so the booking ends by midnight.")
+    return duration
+
+
+def filter_datetime_range(query, column, start, stop):
+    # Compared one microsecond inside the bounds: SQLite stores server
+    # timestamps without fractional seconds, and as text "12:00:00" sorts
+    # before the bound value "12:00:00.000000".
+    if start is not None:
+        query = query.filter(column > start - MICROSECOND)
+    if stop is not None:
+        query = query.filter(column <= stop - MICROSECOND)
+    return query
+
+
+def outlet_order_ids(outlet_id):
+    return (
+        select(OrderItem.order_id)
+        .join(MenuItem, OrderItem.menuitem_id == MenuItem.id)
+        .where(MenuItem.outlet_id == outlet_id)
+    )
 
 @app.route('/')
 def home():
@@ -18,6 +153,19 @@ def home():
 @app.route('/health')
 def health():
     return {"status": "healthy", "message": "Backend is running"}
+
+@app.route('/metrics')
+def metrics():
+    pool = db.engine.pool
+    return {
+        "response_cache": response_cache.stats(),
+        "compressed_cache": compressed_cache.stats(),
+        "db_pool": pool.stats() if isinstance(pool, MeteredQueuePool) else {"class": type(pool).__name__},
+        "order_stream": order_events.stats(),
+        "search_fuzzy_index": fuzzy_index.stats(),
+        "recommendations": recommendations.stats(),
+        "kitchen_queues": kitchen_queues.stats(),
+    }
      
 # ------------------ AUTH ------------------ #
 class Register(Resource):
@@ -37,12 +185,21 @@ class Register(Resource):
         except IntegrityError:
             db.session.rollback()
             return {"message": "User already exists"}, 400
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return {"message": "Too many sign-ups right now, please retry"}, 503, {'Retry-After': '1'}
 
 class Login(Resource):
     def post(self):
         data = request.get_json()
         user = User.query.filter_by(email=data['email']).first()
-        if user and user.authenticate(data['password']):
+        try:
+            authenticated = user is not None and user.authenticate(data['password'])
+        except PasswordHasherBusy:
+            return {"message": "Too many logins right now, please retry"}, 503, {'Retry-After': '1'}
+        if authenticated:
+            if db.session.is_modified(user):
+                db.session.commit()  # hash upgraded to the current cost
             access_token = create_access_token(identity={'id': user.id, 'role': user.role})
             return {"access_token": access_token, "user": user.to_dict(rules=('-orders', '-reservations', '-outlets'))}, 200
         return {"message": "Invalid credentials"}, 401
@@ -50,8 +207,8 @@ class Login(Resource):
 class Logout(Resource):
     @jwt_required()
     def post(self):
-        jti = get_jwt()["jti"] 
-        jwt_blacklist.add(jti)
+        token = get_jwt()
+        token_blocklist.revoke(token["jti"], token.get("exp"))
         return {"message": "Successfully logged out"}, 200
 
 class CheckAuth(Resource):
@@ -64,13 +221,21 @@ class CheckAuth(Resource):
 class UserLists(Resource):
     @jwt_required()
     def get(self):
-        return [user.to_dict(rules=('-orders', '-reservations', '-outlets')) for user in User.query.all()]
+        try:
+            serialize, options = USER_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginate(User.query.options(*options), User, serialize)
 
 class UserDetails(Resource):
     @jwt_required()
     def get(self, id):
-        user = User.query.get(id)
-        return user.to_dict(rules=('-orders', '-reservations', '-outlets'))
+        try:
+            serialize, options = USER_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        user = db.session.get(User, id, options=options)
+        return serialize(user)
 
     @jwt_required()
     def patch(self, id):
@@ -99,8 +264,14 @@ class UserDetails(Resource):
 
 # ------------------ CUISINES ------------------ #
 class CuisineList(Resource):
+    @conditional(CUISINE_FIELDS)
+    @cached(CUISINE_FIELDS)
     def get(self):
-        return [cuisine.to_dict(rules=('-outlets',)) for cuisine in Cuisine.query.all()]
+        try:
+            serialize, options = CUISINE_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginate(Cuisine.query.options(*options), Cuisine, serialize)
     
     def post(self):
         data = request.get_json()
@@ -111,7 +282,11 @@ class CuisineList(Resource):
     
 class CuisineDetails(Resource):
     def get(self, id):
-        return Cuisine.query.get(id).to_dict(rules=('-outlets',))
+        try:
+            serialize, options = CUISINE_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return serialize(db.session.get(Cuisine, id, options=options))
 
     def patch(self, id):
         data = request.get_json()
@@ -133,9 +308,18 @@ class CuisineDetails(Resource):
 
 # ------------------ OUTLETS ------------------ #
 class OutletLists(Resource):
+    @conditional(OUTLET_LIST_FIELDS)
+    @cached(OUTLET_LIST_FIELDS)
     def get(self):
-        outlets = Outlet.query.all()
-        return [outlet.to_dict(rules=( '-menu_items', '-owner',)) for outlet in outlets]   
+        try:
+            serialize, options = OUTLET_LIST_FIELDS.from_request()
+            owner_id = int_arg('owner_id')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        query = Outlet.query.options(*options)
+        if owner_id is not None:
+            query = query.filter_by(owner_id=owner_id)
+        return paginate(query, Outlet, serialize)
 
     def post(self):
        data = request.get_json()
@@ -156,11 +340,16 @@ class OutletLists(Resource):
            return {"message": "Outlet already exists or invalid data"}, 400
 
 class OutletDetails(Resource):
+    @conditional(OUTLET_FIELDS)
     def get(self, id):
-        outlet = Outlet.query.get(id)
+        try:
+            serialize, options = OUTLET_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        outlet = db.session.get(Outlet, id, options=options)
         if not outlet:
             return {"error": "Outlet not found."}, 404
-        return outlet.to_dict(rules=('-cuisine', '-menu_items', '-owner'))
+        return serialize(outlet)
 
     def patch(self, id):
        outlet = Outlet.query.get(id)
@@ -190,15 +379,107 @@ class OutletDetails(Resource):
        db.session.commit()
        return {"message": "Outlet deleted successfully"}
 
+class OutletAnalytics(Resource):
+    TOP_ITEMS_LIMIT = 5
+
+    def get(self, id):
+        if not db.session.get(Outlet, id):
+            return {"error": "Outlet not found."}, 404
+        try:
+            start = request.args.get('from')
+            end = request.args.get('to')
+            start = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+            end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+        except ValueError:
+            return {"error": "Dates must be in YYYY-MM-DD format."}, 400
+
+        # Sales figures come from the daily rollups, so the cost grows with the
+        # number of days in range rather than the order history.
+        sales = DailySales.query.filter(DailySales.outlet_id == id)
+        outlet_orders = DailyOutletOrders.query.filter(DailyOutletOrders.outlet_id == id)
+        if start:
+            sales = sales.filter(DailySales.day >= start)
+            outlet_orders = outlet_orders.filter(DailyOutletOrders.day >= start)
+        if end:
+            sales = sales.filter(DailySales.day <= end)
+            outlet_orders = outlet_orders.filter(DailyOutletOrders.day <= end)
+
+        orders_by_status = {
+            status: int(count)
+            for status, count in outlet_orders.with_entities(
+                DailyOutletOrders.status, func.sum(DailyOutletOrders.order_count)
+            ).group_by(DailyOutletOrders.status).all()
+            if count
+        }
+
+        orders_per_day = dict(
+            outlet_orders.with_entities(DailyOutletOrders.day, func.sum(DailyOutletOrders.order_count))
+            .group_by(DailyOutletOrders.day).all()
+        )
+        daily = [
+            {"date": day.isoformat(), "order_count": int(orders_per_day.get(day) or 0), "revenue": float(day_revenue or 0)}
+            for day, day_revenue in sales.with_entities(DailySales.day, func.sum(DailySales.revenue))
+            .group_by(DailySales.day).order_by(DailySales.day).all()
+        ]
+
+        quantity = func.sum(DailySales.quantity)
+        top_items = [
+            {"menuitem_id": item_id, "name": name, "quantity": int(qty or 0), "revenue": float(item_revenue or 0)}
+            for item_id, name, qty, item_revenue in sales.join(MenuItem, DailySales.menuitem_id == MenuItem.id)
+            .with_entities(MenuItem.id, MenuItem.name, quantity, func.sum(DailySales.revenue))
+            .group_by(MenuItem.id, MenuItem.name).having(quantity > 0)
+            .order_by(quantity.desc()).limit(self.TOP_ITEMS_LIMIT).all()
+        ]
+
+        # Reservations belong to an outlet through the order they were made with.
+        reservation_orders = (
+            db.session.query(OrderItem.order_id)
+            .join(MenuItem, OrderItem.menuitem_id == MenuItem.id)
+            .filter(MenuItem.outlet_id == id)
+            .scalar_subquery()
+        )
+        reservations = db.session.query(Reservation).filter(Reservation.order_id.in_(reservation_orders))
+        if start:
+            reservations = reservations.filter(Reservation.booking_date >= start)
+        if end:
+            reservations = reservations.filter(Reservation.booking_date <= end)
+        party_sizes = [
+            {"no_of_people": size, "count": count}
+            for size, count in reservations.with_entities(Reservation.no_of_people, func.count(Reservation.id))
+            .group_by(Reservation.no_of_people).order_by(Reservation.no_of_people).all()
+        ]
+
+        return {
+            "outlet_id": id,
+            "from": start.isoformat() if start else None,
+            "to": end.isoformat() if end else None,
+            "revenue": float(sum(row["revenue"] for row in daily)),
+            "order_count": sum(orders_by_status.values()),
+            "orders_by_status": orders_by_status,
+            "daily": daily,
+            "top_items": top_items,
+            "reservation_count": sum(row["count"] for row in party_sizes),
+            "party_sizes": party_sizes,
+        }
+
 # ------------------ MENU ITEMS ------------------ #
 class MenuItemLists(Resource):
+    # By default menu items embed their outlet's owner, including the owner's
+    # own orders and reservations, so every order invalidates that response.
+    # ?include=outlet (what the frontend asks for) depends on menu items and
+    # outlets alone.
+    @conditional(MENU_ITEM_LIST_FIELDS)
+    @cached(MENU_ITEM_LIST_FIELDS)
     def get(self):
-        outlet_id = request.args.get('outlet_id')
-        if outlet_id:
-            items = MenuItem.query.filter_by(outlet_id=outlet_id).all()
-        else:
-            items = MenuItem.query.all()
-        return [item.to_dict(rules=( '-order_items',)) for item in items]
+        try:
+            serialize, options = MENU_ITEM_LIST_FIELDS.from_request()
+            outlet_id = int_arg('outlet_id')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        query = MenuItem.query.options(*options)
+        if outlet_id is not None:
+            query = query.filter_by(outlet_id=outlet_id)
+        return paginate(query, MenuItem, serialize)
 
     def post(self):
         data = request.get_json()
@@ -219,10 +500,14 @@ class MenuItemLists(Resource):
 
 class MenuItemDetails(Resource):
     def get(self, id):
-        item = MenuItem.query.get(id)
+        try:
+            serialize, options = MENU_ITEM_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        item = db.session.get(MenuItem, id, options=options)
         if not item:
             return {"error": "Menu item not found."}, 404
-        return item.to_dict(rules=('-outlet', '-order_items',))
+        return serialize(item)
     
     def patch(self, id):
         item = MenuItem.query.get(id)
@@ -239,7 +524,11 @@ class MenuItemDetails(Resource):
             item.category = data['category']
         if 'outlet_id' in data:
             item.outlet_id = data['outlet_id']
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return {"message": "Menu item already exists or invalid data"}, 400
         return item.to_dict(rules=('-outlet', '-order_items',))
     
     def delete(self, id):
@@ -250,17 +539,151 @@ class MenuItemDetails(Resource):
         db.session.commit()
         return {"message": "Menu item deleted successfully"}
 
+class MenuItemImport(Resource):
+    def post(self, id):
+        if not db.session.get(Outlet, id):
+            return {"error": "Outlet not found."}, 404
+        fmt = request.args.get('format') or ('ndjson' if 'json' in (request.mimetype or '') else 'csv')
+        if fmt not in MENU_IMPORT_FORMATS:
+            return {"error": f"Unsupported format: {fmt}"}, 400
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+        try:
+            result = import_menu_items(id, read_rows(stream, fmt), fmt)
+            db.session.commit()
+            return result, 200
+        except (IntegrityError, UnicodeDecodeError, csv.Error):
+            db.session.rollback()
+            return {"message": "Menu import failed"}, 400
+
+class MenuItemRecommendations(Resource):
+    DEFAULT_LIMIT = 5
+
+    def get(self, id):
+        if not db.session.get(MenuItem, id):
+            return {"error": "Menu item not found."}, 404
+        try:
+            limit = int_arg('limit')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), recommendations.k)
+        recommendations.ensure_built()
+        # Over-fetch a little so deleted menu items can be skipped.
+        ranked = recommendations.lookup(id, recommendations.k)
+        menu_items = {
+            item.id: item for item in
+            MenuItem.query.filter(MenuItem.id.in_([other for other, _ in ranked]))
+        }
+        return {
+            "menu_item_id": id,
+            "items": [
+                {"menu_item": serialize_menu_item(menu_items[other]), "orders": orders}
+                for other, orders in ranked if other in menu_items
+            ][:limit],
+        }
+
+class PopularMenuItems(Resource):
+    # Ranked from the hourly sales rollups, so a window costs at most one row
+    # per item and hour in it, whatever the order volume. A window covers the
+    # current hour and the ones before it; cached pages can trail an hour
+    # boundary by up to RESPONSE_CACHE_TTL.
+    WINDOWS = {'24h': timedelta(hours=24), '7d': timedelta(days=7), '30d': timedelta(days=30)}
+    GROUPS = {'outlet': HourlySales.outlet_id, 'cuisine': Outlet.cuisine_id}
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    @cached('hourly_sales', 'menu_items', 'outlets')
+    def get(self):
+        window = request.args.get('window', '7d')
+        if window not in self.WINDOWS:
+            return {"error": f"window must be one of {', '.join(self.WINDOWS)}."}, 400
+        by = request.args.get('by')
+        if by is not None and by not in self.GROUPS:
+            return {"error": f"by must be one of {', '.join(self.GROUPS)}."}, 400
+        try:
+            outlet_id, cuisine_id, limit = int_arg('outlet_id'), int_arg('cuisine_id'), int_arg('limit')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), self.MAX_LIMIT)
+        since = sales_hour(datetime.now(timezone.utc)) - self.WINDOWS[window] + timedelta(hours=1)
+
+        group = self.GROUPS[by] if by else None
+        quantity = func.sum(HourlySales.quantity)
+        order_count = func.sum(HourlySales.order_count)
+        # Deleted menu items drop out with the join.
+        query = (
+            db.session.query(HourlySales.menuitem_id)
+            .join(MenuItem, HourlySales.menuitem_id == MenuItem.id)
+            .filter(HourlySales.hour >= since)
+        )
+        if by == 'cuisine' or cuisine_id is not None:
+            query = query.join(Outlet, HourlySales.outlet_id == Outlet.id)
+        if cuisine_id is not None:
+            query = query.filter(Outlet.cuisine_id == cuisine_id)
+        if outlet_id is not None:
+            query = query.filter(HourlySales.outlet_id == outlet_id)
+        ranked = (
+            query.add_columns(
+                (group if group is not None else db.null()).label('group_id'),
+                quantity.label('quantity'),
+                order_count.label('order_count'),
+                func.row_number().over(
+                    partition_by=group,
+                    order_by=(quantity.desc(), order_count.desc(), HourlySales.menuitem_id),
+                ).label('rank'),
+            )
+            .group_by(HourlySales.menuitem_id, *((group,) if group is not None else ()))
+            .having(quantity > 0)
+            .subquery()
+        )
+        rows = (
+            db.session.query(ranked)
+            .filter(ranked.c.rank <= limit)
+            .order_by(ranked.c.group_id, ranked.c.rank)
+            .all()
+        )
+        menu_items = {
+            item.id: item for item in
+            MenuItem.query.filter(MenuItem.id.in_({row.menuitem_id for row in rows}))
+        }
+
+        def entry(row):
+            return {
+                "menu_item": serialize_menu_item(menu_items[row.menuitem_id]),
+                "quantity": int(row.quantity),
+                "order_count": int(row.order_count),
+            }
+
+        result = {"window": window, "since": since.isoformat()}
+        if not by:
+            result["items"] = [entry(row) for row in rows]
+            return result
+        groups = {}
+        for row in rows:
+            groups.setdefault(row.group_id, []).append(entry(row))
+        result["groups"] = [{f"{by}_id": group_id, "items": items} for group_id, items in groups.items()]
+        return result
+
 # ------------------ ORDERS ------------------ #
 class OrderLists(Resource):
+    SORTS = ('id', 'created_at', 'total_price')
+
     def get(self):
-        orders = Order.query.all()
-        return [
-            {
-                **order.to_dict(rules=('-reservation', '-user')),  
-                "user": order.user_summary                         
-            }
-            for order in orders
-        ]
+        try:
+            serialize, options = ORDER_LIST_FIELDS.from_request()
+            sort = parse_sort(self.SORTS)
+            outlet_id, user_id, statuses = int_arg('outlet_id'), int_arg('user_id'), list_arg('status')
+            start, stop = datetime_range('created_from', 'created_to')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        query = Order.query.options(*options)
+        if outlet_id is not None:
+            query = query.filter(Order.id.in_(outlet_order_ids(outlet_id)))
+        if user_id is not None:
+            query = query.filter(Order.user_id == user_id)
+        if statuses:
+            query = query.filter(Order.status.in_(statuses))
+        query = filter_datetime_range(query, Order.created_at, start, stop)
+        return paginate(query, Order, serialize, sort)
 
 
     def post(self):
@@ -280,10 +703,14 @@ class OrderLists(Resource):
 
 class OrderDetails(Resource):
     def get(self, id):
-        order = Order.query.get(id)
+        try:
+            serialize, options = ORDER_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        order = db.session.get(Order, id, options=options)
         if not order:
             return {"error": "Order not found."}, 404
-        return order.to_dict(rules=('-reservation', '-order_items','-user-',))
+        return serialize(order)
     
     def patch(self, id):
         order = Order.query.get(id)
@@ -305,14 +732,63 @@ class OrderDetails(Resource):
         db.session.commit()
         return {"message": "Order deleted successfully"}
 
+# ------------------ CHECKOUT ------------------ #
+class Checkout(Resource):
+    DELIVERY_FEE = 100
+    FREE_DELIVERY_THRESHOLD = 1000
+
+    def post(self):
+        data = request.get_json()
+        try:
+            user_id = data['user_id']
+            cart = [(int(line['menuitem_id']), int(line.get('quantity', 1))) for line in data['items']]
+        except (KeyError, TypeError, ValueError):
+            return {"error": "user_id and items with a menuitem_id are required."}, 400
+        if not cart:
+            return {"error": "Cart is empty."}, 400
+        if any(quantity < 1 for _, quantity in cart):
+            return {"error": "Quantities must be at least 1."}, 400
+
+        # Prices come from the menu, never from the client.
+        menu_items = {item.id: item for item in MenuItem.query.filter(MenuItem.id.in_({id for id, _ in cart}))}
+        missing = sorted({id for id, _ in cart} - menu_items.keys())
+        if missing:
+            return {"error": f"Menu items not found: {missing}"}, 404
+
+        order_items = [
+            OrderItem(menu_item=menu_items[id], quantity=quantity, sub_total=menu_items[id].price * quantity)
+            for id, quantity in cart
+        ]
+        items_total = sum(order_item.sub_total for order_item in order_items)
+        delivery_fee = 0 if items_total > self.FREE_DELIVERY_THRESHOLD else self.DELIVERY_FEE
+
+        try:
+            order = Order(
+                user_id=user_id,
+                total_price=items_total + delivery_fee,
+                status=data.get('status', 'pending'),
+                order_items=order_items
+            )
+            db.session.add(order)
+            db.session.flush()
+            enqueue_order(order)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return {"message": "Invalid order data"}, 400
+        return {
+            **serialize_order_row(order),
+            "order_items": [serialize_order_item(order_item) for order_item in order_items]
+        }, 201
+
 # ------------------ ORDER ITEMS ------------------ #
 class OrderItemLists(Resource):
     def get(self):
-        order_items = OrderItem.query.all()
-        return [
-            order_item.to_dict(rules=('-order', '-menu_item')) 
-            for order_item in order_items
-        ]
+        try:
+            serialize, options = ORDER_ITEM_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginate(OrderItem.query.options(*options), OrderItem, serialize)
 
     def post(self):
         data = request.get_json()
@@ -332,10 +808,14 @@ class OrderItemLists(Resource):
 
 class OrderItemDetails(Resource):
     def get(self, id):
-        order_item = OrderItem.query.get(id)
+        try:
+            serialize, options = ORDER_ITEM_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        order_item = db.session.get(OrderItem, id, options=options)
         if not order_item:
             return {"error": "Order item not found."}, 404
-        return order_item.to_dict(rules=('-order', '-menu_item'))
+        return serialize(order_item)
 
     def patch(self, id):
         order_item = OrderItem.query.get(id)
@@ -345,8 +825,10 @@ class OrderItemDetails(Resource):
         data = request.get_json()
         if 'quantity' in data:
             order_item.quantity = data['quantity']
-        if 'subtotal' in data:
-            order_item.subtotal = data['subtotal']
+        if 'sub_total' in data:
+            order_item.sub_total = data['sub_total']
+        elif 'subtotal' in data:
+            order_item.sub_total = data['subtotal']
         
         db.session.commit()
         return order_item.to_dict(rules=('-order.order_items', '-menu_item.order_items'))
@@ -363,11 +845,11 @@ class OrderItemDetails(Resource):
 # ------------------ TABLES ------------------ #
 class TableLists(Resource):
     def get(self):
-        tables = Table.query.all()
-        return [
-            table.to_dict(rules=('-outlet', '-reservations')) 
-            for table in tables
-        ]
+        try:
+            serialize, options = TABLE_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        return paginate(Table.query.options(*options), Table, serialize)
 
     def post(self):
         data = request.get_json()
@@ -387,10 +869,14 @@ class TableLists(Resource):
 
 class TableDetails(Resource):
     def get(self, id):
-        table = Table.query.get(id)
+        try:
+            serialize, options = TABLE_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        table = db.session.get(Table, id, options=options)
         if not table:
             return {"error": "Table not found."}, 404
-        return table.to_dict(rules=('-outlet', '-reservations'))
+        return serialize(table)
 
     def patch(self, id):
         table = Table.query.get(id)
@@ -419,19 +905,81 @@ class TableDetails(Resource):
         db.session.commit()
         return {"message": "Table deleted successfully"}
 
+class TableAvailability(Resource):
+    def get(self):
+        try:
+            booking_date = datetime.strptime(request.args['date'], "%Y-%m-%d").date()
+            booking_time = time.fromisoformat(request.args['time'])
+            party_size = int(request.args.get('party_size', 1))
+        except (KeyError, ValueError):
+            return {"error": "date (YYYY-MM-DD) and time (HH:MM) are required; party_size must be a number."}, 400
+        try:
+            duration = booking_duration(request.args.get('duration', Reservation.DEFAULT_DURATION), booking_time)
+            serialize, options = TABLE_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        slots = ReservationSlot.slot_range(booking_time, Reservation.slot_end(booking_date, booking_time, duration))
+        booked = (
+            db.session.query(ReservationSlot.id)
+            .filter(
+                ReservationSlot.table_id == Table.id,
+                ReservationSlot.booking_date == booking_date,
+                ReservationSlot.slot >= slots.start,
+                ReservationSlot.slot < slots.stop,
+            )
+            .exists()
+        )
+        tables = (
+            Table.query.options(*options)
+            .filter(Table.capacity >= party_size, or_(Table.is_available.is_(None), Table.is_available != 'No'), ~booked)
+            .order_by(Table.capacity, Table.table_number)
+            .all()
+        )
+        return [serialize(table) for table in tables]
+
 # ------------------ RESERVATIONS ------------------ #
+def claim_slots(reservation):
+    # Swap whatever slots the reservation held for the ones it covers now. A
+    # clash with another booking surfaces as an IntegrityError on flush, so the
+    # database, not a prior read, decides who gets the table.
+    if reservation.id is not None:
+        ReservationSlot.query.filter_by(reservation_id=reservation.id).delete(synchronize_session=False)
+        db.session.expire(reservation, ['slots'])
+    if not reservation.is_cancelled:
+        db.session.add_all(
+            ReservationSlot(reservation=reservation, table_id=reservation.table_id, booking_date=reservation.booking_date, slot=slot)
+            for slot in ReservationSlot.slot_range(reservation.booking_time, reservation.end_time)
+        )
+    db.session.flush()
+
 class ReservationLists(Resource):
-    
+    SORTS = ('id', 'booking_date', 'booking_time', 'created_at')
+
     def get(self):
-        reservations = Reservation.query.all()
-        return [
-            {
-                **res.to_dict(rules=('-user', '-table', '-order')),
-                "user": res.user_summary,
-                "table": res.table_summary,
-            }
-            for res in reservations
-        ]
+        try:
+            serialize, options = RESERVATION_LIST_FIELDS.from_request()
+            sort = parse_sort(self.SORTS)
+            outlet_id, user_id, table_id = int_arg('outlet_id'), int_arg('user_id'), int_arg('table_id')
+            statuses = list_arg('status')
+            date_from, date_to = date_arg('date_from'), date_arg('date_to')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        query = Reservation.query.options(*options)
+        if outlet_id is not None:
+            # Through the order the reservation was booked with.
+            query = query.filter(Reservation.order_id.in_(outlet_order_ids(outlet_id)))
+        if user_id is not None:
+            query = query.filter(Reservation.user_id == user_id)
+        if table_id is not None:
+            query = query.filter(Reservation.table_id == table_id)
+        if statuses:
+            query = query.filter(Reservation.status.in_(statuses))
+        if date_from is not None:
+            query = query.filter(Reservation.booking_date >= date_from)
+        if date_to is not None:
+            query = query.filter(Reservation.booking_date <= date_to)
+        return paginate(query, Reservation, serialize, sort)
 
     def post(self):
         data = request.get_json()
@@ -439,32 +987,45 @@ class ReservationLists(Resource):
             table = Table.query.get(data['table_id'])
             if not table:
                 return {"error": "Table not found"}, 404
-            if table.is_available != 'Yes':
+            if table.is_available == 'No':
                 return {"error": "Table is not available"}, 400
 
+            booking_time = datetime.strptime(data['booking_time'], "%H:%M:%S").time()
             reservation = Reservation(
                 user_id=data['user_id'],
                 table_id=data['table_id'],
                 booking_date=datetime.strptime(data['booking_date'], "%Y-%m-%d").date(),
-                booking_time=datetime.strptime(data['booking_time'], "%H:%M:%S").time(),
+                booking_time=booking_time,
+                duration=booking_duration(data.get('duration', Reservation.DEFAULT_DURATION), booking_time),
                 status=data.get('status', 'Confirmed'),
                 no_of_people=data.get('no_of_people', 1),
                 order_id=data.get('order_id')
             )
+            reservation.update_end_time()
             db.session.add(reservation)
-            table.is_available = 'No'
+            claim_slots(reservation)
             db.session.commit()
             return reservation.to_dict(rules=('-user', '-table', '-order')), 201
+        except IntegrityError:
+            db.session.rollback()
+            return {"error": "Table is already booked for that time"}, 409
+        except ValueError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 400
         except Exception as e:
             db.session.rollback()
             return {"error": str(e)}, 500
 
 class ReservationDetails(Resource):
     def get(self, id):
-        reservation = Reservation.query.get(id)
+        try:
+            serialize, options = RESERVATION_FIELDS.from_request()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        reservation = db.session.get(Reservation, id, options=options)
         if not reservation:
             return {"error": "Reservation not found."}, 404
-        return reservation.to_dict(rules=('-user', '-table', '-order'))
+        return serialize(reservation)
 
     def patch(self, id):
         data = request.get_json()
@@ -478,23 +1039,29 @@ class ReservationDetails(Resource):
                 new_table = Table.query.get(data['table_id'])
                 if not new_table:
                     return {"error": "New table not found"}, 404
-                if new_table.is_available != 'Yes':
+                if new_table.is_available == 'No':
                     return {"error": "New table is not available"}, 400
-                old_table = Table.query.get(reservation.table_id)
-                if old_table:
-                    old_table.is_available = 'Yes'
                 reservation.table_id = new_table.id
-                new_table.is_available = 'No'
             if 'booking_date' in data:
                 reservation.booking_date = datetime.strptime(data['booking_date'], "%Y-%m-%d").date()
             if 'booking_time' in data:
                 reservation.booking_time = datetime.strptime(data['booking_time'], "%H:%M:%S").time()
+            if 'duration' in data or 'booking_time' in data:
+                reservation.duration = booking_duration(data.get('duration', reservation.duration), reservation.booking_time)
             if 'status' in data:
                 reservation.status = data['status']
             if 'no_of_people' in data:
                 reservation.no_of_people = data['no_of_people']
+            reservation.update_end_time()
+            claim_slots(reservation)
             db.session.commit()
             return reservation.to_dict(rules=('-user', '-table', '-order')), 200
+        except IntegrityError:
+            db.session.rollback()
+            return {"error": "Table is already booked for that time"}, 409
+        except ValueError as e:
+            db.session.rollback()
+            return {"error": str(e)}, 400
         except Exception as e:
             db.session.rollback()
             return {"error": str(e)}, 500
@@ -504,16 +1071,88 @@ class ReservationDetails(Resource):
         if not reservation:
             return {"error": "Reservation not found"}, 404
         try:
-            table = reservation.table
             db.session.delete(reservation)
-            if table:
-                table.is_available = 'Yes'
             db.session.commit()
             return {"message": "Reservation deleted successfully"}, 200
         except Exception as e:
             db.session.rollback()
             return {"error": str(e)}, 500
 
+# ------------------ SEARCH ------------------ #
+class Search(Resource):
+    @conditional('outlets', 'menu_items', 'cuisines')
+    @cached('outlets', 'menu_items', 'cuisines')
+    def get(self):
+        query = request.args.get('q', '').strip()
+        if not query:
+            return {"error": "q is required."}, 400
+        try:
+            limit = int_arg('limit')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        kinds = list_arg('type') or list(SEARCH_KINDS)
+        unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+        if unknown:
+            return {"error": f"Can't search {', '.join(unknown)}; use {', '.join(SEARCH_KINDS)}."}, 400
+        limit = min(max(limit or DEFAULT_SEARCH_LIMIT, 1), MAX_SEARCH_LIMIT)
+        return {"query": query, "results": search(query, kinds, limit)}
+
+# ------------------ KITCHEN ------------------ #
+class KitchenQueue(Resource):
+    # Tickets in dispatch order (highest priority, then oldest), each with its
+    # estimated wait. See kitchen.py.
+    DEFAULT_LIMIT = 50
+
+    def get(self, id):
+        if not db.session.get(Outlet, id):
+            return {"error": "Outlet not found."}, 404
+        try:
+            limit = int_arg('limit')
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        limit = min(max(limit or self.DEFAULT_LIMIT, 1), MAX_PAGE_LIMIT)
+        return kitchen_queues.queue(id).snapshot(limit)
+
+    def post(self, id):
+        if not db.session.get(Outlet, id):
+            return {"error": "Outlet not found."}, 404
+        data = request.get_json() or {}
+        try:
+            order_id = int(data['order_id'])
+            priority = int(data.get('priority', 0))
+        except (KeyError, TypeError, ValueError):
+            return {"error": "order_id is required and priority must be a number."}, 400
+        if not db.session.get(Order, order_id):
+            return {"error": "Order not found."}, 404
+        if id not in order_outlets(order_id):
+            return {"error": "The order has no items from this outlet."}, 400
+        ticket = KitchenTicket(order_id=order_id, outlet_id=id, priority=priority)
+        db.session.add(ticket)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return {"error": "The order is already in this outlet's queue."}, 409
+        return serialize_kitchen_ticket(ticket), 201
+
+class KitchenClaim(Resource):
+    def post(self, id):
+        if not db.session.get(Outlet, id):
+            return {"error": "Outlet not found."}, 404
+        ticket = kitchen_queues.queue(id).claim()
+        if ticket is None:
+            return {"error": "No orders are waiting."}, 404
+        return serialize_kitchen_ticket(ticket)
+
+class KitchenTicketComplete(Resource):
+    def post(self, id):
+        ticket = db.session.get(KitchenTicket, id)
+        if not ticket:
+            return {"error": "Ticket not found."}, 404
+        if not kitchen_queues.complete(ticket):
+            return {"error": f"Ticket is {ticket.status}, not claimed."}, 409
+        return serialize_kitchen_ticket(ticket)
+
 # ------------------ ROUTES ------------------ #
 api.add_resource(Register, '/register')
 api.add_resource(Login, '/login')
@@ -528,22 +1167,34 @@ api.add_resource(CuisineDetails, '/cuisines/<int:id>')
 
 api.add_resource(OutletLists, '/outlets')
 api.add_resource(OutletDetails, '/outlets/<int:id>')
+api.add_resource(OutletAnalytics, '/outlets/<int:id>/analytics')
 
 api.add_resource(MenuItemLists, '/menu-items')
 api.add_resource(MenuItemDetails, '/menu-items/<int:id>')
+api.add_resource(PopularMenuItems, '/menu-items/popular')
+api.add_resource(MenuItemRecommendations, '/menu-items/<int:id>/recommendations')
+api.add_resource(MenuItemImport, '/outlets/<int:id>/menu-items/import')
 
 api.add_resource(OrderLists, '/orders')
 api.add_resource(OrderDetails, '/orders/<int:id>')
+api.add_resource(Checkout, '/checkout')
 
 api.add_resource(OrderItemLists, '/order-items')
 api.add_resource(OrderItemDetails, '/order-items/<int:id>')
 
 api.add_resource(TableLists, '/tables')
 api.add_resource(TableDetails, '/tables/<int:id>')
+api.add_resource(TableAvailability, '/tables/available')
 
 api.add_resource(ReservationLists, '/reservations')
 api.add_resource(ReservationDetails, '/reservations/<int:id>')
 
+api.add_resource(Search, '/search')
+
+api.add_resource(KitchenQueue, '/outlets/<int:id>/kitchen/queue')
+api.add_resource(KitchenClaim, '/outlets/<int:id>/kitchen/claim')
+api.add_resource(KitchenTicketComplete, '/kitchen-tickets/<int:id>/complete')
+
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5555, debug=False)
@@ -0,0 +1,208 @@
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_etags, quote_etag
+
+from app import app as flask_app, CUISINE_FIELDS, OUTLET_LIST_FIELDS, OUTLET_FIELDS, MENU_ITEM_LIST_FIELDS
+from caching import current_etag, table_versions
+from compression import compress, compressed_cache, negotiate
+from config import db, sqlite_pragmas, statement_timeout
+from models import Cuisine, Outlet, MenuItem
+from pagination import ID_ORDER, after_cursor, order_by, page_args, page_of
+from request_args import int_arg
+
+# ASGI entry point. The catalog reads (cuisines, outlets, menu items) run on
+# SQLAlchemy's asyncio engine, so many concurrent browsers share a few
+# connections and one event loop instead of a worker thread each. Everything
+# else falls through to the Flask app, served from a thread pool.
+#
+#     uvicorn async_app:app --port 5555
+#
+# Responses match the Flask resources byte for byte, ETags included: both are
+# taken from the shared table versions (see caching.py) before any query runs,
+# so a 304 costs no query or serialization. Bodies aren't kept in the response
+# cache here; the Flask app's writes reach these tags through table_versions.
+#
+# The fallthrough mount is a convenience for development: a2wsgi's thread pool
+# is small and queues badly under load. In production, route GET /cuisines,
+# /outlets and /menu-items to this app and everything else to gunicorn.
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+def _async_engine():
+    with flask_app.app_context():
+        url = db.engine.url  # Flask-SQLAlchemy has resolved relative SQLite paths
+    backend = url.get_backend_name()
+    options = {
+        key: value for key, value in flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+        if key not in ('poolclass', 'connect_args')
+    }
+    if backend == 'postgresql' and statement_timeout:
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(statement_timeout)}}
+    engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS[backend]), **options)
+
+    if backend == 'sqlite' and flask_app.config['SQLITE_PRODUCTION_MODE']:
+        @event.listens_for(engine.sync_engine, 'connect')
+        def configure_sqlite(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in sqlite_pragmas():
+                cursor.execute(pragma)
+            cursor.close()
+
+    return engine
+
+
+engine = _async_engine()
+Session = async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _refresh_versions():
+    with flask_app.app_context():
+        table_versions.refresh()
+
+
+async def _etag(request, fieldset):
+    # The tag the Flask resource gives the same request.
+    if table_versions.due():
+        # Re-reading table_versions is blocking I/O; keep it off the event loop.
+        await run_in_threadpool(_refresh_versions)
+    with flask_app.app_context():
+        # As Flask's request.full_path.
+        return current_etag(fieldset.tables(request.query_params), f"{request.url.path}?{request.url.query}")
+
+
+def _not_modified(request, etag):
+    # Whole tags, compared weakly: a compressed response is tagged W/.
+    if not parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+        return None
+    return Response(status_code=304, headers={**_cors_headers(request), 'ETag': quote_etag(etag)})
+
+
+def _cors_headers(request):
+    origin = request.headers.get('origin')
+    if origin not in flask_app.config['CORS_ORIGINS']:
+        return {}
+    return {'Access-Control-Allow-Origin': origin, 'Access-Control-Allow-Credentials': 'true', 'Vary': 'Origin'}
+
+
+def json_response(request, data, status=200, etag=None):
+    # Same encoding and compression as the Flask app.
+    body = flask_app.json.encode(data).encode()
+    headers = _cors_headers(request)
+    etag = etag if status == 200 else None
+    if etag:
+        headers['ETag'] = quote_etag(etag)
+    if len(body) >= flask_app.config['COMPRESS_MIN_SIZE']:
+        headers['Vary'] = ', '.join(filter(None, (headers.get('Vary'), 'Accept-Encoding')))
+        encoding = negotiate(request.headers.get('accept-encoding'))
+        if encoding:
+            key = f"{quote_etag(etag)}|{encoding}" if etag else None
+            compressed = compressed_cache.get(key) if key else None
+            if compressed is None:
+                compressed = compress(body, encoding)
+                if key:
+                    compressed_cache.put(key, compressed, ())
+            body = compressed
+            headers['Content-Encoding'] = encoding
+            if etag:
+                headers['ETag'] = quote_etag(etag, weak=True)
+    return Response(body, status_code=status, headers=headers, media_type='application/json')
+
+
+async def paginate(session, query, model, serialize, page):
+    # app.paginate for the async session; page is (limit, after) from page_args.
+    limit, after = page
+    if after is not None:
+        query = query.where(after_cursor(model, ID_ORDER, after))
+    rows = (await session.scalars(query.order_by(*order_by(model, ID_ORDER)).limit(limit + 1))).all()
+    return page_of(rows, limit, serialize)
+
+
+# ------------------ CATALOG ------------------ #
+async def cuisine_list(request):
+    try:
+        serialize, options = CUISINE_FIELDS.from_request(request.query_params)
+        page = page_args(request.query_params)
+    except ValueError as e:
+        return json_response(request, {"error": str(e)}, 400)
+    etag = await _etag(request, CUISINE_FIELDS)
+    if not_modified := _not_modified(request, etag):
+        return not_modified
+    async with Session() as session:
+        query = select(Cuisine).options(*options)
+        return json_response(request, await paginate(session, query, Cuisine, serialize, page), etag=etag)
+
+
+async def outlet_list(request):
+    try:
+        serialize, options = OUTLET_LIST_FIELDS.from_request(request.query_params)
+        page = page_args(request.query_params)
+        owner_id = int_arg('owner_id', request.query_params)
+    except ValueError as e:
+        return json_response(request, {"error": str(e)}, 400)
+    etag = await _etag(request, OUTLET_LIST_FIELDS)
+    if not_modified := _not_modified(request, etag):
+        return not_modified
+    async with Session() as session:
+        query = select(Outlet).options(*options)
+        if owner_id is not None:
+            query = query.where(Outlet.owner_id == owner_id)
+        return json_response(request, await paginate(session, query, Outlet, serialize, page), etag=etag)
+
+
+async def outlet_details(request):
+    try:
+        serialize, options = OUTLET_FIELDS.from_request(request.query_params)
+    except ValueError as e:
+        return json_response(request, {"error": str(e)}, 400)
+    etag = await _etag(request, OUTLET_FIELDS)
+    if not_modified := _not_modified(request, etag):
+        return not_modified
+    async with Session() as session:
+        outlet = await session.get(Outlet, request.path_params['id'], options=options)
+        if not outlet:
+            return json_response(request, {"error": "Outlet not found."}, 404)
+        return json_response(request, serialize(outlet), etag=etag)
+
+
+async def menu_item_list(request):
+    try:
+        serialize, options = MENU_ITEM_LIST_FIELDS.from_request(request.query_params)
+        page = page_args(request.query_params)
+        # asyncpg won't compare a text parameter with an integer column.
+        outlet_id = int_arg('outlet_id', request.query_params)
+    except ValueError as e:
+        return json_response(request, {"error": str(e)}, 400)
+    etag = await _etag(request, MENU_ITEM_LIST_FIELDS)
+    if not_modified := _not_modified(request, etag):
+        return not_modified
+    async with Session() as session:
+        query = select(MenuItem).options(*options)
+        if outlet_id is not None:
+            query = query.where(MenuItem.outlet_id == outlet_id)
+        return json_response(request, await paginate(session, query, MenuItem, serialize, page), etag=etag)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await engine.dispose()
+
+
+app = Starlette(
+    routes=[
+        Route('/cuisines', cuisine_list, methods=['GET']),
+        Route('/outlets', outlet_list, methods=['GET']),
+        Route('/outlets/{id:int}', outlet_details, methods=['GET']),
+        Route('/menu-items', menu_item_list, methods=['GET']),
+        Mount('/', WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan,
+)
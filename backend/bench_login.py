@@ -0,0 +1,105 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+import models
+from app import app, db
+from models import User
+from passwords import PasswordHasher
+
+# Fires a burst of concurrent logins at a threaded server, once with bcrypt
+# inline on the request threads and once on the bounded hashing pool, while a
+# probe keeps requesting /cuisines to show what the burst does to everyone
+# else. Creates one throwaway user and removes it afterwards.
+
+PORT = 5321
+
+
+def _post(path, body):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{PORT}{path}', json.dumps(body).encode(), {'Content-Type': 'application/json'},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _probe(stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        urllib.request.urlopen(f'http://127.0.0.1:{PORT}/cuisines').read()
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.02)
+
+
+def _p95(values):
+    return sorted(values)[int(len(values) * 0.95)] if values else 0.0
+
+
+def run(label, hasher, email, password, requests, concurrency):
+    models.password_hasher = hasher
+    stop, probes, statuses = threading.Event(), [], []
+
+    def login(_):
+        started = time.perf_counter()
+        statuses.append(_post('/login', {'email': email, 'password': password}))
+        return time.perf_counter() - started
+
+    probe = threading.Thread(target=_probe, args=(stop, probes))
+    probe.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(login, range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe.join()
+
+    ok = statuses.count(200)
+    print(f"{label:<8} {ok / elapsed:>10.1f} {statistics.median(latencies) * 1000:>10.0f} "
+          f"{_p95(latencies) * 1000:>10.0f} {statuses.count(503):>6} {_p95(probes) * 1000:>14.1f}")
+
+
+def main(requests, concurrency, rounds, workers, max_pending):
+    email, password = f'bench-{uuid.uuid4().hex[:8]}@example.com', 'bench-password'
+    server = make_server('127.0.0.1', PORT, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    inline = PasswordHasher(rounds, 0, max_pending)
+    pooled = PasswordHasher(rounds, workers, max_pending)
+    try:
+        models.password_hasher = inline
+        status = _post('/register', {
+            'name': email.split('@')[0], 'email': email, 'password': password, 'phone_no': 700000000, 'role': 'customer',
+        })
+        if status != 201:
+            print(f"Could not register the benchmark user ({status}).")
+            return
+        print(f"{requests} logins, {concurrency} concurrent clients, bcrypt cost {rounds}, {workers} hashing workers")
+        print(f"{'mode':<8} {'logins/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'503s':>6} {'probe p95 ms':>14}")
+        run('inline', inline, email, password, requests, concurrency)
+        run('pool', pooled, email, password, requests, concurrency)
+    finally:
+        server.shutdown()
+        with app.app_context():
+            User.query.filter_by(email=email).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark logins per second with and without the hashing pool.")
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=app.config['BCRYPT_LOG_ROUNDS'])
+    parser.add_argument('--workers', type=int, default=app.config['PASSWORD_HASH_WORKERS'])
+    parser.add_argument('--max-pending', type=int, default=app.config['PASSWORD_HASH_MAX_PENDING'])
+    args = parser.parse_args()
+    main(args.requests, args.concurrency, args.rounds, args.workers, args.max_pending)
@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Concurrent checkouts (each one reads the menu, then writes an order, its
+# lines and the rollups) spread over several server processes sharing a copy of
+# instance/app.db, the way gunicorn workers would, with a reader polling
+# /orders alongside. Runs once with the SQLite production mode off and once
+# with it on, each on a fresh copy of the database.
+
+BASE_PORT = 5330
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'app.db')
+
+
+def serve(port):
+    from werkzeug.serving import make_server
+    from app import app
+
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def _request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data, {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _wait_until_up(ports):
+    deadline = time.monotonic() + 30
+    for port in ports:
+        while True:
+            try:
+                _request(f'http://127.0.0.1:{port}/health')
+                break
+            except urllib.error.URLError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+
+def _read_orders(ports, stop, latencies):
+    n = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        _request(f'http://127.0.0.1:{ports[n % len(ports)]}/orders?limit=20')
+        latencies.append(time.perf_counter() - started)
+        n += 1
+
+
+def run(path, production, workers, orders, concurrency):
+    connection = sqlite3.connect(path)
+    user_ids = [id for (id,) in connection.execute("SELECT id FROM users WHERE role = 'customer'")]
+    menu_item_ids = [id for (id,) in connection.execute("SELECT id FROM menu_items")]
+    connection.close()
+    carts = [
+        {'user_id': user_ids[n % len(user_ids)],
+         'items': [{'menuitem_id': menu_item_ids[(n + k) % len(menu_item_ids)], 'quantity': 1 + k} for k in range(3)]}
+        for n in range(orders)
+    ]
+
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}', SQLITE_PRODUCTION_MODE=str(production).lower())
+    ports = [BASE_PORT + n for n in range(workers)]
+    servers = [
+        subprocess.Popen([sys.executable, __file__, '--serve', str(port)], env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for port in ports
+    ]
+    try:
+        _wait_until_up(ports)
+        stop, reads = threading.Event(), []
+        reader = threading.Thread(target=_read_orders, args=(ports, stop, reads))
+        reader.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            statuses = Counter(pool.map(
+                lambda n: _request(f'http://127.0.0.1:{ports[n % workers]}/checkout', carts[n]), range(orders),
+            ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        reader.join()
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    reads.sort()
+    return {
+        'orders_per_sec': statuses[201] / elapsed,
+        'created': statuses[201],
+        'failed': orders - statuses[201],
+        'read_p95_ms': reads[int(len(reads) * 0.95)] * 1000 if reads else 0.0,
+    }
+
+
+def main(workers, orders, concurrency):
+    print(f"{orders} checkouts, {concurrency} concurrent clients, {workers} server processes")
+    print(f"{'mode':<6} {'orders/s':>10} {'created':>8} {'failed':>8} {'read p95 ms':>12}")
+    for label, production in (('off', False), ('on', True)):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            shutil.copy(SOURCE, path)
+            # journal_mode=WAL sticks to the file, so reset it for the baseline.
+            connection = sqlite3.connect(path)
+            connection.execute("PRAGMA journal_mode=DELETE")
+            connection.close()
+            result = run(path, production, workers, orders, concurrency)
+        print(f"{label:<6} {result['orders_per_sec']:>10.1f} {result['created']:>8} {result['failed']:>8} "
+              f"{result['read_p95_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent order inserts with and without SQLite production mode.")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--orders', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+    else:
+        main(args.workers, args.orders, args.concurrency)
@@ -0,0 +1,293 @@
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from werkzeug.http import quote_etag
+
+from config import app, api, db
+from models import TableVersion
+
+# Per-table version counters behind the catalog ETags and response cache.
+# Tables touched by a transaction are collected as it flushes and bumped in
+# table_versions once it commits, so a write made by any worker moves the
+# versions every worker reads. Each process keeps a copy and re-reads it at
+# most every RESPONSE_CACHE_SYNC_INTERVAL seconds, which bounds how long
+# another worker's write takes to reach this one's tags and cached bodies; its
+# own writes show up at once. Readers derive their tag from the versions of
+# every table their response draws on, so a 304 or a cache hit costs no
+# serialization and at most one small query per interval. The epoch is drawn
+# once per database, so tags from a database since rebuilt never match.
+
+EPOCH = '*'
+
+
+class DatabaseVersionStore:
+    # Uses its own connections, like the token blocklist store, so a bump
+    # never rides on (or commits) the request's session.
+
+    def load(self):
+        with db.engine.connect() as connection:
+            return dict(connection.execute(select(TableVersion.table_name, TableVersion.version)).all())
+
+    def bump(self, tables):
+        for attempt in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    # In name order, so concurrent bumps take row locks alike.
+                    for table in sorted(tables):
+                        bumped = connection.execute(
+                            update(TableVersion).where(TableVersion.table_name == table)
+                            .values(version=TableVersion.version + 1)
+                        )
+                        if not bumped.rowcount:
+                            connection.execute(insert(TableVersion).values(table_name=table, version=1))
+                return
+            except IntegrityError:
+                # Another worker inserted the row first; the retry updates it.
+                if attempt:
+                    raise
+
+    def start_epoch(self):
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(TableVersion).values(table_name=EPOCH, version=secrets.randbits(31)))
+        except IntegrityError:
+            pass  # another worker started it
+
+
+class TableVersions:
+
+    def __init__(self, store, sync_interval):
+        self.store = store
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.epoch = None
+        self.synced_at = None
+
+    def bump(self, tables):
+        self.store.bump(tables)
+        with self.lock:
+            self._sync(time.monotonic())
+
+    def snapshot(self, tables):
+        self.refresh()
+        versions = self.versions
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def due(self):
+        return self.synced_at is None or time.monotonic() - self.synced_at >= self.sync_interval
+
+    def refresh(self):
+        if not self.due():
+            return
+        with self.lock:
+            if not self.due():
+                return  # another thread synced while this one waited
+            self._sync(time.monotonic())
+
+    def _sync(self, now):
+        versions = self.store.load()
+        if EPOCH not in versions:
+            self.store.start_epoch()
+            versions = self.store.load()
+        epoch = versions.pop(EPOCH)
+        if self.epoch is not None and epoch != self.epoch:
+            response_cache.clear()
+        else:
+            changed = {table for table in versions.keys() | self.versions.keys() if versions.get(table) != self.versions.get(table)}
+            if changed:
+                response_cache.invalidate(changed)
+        self.versions, self.epoch, self.synced_at = versions, epoch, now
+
+
+def current_etag(tables, path=None):
+    # path is the request's path and query string; Flask's unless given.
+    path = request.full_path if path is None else path
+    versions = ','.join(str(version) for version in table_versions.snapshot(tables))
+    digest = hashlib.sha1(f"{path}|{versions}".encode()).hexdigest()[:16]
+    return f"{table_versions.epoch:x}-{digest}"
+
+
+def _dependencies(dependencies):
+    # Table names, and Fieldsets standing for the tables the request's
+    # includes draw on.
+    tables = set()
+    for dependency in dependencies:
+        tables.update((dependency,) if isinstance(dependency, str) else dependency.tables())
+    return tuple(sorted(tables))
+
+
+# ------------------ WRITE TRACKING ------------------ #
+def _changed_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flush(session, flush_context):
+    # A row joining a relationship collection dirties the parent without
+    # changing its row, e.g. a checkout's order items dirty their menu items.
+    dirty = (obj for obj in session.dirty if session.is_modified(obj, include_collections=False))
+    _changed_tables(session).update(
+        obj.__table__.name for obj in (*session.new, *dirty, *session.deleted)
+    )
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _changed_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_commit(session):
+    tables = session.info.pop('changed_tables', None)
+    if not tables:
+        return
+    try:
+        table_versions.bump(tables)
+    except Exception:
+        # The write itself is committed; other workers catch up within the
+        # cache TTL, and this one resyncs on its next read.
+        table_versions.synced_at = None
+        app.logger.exception("Couldn't publish table versions for %s", sorted(tables))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rollback(session):
+    session.info.pop('changed_tables', None)
+
+
+# ------------------ RESPONSE CACHE ------------------ #
+class ResponseCache:
+    # LRU of encoded response bodies, bounded by total bytes, with a TTL.
+
+    def __init__(self, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            body, tables, expires = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body, tables):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (body, frozenset(tables), time.monotonic() + self.ttl)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        tables = set(tables)
+        with self.lock:
+            stale = [key for key, (_, depends_on, _) in self.entries.items() if depends_on & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self.size = 0
+
+    def _remove(self, key):
+        body, _, _ = self.entries.pop(key)
+        self.size -= len(body)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache(app.config['RESPONSE_CACHE_MAX_BYTES'], app.config['RESPONSE_CACHE_TTL'])
+table_versions = TableVersions(DatabaseVersionStore(), app.config['RESPONSE_CACHE_SYNC_INTERVAL'])
+
+
+# ------------------ DECORATORS ------------------ #
+def _split(rv):
+    if not isinstance(rv, tuple):
+        return rv, 200, {}
+    data, code, headers = rv + (None,) * (3 - len(rv))
+    return data, code or 200, dict(headers or {})
+
+
+def conditional(*dependencies):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            etag = current_etag(_dependencies(dependencies))
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=304, headers={'ETag': quote_etag(etag)})
+            rv = method(*args, **kwargs)
+            if isinstance(rv, Response):
+                if rv.status_code == 200:
+                    rv.set_etag(etag)
+                return rv
+            data, code, headers = _split(rv)
+            if code == 200:
+                headers['ETag'] = quote_etag(etag)
+            return data, code, headers
+        return wrapper
+    return decorator
+
+
+def cached(*dependencies):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            table_versions.refresh()  # drops entries other workers' writes made stale
+            body = response_cache.get(key)
+            if body is not None:
+                return Response(body, mimetype='application/json')
+            tables = _dependencies(dependencies)
+            versions = table_versions.snapshot(tables)
+            data, code, headers = _split(method(*args, **kwargs))
+            response = api.make_response(data, code, headers=headers)
+            # Skip storing if a commit landed while this response was built.
+            if code == 200 and table_versions.snapshot(tables) == versions:
+                response_cache.put(key, response.get_data(), tables)
+            return response
+        return wrapper
+    return decorator
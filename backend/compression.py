@@ -0,0 +1,67 @@
+import gzip
+import zlib
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+from caching import ResponseCache
+from config import app
+
+# gzip/deflate for JSON and text responses of at least COMPRESS_MIN_SIZE
+# bytes, picked from the client's Accept-Encoding (q-values and identity
+# included). Smaller bodies go out as they are, since the headers and CPU cost
+# more than the bytes saved. Streams (the order SSE feed) are left alone.
+#
+# A compressed body's ETag is made weak: it still matches If-None-Match, but
+# no longer claims to be byte-identical to the uncompressed body. Bodies with an
+# ETag are compressed once and kept by (ETag, encoding), so cache hits and
+# repeat reads of large lists don't pay for gzip each time.
+
+ENCODINGS = ('gzip', 'deflate')
+COMPRESSIBLE = ('application/json', 'text/')
+
+compressed_cache = ResponseCache(app.config['COMPRESS_CACHE_MAX_BYTES'], app.config['RESPONSE_CACHE_TTL'])
+
+
+def negotiate(accept_encoding):
+    return parse_accept_header(accept_encoding).best_match(ENCODINGS) if accept_encoding else None
+
+
+def compress(body, encoding, level=None):
+    level = app.config['COMPRESS_LEVEL'] if level is None else level
+    if encoding == 'gzip':
+        return gzip.compress(body, level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def is_compressible(response):
+    return (
+        200 <= response.status_code < 300 and response.status_code not in (204, 206)
+        and not response.direct_passthrough and not response.is_streamed
+        and 'Content-Encoding' not in response.headers
+        and response.mimetype.startswith(COMPRESSIBLE)
+        and 'no-transform' not in response.headers.get('Cache-Control', '')
+    )
+
+
+@app.after_request
+def compress_response(response):
+    if not is_compressible(response) or len(response.get_data()) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    etag, weak = response.get_etag()
+    key = f"{etag}|{encoding}" if etag else None
+    body = compressed_cache.get(key) if key else None
+    if body is None:
+        body = compress(response.get_data(), encoding)
+        if key:
+            compressed_cache.put(key, body, ())
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
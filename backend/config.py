@@ -1,25 +1,104 @@
+import os
+import sqlite3
+
 from flask import Flask
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
 from flask_restful import Api
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event
+from sqlalchemy.engine import Engine, make_url
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
+from json_provider import FastJSONProvider
+from pool_metrics import MeteredQueuePool
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    return value.lower() in ('1', 'true', 'yes', 'on') if value else default
+
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+
+database_url = make_url(os.environ.get('DATABASE_URL', 'sqlite:///app.db'))
+if database_url.drivername == 'postgres':  # Render and Heroku style URLs
+    database_url = database_url.set(drivername='postgresql')
+
+engine_options = {
+    'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+    'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+}
+if database_url.get_backend_name() != 'sqlite' or database_url.database not in (None, '', ':memory:'):
+    engine_options.update(
+        poolclass=MeteredQueuePool,
+        pool_size=env_int('DB_POOL_SIZE', 5),
+        max_overflow=env_int('DB_MAX_OVERFLOW', 10),
+        pool_timeout=env_int('DB_POOL_TIMEOUT', 30),
+    )
+statement_timeout = env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+if statement_timeout and database_url.get_backend_name() == 'postgresql':
+    engine_options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+
+# SQLite production mode: WAL lets readers run alongside the one writer, and
+# busy_timeout makes a writer queue for the lock instead of failing with
+# "database is locked". synchronous=NORMAL is durable under WAL except for the
+# last commits before a power loss. Off by default: it changes how transactions
+# begin, so deployments serving concurrent writers from one SQLite file turn it
+# on with SQLITE_PRODUCTION_MODE=1.
+app.config['SQLITE_PRODUCTION_MODE'] = env_bool('SQLITE_PRODUCTION_MODE', False)
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = env_int('SQLITE_BUSY_TIMEOUT_MS', 10000)
+app.config['SQLITE_MMAP_SIZE'] = env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+app.config['SQLITE_CACHE_SIZE_KB'] = env_int('SQLITE_CACHE_SIZE_KB', 64 * 1024)
+app.config['SQLITE_CHECKPOINT_INTERVAL'] = env_int('SQLITE_CHECKPOINT_INTERVAL', 300)
+
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url.render_as_string(hide_password=False)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'supersecret'
+app.config['BCRYPT_LOG_ROUNDS'] = 12
+app.config['PASSWORD_HASH_WORKERS'] = os.cpu_count() or 1
+app.config['PASSWORD_HASH_MAX_PENDING'] = 64
 app.config['JWT_BLACKLIST_ENABLED'] = True
 app.config['JWT_BLACKLIST_TOKEN_CHECKS'] = ['access']
+app.config['RESPONSE_CACHE_MAX_BYTES'] = 32 * 1024 * 1024
+app.config['RESPONSE_CACHE_TTL'] = 300
+app.config['RESPONSE_CACHE_SYNC_INTERVAL'] = 1
+app.config['JWT_BLOCKLIST_SYNC_INTERVAL'] = 1
+app.config['JWT_BLOCKLIST_PRUNE_INTERVAL'] = 600
+app.config['JWT_BLOCKLIST_SYNC_OVERLAP'] = 30
+app.config['JWT_BLOCKLIST_BLOOM_CAPACITY'] = 100000
+app.config['ORDER_STREAM_HEARTBEAT'] = 15
+app.config['ORDER_STREAM_QUEUE_SIZE'] = 256
+app.config['ORDER_STREAM_REPLAY'] = 1024
+app.config['JSON_ENCODER'] = os.environ.get('JSON_ENCODER', 'auto')
+app.config['JSON_COMPACT'] = env_bool('JSON_COMPACT', True)
+app.config['COMPRESS_MIN_SIZE'] = env_int('COMPRESS_MIN_SIZE', 1024)
+app.config['COMPRESS_LEVEL'] = env_int('COMPRESS_LEVEL', 6)
+app.config['COMPRESS_CACHE_MAX_BYTES'] = 16 * 1024 * 1024
+app.config['SEARCH_FUZZY_THRESHOLD'] = 0.3
+app.config['SEARCH_FUZZY_TTL'] = 300
+app.config['RECOMMENDATIONS_TOP_K'] = 20
+app.config['RECOMMENDATIONS_REBUILD_INTERVAL'] = env_int('RECOMMENDATIONS_REBUILD_INTERVAL', 3600)
+app.config['KITCHEN_DEFAULT_PREP_SECONDS'] = 600
+app.config['KITCHEN_ETA_ALPHA'] = 0.2
+app.config['KITCHEN_QUEUE_RESYNC'] = env_int('KITCHEN_QUEUE_RESYNC', 30)
 
-app.json.compact = False
+app.json = FastJSONProvider(app)
+app.json.compact = app.config['JSON_COMPACT']
+app.json.sort_keys = False  # keep the serializers' field order
 
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
+app.config['CORS_ORIGINS'] = ["http://localhost:3000"]
+CORS(app, resources={r"/*": {"origins": app.config['CORS_ORIGINS']}}, supports_credentials=True)
 
 metadata = MetaData(naming_convention={
+    "ix": "ix_%(column_0_label)s",
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 
@@ -27,12 +106,52 @@ db = SQLAlchemy(metadata=metadata)
 migrate = Migrate(app, db)
 db.init_app(app)
 
+def sqlite_pragmas():
+    return (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT_MS']}",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={app.config['SQLITE_MMAP_SIZE']}",
+        f"PRAGMA cache_size=-{app.config['SQLITE_CACHE_SIZE_KB']}",
+    )
+
+
+@event.listens_for(Engine, 'connect')
+def configure_sqlite(dbapi_connection, connection_record):
+    if not app.config['SQLITE_PRODUCTION_MODE'] or not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+    # Reads run outside a transaction, and a transaction starts with BEGIN
+    # IMMEDIATE at the first write. A read transaction that later writes can't
+    # wait for the lock (SQLite fails it with "database is locked" whatever
+    # busy_timeout says); taking the write lock up front lets it queue.
+    dbapi_connection.isolation_level = None
+
+
+SQLITE_WRITES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER')
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def begin_sqlite_write(conn, cursor, statement, parameters, context, executemany):
+    dbapi_connection = conn.connection.dbapi_connection
+    if (
+        isinstance(dbapi_connection, sqlite3.Connection) and dbapi_connection.isolation_level is None
+        and not dbapi_connection.in_transaction and statement.lstrip()[:7].upper().startswith(SQLITE_WRITES)
+    ):
+        dbapi_connection.execute("BEGIN IMMEDIATE")
+
 bcrypt = Bcrypt(app)
 api = Api(app)
 jwt = JWTManager(app)
-jwt_blacklist = set()
 
-@jwt.token_in_blocklist_loader
-def check_if_token_revoked(jwt_header, jwt_payload):
-    jti = jwt_payload["jti"]
-    return jti in jwt_blacklist
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    # Flask-RESTful's default goes through json.dumps; use app.json instead.
+    response = app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
@@ -0,0 +1,177 @@
+from functools import lru_cache
+
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from models import User, Cuisine, Outlet, MenuItem, Table, Order, OrderItem, Reservation
+from serializers import (
+    compile_serializer, USER_COLUMNS, CUISINE_COLUMNS, OUTLET_COLUMNS, MENU_ITEM_COLUMNS, ORDER_COLUMNS,
+    ORDER_ITEM_COLUMNS, TABLE_COLUMNS, RESERVATION_COLUMNS, ORDER_FORMATS, RESERVATION_FORMATS,
+)
+
+# Sparse fieldsets and includes. A resource describes the largest response it
+# can give as a tree of shapes, plus the relationships it embeds by default.
+#
+#     ?include=outlet,outlet.cuisine   embed these relationships (empty: none)
+#     ?fields=id,name,outlet.name      only these columns at each level named,
+#                                      and only the relationships named
+#
+# The request compiles to a serializer and to load_only/eager-load options, so
+# columns and relationships nobody asked for are never selected. Without either
+# parameter the response is unchanged.
+
+
+class Shape:
+
+    def __init__(self, model, columns, formats=None, relations=()):
+        # relations: (name, shape, loader) in output order.
+        self.model = model
+        self.columns = tuple(columns)
+        self.formats = formats or {}
+        self.relations = tuple(relations)
+
+
+USER = Shape(User, USER_COLUMNS)
+CUISINE = Shape(Cuisine, CUISINE_COLUMNS)
+TABLE = Shape(Table, TABLE_COLUMNS)
+ORDER_ROW = Shape(Order, ORDER_COLUMNS, ORDER_FORMATS)
+RESERVATION_ROW = Shape(Reservation, RESERVATION_COLUMNS, RESERVATION_FORMATS)
+OWNER = Shape(User, USER_COLUMNS, relations=(
+    ('orders', ORDER_ROW, selectinload),
+    ('reservations', RESERVATION_ROW, selectinload),
+))
+OUTLET = Shape(Outlet, OUTLET_COLUMNS, relations=(
+    ('cuisine', CUISINE, joinedload),
+    ('owner', OWNER, joinedload),
+))
+MENU_ITEM = Shape(MenuItem, MENU_ITEM_COLUMNS, relations=(
+    ('outlet', OUTLET, selectinload),
+))
+ORDER_ITEM = Shape(OrderItem, ORDER_ITEM_COLUMNS, relations=(
+    ('menu_item', MENU_ITEM, selectinload),
+))
+ORDER = Shape(Order, ORDER_COLUMNS, ORDER_FORMATS, relations=(
+    ('user', USER, joinedload),
+    ('order_items', ORDER_ITEM, selectinload),
+))
+RESERVATION = Shape(Reservation, RESERVATION_COLUMNS, RESERVATION_FORMATS, relations=(
+    ('user', Shape(User, ('id', 'name', 'email')), joinedload),
+    ('table', TABLE, joinedload),
+))
+
+
+def relationship_paths(shape, prefix=''):
+    for name, child, _ in shape.relations:
+        yield prefix + name
+        yield from relationship_paths(child, f"{prefix}{name}.")
+
+
+class Fieldset:
+
+    def __init__(self, shape, default=(), allowed=None):
+        # allowed limits the includes, e.g. to the tables a cached resource
+        # is invalidated by.
+        self.shape = shape
+        self.allowed = frozenset(allowed if allowed is not None else relationship_paths(shape))
+        self.default = frozenset(default)
+        self.default_serializer, self.default_options = self.compile()
+
+    def compile(self, include=None, fields=None):
+        return _compile(self, include, fields)
+
+    def from_request(self, args=None):
+        # Raises ValueError for a field or include the resource doesn't have.
+        args = request.args if args is None else args
+        include, fields = args.get('include'), args.get('fields')
+        if include is None and fields is None:
+            return self.default_serializer, self.default_options
+        return self.compile(_split(include), _split(fields))
+
+    def tables(self, args=None):
+        # The tables a request's response draws on: the shape's own and those
+        # of the relationships it includes. A request from_request rejects
+        # counts as including everything it may.
+        args = request.args if args is None else args
+        try:
+            include = _resolve(self, _split(args.get('include')), _split(args.get('fields')))
+        except ValueError:
+            include = self.allowed
+        return _tables(self.shape, include)
+
+
+def _split(value):
+    if value is None:
+        return None
+    return frozenset(part.strip() for part in value.split(',') if part.strip())
+
+
+@lru_cache(maxsize=512)
+def _compile(fieldset, include, fields):
+    include = _resolve(fieldset, include, fields)
+    return _compile_shape(fieldset.shape, '', include, fields or frozenset(), {})
+
+
+@lru_cache(maxsize=512)
+def _resolve(fieldset, include, fields):
+    # Listing fields replaces the default includes with the ones they name.
+    include = set(include if include is not None else () if fields else fieldset.default)
+    fields = fields or frozenset()
+    # A field naming a relationship, or a dotted path through one, embeds it,
+    # and so does a nested include.
+    include.update(field for field in fields if field in fieldset.allowed)
+    for path in (*fields, *include):
+        parts = path.split('.')[:-1]
+        include.update('.'.join(parts[:n]) for n in range(1, len(parts) + 1))
+    unknown = include - fieldset.allowed
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(sorted(unknown))}")
+    return frozenset(include)
+
+
+@lru_cache(maxsize=512)
+def _tables(shape, include, prefix=''):
+    tables = {shape.model.__tablename__}
+    for name, child, _ in shape.relations:
+        if prefix + name in include:
+            tables.update(_tables(child, include, f"{prefix}{name}."))
+    return frozenset(tables)
+
+
+def _attributes(mapper, columns):
+    keys = (mapper.get_property_by_column(column).key for column in columns)
+    return {key: getattr(mapper.class_, key) for key in keys}
+
+
+def _compile_shape(shape, prefix, include, fields, required):
+    mapper = inspect(shape.model)
+    named = {field[len(prefix):] for field in fields if field.startswith(prefix) and '.' not in field[len(prefix):]}
+    # Relationships embedded above; any other name, allowed or not, is unknown.
+    named -= {name for name, _, _ in shape.relations if prefix + name in include}
+    unknown = named - set(shape.columns)
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(sorted(prefix + name for name in unknown))}")
+    columns = tuple(column for column in shape.columns if column in named) if named else shape.columns
+
+    # Keys the loaders join on are selected even when they aren't returned.
+    load = {column: getattr(shape.model, column) for column in columns}
+    load.update(_attributes(mapper, mapper.primary_key))
+    load.update(required)
+
+    one, many, loaders = {}, {}, []
+    for name, child, loader in shape.relations:
+        if prefix + name not in include:
+            continue
+        relationship = mapper.relationships[name]
+        if relationship.direction.name == 'MANYTOONE':
+            load.update(_attributes(mapper, relationship.local_columns))
+            child_required = {}
+        else:
+            child_required = _attributes(inspect(child.model), relationship.remote_side)
+        serialize, options = _compile_shape(child, f"{prefix}{name}.", include, fields, child_required)
+        (many if relationship.uselist else one)[name] = serialize
+        loaders.append(loader(getattr(shape.model, name)).options(*options))
+
+    formats = {key: value for key, value in shape.formats.items() if key in columns}
+    serialize = compile_serializer(columns, formats=formats, one=one, many=many)
+    return serialize, (load_only(*(load[key] for key in sorted(load))), *loaders)
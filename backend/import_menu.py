@@ -0,0 +1,27 @@
+import argparse
+
+from app import app, db
+from models import Outlet
+from menu_import import FORMATS, import_menu_items, read_rows
+
+def import_menu(outlet_id, path, fmt=None):
+    fmt = fmt or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+    with app.app_context():
+        if not db.session.get(Outlet, outlet_id):
+            print(f"Outlet {outlet_id} not found.")
+            return
+        with open(path, newline='', encoding='utf-8') as f:
+            result = import_menu_items(outlet_id, read_rows(f, fmt), fmt)
+        db.session.commit()
+
+        print(f"Inserted {result['inserted']} and updated {result['updated']} menu items.")
+        for error in result['errors']:
+            print(f"Row {error['row']}: {error['error']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a CSV or NDJSON menu for an outlet.")
+    parser.add_argument('outlet_id', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=FORMATS)
+    args = parser.parse_args()
+    import_menu(args.outlet_id, args.path, args.format)
@@ -0,0 +1,79 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# JSON encoding for every response: app.json, jsonify and the Flask-RESTful
+# representation in config.py all go through FastJSONProvider. It uses the
+# fastest encoder installed (JSON_ENCODER=auto), or the one named, and falls
+# back to the stdlib. All three emit the same compact UTF-8 JSON. Values they
+# don't handle natively (dates, Decimal) go through Flask's default, so the
+# output doesn't depend on which encoder is installed. Pretty-printing
+# (compact False, or debug with compact None) always takes the stdlib path.
+
+
+def _orjson_dumps(obj, default, sort_keys):
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=default, option=option).decode()
+
+
+def _ujson_dumps(obj, default, sort_keys):
+    return ujson.dumps(obj, default=default, sort_keys=sort_keys, ensure_ascii=False, escape_forward_slashes=False)
+
+
+def _stdlib_dumps(obj, default, sort_keys):
+    return json.dumps(obj, default=default, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':'))
+
+
+ENCODERS = {
+    'orjson': _orjson_dumps if orjson else None,
+    'ujson': _ujson_dumps if ujson else None,
+    'json': _stdlib_dumps,
+}
+
+
+def select_encoder(name):
+    if name == 'auto':
+        name = next(name for name, dumps in ENCODERS.items() if dumps)
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JSON_ENCODER {name!r}; expected auto, {', '.join(ENCODERS)}")
+    if ENCODERS[name] is None:
+        raise ValueError(f"JSON_ENCODER is {name!r} but {name} is not installed")
+    return name, ENCODERS[name]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.encoder, self._dumps = select_encoder(app.config['JSON_ENCODER'])
+
+    def dumps(self, obj, **kwargs):
+        # separators only matter to the stdlib; anything else (indent, cls)
+        # needs it.
+        kwargs.pop('separators', None)
+        sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+        if kwargs:
+            return super().dumps(obj, sort_keys=sort_keys, **kwargs)
+        return self._dumps(obj, self.default, sort_keys)
+
+    def encode(self, obj):
+        # The body response() sends; the async app uses it directly.
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return f"{self.dumps(obj, indent=2)}\n"
+        return f"{self.dumps(obj)}\n"
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
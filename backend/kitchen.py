@@ -0,0 +1,248 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from config import app, db
+from models import KitchenTicket, MenuItem, OrderItem
+from serializers import KITCHEN_TICKET_COLUMNS, format_datetime, serialize_kitchen_ticket
+
+# Kitchen dispatch. Each order gets a ticket per outlet whose items it holds
+# (at checkout, or through POST /outlets/<id>/kitchen/queue), and a kitchen
+# claims the next one instead of re-reading every order: highest priority
+# first, then oldest. kitchen_tickets is the record; each outlet's queued
+# tickets are also held in a heap in this process, so enqueue, claim and
+# complete are O(log n). Claims and completions are conditional UPDATEs, so
+# two workers can't claim the same ticket. A heap entry another process
+# claimed fails its UPDATE and is skipped, and tickets enqueued elsewhere show
+# up when the heap is reloaded, at most KITCHEN_QUEUE_RESYNC seconds apart.
+#
+# ETAs come from a rolling (EWMA) estimate of the kitchen's busy seconds per
+# completed ticket: the time from a ticket's claim, or the previous completion
+# if that was later, to its completion. Parallel cooking shows up as short
+# gaps between completions. The n-th queued ticket is expected after the ones
+# in progress and the n - 1 ahead of it. Reloads seed the estimate from the
+# outlet's last completions, so restarts don't reset it.
+
+TICKET_FIELDS = tuple(getattr(KitchenTicket, column) for column in KITCHEN_TICKET_COLUMNS)
+RECENT_COMPLETIONS = 20
+
+
+def utc(value):
+    # SQLite hands datetimes back naive; they are UTC.
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+def _key(ticket):
+    return (-ticket.priority, utc(ticket.created_at), ticket.id)
+
+
+class OutletQueue:
+
+    def __init__(self, outlet_id, prep_seconds, alpha, resync):
+        self.outlet_id = outlet_id
+        self.default_prep_seconds = prep_seconds
+        self.alpha = alpha
+        self.resync = resync
+        self.lock = threading.RLock()
+        self.heap = []     # (-priority, created_at, ticket id)
+        self.tickets = {}  # queued ticket id -> serialized ticket
+        self.in_progress = 0
+        self.prep_seconds = prep_seconds
+        self.last_completed = None
+        self.loaded_at = None
+
+    def _load(self):
+        # Called with the lock held.
+        outlet = KitchenTicket.outlet_id == self.outlet_id
+        rows = db.session.execute(select(*TICKET_FIELDS).where(outlet, KitchenTicket.status == 'queued')).all()
+        self.heap = [_key(row) for row in rows]
+        heapq.heapify(self.heap)
+        self.tickets = {row.id: serialize_kitchen_ticket(row) for row in rows}
+        self.in_progress = db.session.scalar(
+            select(func.count()).select_from(KitchenTicket).where(outlet, KitchenTicket.status == 'claimed')
+        )
+        recent = db.session.execute(
+            select(KitchenTicket.claimed_at, KitchenTicket.completed_at)
+            .where(outlet, KitchenTicket.status == 'done')
+            .order_by(KitchenTicket.completed_at.desc())
+            .limit(RECENT_COMPLETIONS)
+        ).all()
+        self.prep_seconds, self.last_completed = self.default_prep_seconds, None
+        for claimed_at, completed_at in reversed(recent):
+            self._observe(utc(claimed_at), utc(completed_at))
+        self.loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > self.resync:
+            self._load()
+
+    def _observe(self, claimed_at, completed_at):
+        if claimed_at is None or completed_at is None:
+            return
+        start = max(claimed_at, self.last_completed) if self.last_completed else claimed_at
+        busy = max((completed_at - start).total_seconds(), 0)
+        self.prep_seconds += self.alpha * (busy - self.prep_seconds)
+        self.last_completed = max(completed_at, self.last_completed) if self.last_completed else completed_at
+
+    def add(self, key, ticket):
+        with self.lock:
+            if self.loaded_at is not None and key[2] not in self.tickets:
+                heapq.heappush(self.heap, key)
+                self.tickets[key[2]] = ticket
+
+    def discard(self, ticket_id, status):
+        # The heap entry stays until it is popped or the heap is compacted.
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            if status == 'claimed':
+                self.in_progress = max(self.in_progress - 1, 0)
+            if self.tickets.pop(ticket_id, None) is not None and len(self.heap) > 2 * len(self.tickets) + 64:
+                self.heap = [key for key in self.heap if key[2] in self.tickets]
+                heapq.heapify(self.heap)
+
+    def claim(self):
+        with self.lock:
+            self._ensure_loaded()
+            while self.heap:
+                ticket_id = heapq.heappop(self.heap)[2]
+                if self.tickets.pop(ticket_id, None) is None:
+                    continue
+                claimed = db.session.execute(
+                    update(KitchenTicket)
+                    .where(KitchenTicket.id == ticket_id, KitchenTicket.status == 'queued')
+                    .values(status='claimed', claimed_at=datetime.now(timezone.utc))
+                )
+                if claimed.rowcount == 1:
+                    db.session.commit()
+                    self.in_progress += 1
+                    return db.session.get(KitchenTicket, ticket_id)
+            db.session.rollback()
+            return None
+
+    def completed(self, claimed_at, completed_at):
+        with self.lock:
+            if self.loaded_at is not None:
+                self.in_progress = max(self.in_progress - 1, 0)
+                self._observe(claimed_at, completed_at)
+
+    def snapshot(self, limit):
+        with self.lock:
+            self._ensure_loaded()
+            ahead = self.in_progress
+            prep_seconds = self.prep_seconds
+            stale = len(self.heap) - len(self.tickets)
+            queued = [
+                self.tickets[key[2]] for key in heapq.nsmallest(limit + stale, self.heap) if key[2] in self.tickets
+            ][:limit]
+        now = datetime.now(timezone.utc)
+        tickets = []
+        for position, ticket in enumerate(queued):
+            eta_seconds = round((ahead + position + 1) * prep_seconds)
+            tickets.append({
+                **ticket,
+                "position": position + 1,
+                "eta_seconds": eta_seconds,
+                "eta": format_datetime(now + timedelta(seconds=eta_seconds)),
+            })
+        return {
+            "outlet_id": self.outlet_id,
+            "queued": len(self.tickets),
+            "in_progress": ahead,
+            "prep_seconds": round(prep_seconds, 1),
+            "tickets": tickets,
+        }
+
+
+class KitchenQueues:
+
+    def __init__(self, prep_seconds, alpha, resync):
+        self.prep_seconds = prep_seconds
+        self.alpha = alpha
+        self.resync = resync
+        self.lock = threading.Lock()
+        self.queues = {}
+
+    def queue(self, outlet_id):
+        with self.lock:
+            queue = self.queues.get(outlet_id)
+            if queue is None:
+                queue = self.queues[outlet_id] = OutletQueue(outlet_id, self.prep_seconds, self.alpha, self.resync)
+            return queue
+
+    def complete(self, ticket):
+        completed_at = datetime.now(timezone.utc)
+        done = db.session.execute(
+            update(KitchenTicket)
+            .where(KitchenTicket.id == ticket.id, KitchenTicket.status == 'claimed')
+            .values(status='done', completed_at=completed_at)
+        )
+        if done.rowcount != 1:
+            db.session.rollback()
+            return False
+        db.session.commit()
+        self.queue(ticket.outlet_id).completed(utc(ticket.claimed_at), completed_at)
+        return True
+
+    def stats(self):
+        with self.lock:
+            queues = list(self.queues.values())
+        return {
+            "outlets": len(queues),
+            "queued": sum(len(queue.tickets) for queue in queues),
+            "in_progress": sum(queue.in_progress for queue in queues),
+        }
+
+
+kitchen_queues = KitchenQueues(
+    app.config['KITCHEN_DEFAULT_PREP_SECONDS'], app.config['KITCHEN_ETA_ALPHA'], app.config['KITCHEN_QUEUE_RESYNC'],
+)
+
+
+def order_outlets(order_id):
+    return set(db.session.scalars(
+        select(MenuItem.outlet_id).join(OrderItem, OrderItem.menuitem_id == MenuItem.id)
+        .where(OrderItem.order_id == order_id).distinct()
+    ))
+
+
+def enqueue_order(order, priority=0):
+    # A ticket for each outlet the order's lines come from.
+    for outlet_id in sorted({line.menu_item.outlet_id for line in order.order_items}):
+        db.session.add(KitchenTicket(order_id=order.id, outlet_id=outlet_id, priority=priority))
+
+
+# ------------------ WRITE TRACKING ------------------ #
+@event.listens_for(Session, 'after_flush')
+def _track_tickets(session, flush_context):
+    # Deleted directly or through their order or outlet (or that one's user or
+    # cuisine); the heaps drop them once the delete commits.
+    session.info.setdefault('kitchen_removed', []).extend(
+        (obj.id, obj.outlet_id, obj.status) for obj in session.deleted if isinstance(obj, KitchenTicket)
+    )
+    ids = [obj.id for obj in session.new if isinstance(obj, KitchenTicket)]
+    if not ids:
+        return
+    # created_at is a server default; read the rows back.
+    rows = session.connection().execute(select(*TICKET_FIELDS).where(KitchenTicket.id.in_(ids))).all()
+    session.info.setdefault('kitchen_tickets', []).extend(
+        (row.outlet_id, _key(row), serialize_kitchen_ticket(row)) for row in rows
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _queue_tickets(session):
+    for outlet_id, key, ticket in session.info.pop('kitchen_tickets', ()):
+        kitchen_queues.queue(outlet_id).add(key, ticket)
+    for ticket_id, outlet_id, status in session.info.pop('kitchen_removed', ()):
+        kitchen_queues.queue(outlet_id).discard(ticket_id, status)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tickets(session):
+    session.info.pop('kitchen_tickets', None)
+    session.info.pop('kitchen_removed', None)
@@ -0,0 +1,98 @@
+import csv
+import json
+from collections import defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from config import db
+from models import MenuItem
+
+# Bulk menu import: rows are streamed from CSV or NDJSON, validated, and
+# upserted by (outlet_id, name) with batched INSERT ... ON CONFLICT DO UPDATE
+# statements, so concurrent imports of the same dish update one row rather
+# than each inserting it. The caller owns the transaction.
+
+BATCH_SIZE = 500
+FORMATS = ('csv', 'ndjson')
+
+
+def read_rows(stream, fmt):
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def _price(value, fmt):
+    # CSV cells are all text. NDJSON prices have to be JSON numbers; a quoted
+    # price or true is a mistake in the file, not something to coerce.
+    if fmt == 'csv' and isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    elif isinstance(value, int) and not isinstance(value, bool):
+        return value
+    elif isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError("price must be a whole number.")
+
+
+def validate_row(row, fmt):
+    if not isinstance(row, dict):
+        raise ValueError("Row is not a valid record.")
+    name = (row.get('name') or '').strip()
+    if not name:
+        raise ValueError("name is required.")
+    price = _price(row.get('price'), fmt)
+    if price < 0:
+        raise ValueError("price must not be negative.")
+    item = {'name': name, 'price': price}
+    for field in ('description', 'category'):
+        if row.get(field) is not None:
+            item[field] = str(row[field]).strip()
+    return item
+
+
+def _batches(rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield rows[start:start + BATCH_SIZE]
+
+
+def import_menu_items(outlet_id, rows, fmt):
+    items, errors = {}, []
+    for number, row in enumerate(rows, start=1):
+        try:
+            item = validate_row(row, fmt)
+        except ValueError as e:
+            errors.append({"row": number, "error": str(e)})
+            continue
+        # A later row for the same dish replaces an earlier one.
+        items[item['name']] = item
+
+    # Only for the counts; the upsert itself doesn't depend on this read.
+    existing = set(db.session.scalars(select(MenuItem.name).where(MenuItem.outlet_id == outlet_id)))
+    updated = len(items.keys() & existing)
+
+    # Rows only overwrite the fields they carry, so they're grouped by those.
+    groups = defaultdict(list)
+    for item in items.values():
+        groups[tuple(sorted(item))].append({'outlet_id': outlet_id, **item})
+    dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    for fields, group in groups.items():
+        stmt = dialect_insert(MenuItem)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['outlet_id', 'name'],
+            set_={field: stmt.excluded[field] for field in fields if field != 'name'},
+        )
+        for batch in _batches(group):
+            db.session.execute(stmt, batch)
+
+    return {"inserted": len(items) - updated, "updated": updated, "errors": errors}
@@ -90,9 +90,20 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # The full-text search index (search.py) is managed by hand-written
+    # migrations; keep autogenerate from proposing to drop it.
+    def include_name(name, type_, parent_names):
+        if type_ == 'table':
+            return not name.startswith('search_index')
+        if type_ == 'index':
+            return not name.startswith('ix_search_')
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
@@ -0,0 +1,44 @@
+"""add daily sales rollups
+
+Revision ID: 3b1f7c2d9a10
+Revises: 650d652663e0
+Create Date: 2026-10-16 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f7c2d9a10'
+down_revision = '650d652663e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('outlet_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('menuitem_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('outlet_id', 'day', 'menuitem_id')
+    )
+    op.create_table('daily_outlet_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('outlet_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('outlet_id', 'day', 'status')
+    )
+
+
+def downgrade():
+    op.drop_table('daily_outlet_orders')
+    op.drop_table('daily_sales')
@@ -0,0 +1,39 @@
+"""add kitchen tickets
+
+Revision ID: 4b68f44e5639
+Revises: fa60288a335c
+Create Date: 2026-10-16 21:22:33.851719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b68f44e5639'
+down_revision = 'fa60288a335c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('kitchen_tickets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('outlet_id', sa.Integer(), nullable=False),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], name=op.f('fk_kitchen_tickets_order_id_orders')),
+    sa.ForeignKeyConstraint(['outlet_id'], ['outlets.id'], name=op.f('fk_kitchen_tickets_outlet_id_outlets')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('order_id', 'outlet_id')
+    )
+    op.create_index('ix_kitchen_tickets_outlet_id_status', 'kitchen_tickets', ['outlet_id', 'status', 'completed_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_kitchen_tickets_outlet_id_status', table_name='kitchen_tickets')
+    op.drop_table('kitchen_tickets')
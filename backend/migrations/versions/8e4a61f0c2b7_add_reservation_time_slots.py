@@ -0,0 +1,69 @@
+"""add reservation time slots
+
+Revision ID: 8e4a61f0c2b7
+Revises: 3b1f7c2d9a10
+Create Date: 2026-10-16 14:03:18.551902
+
+"""
+from datetime import datetime, time, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4a61f0c2b7'
+down_revision = '3b1f7c2d9a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reservations', sa.Column('duration', sa.Integer(), server_default='90', nullable=False))
+    op.add_column('reservations', sa.Column('end_time', sa.Time(), nullable=True))
+    op.create_index('ix_reservations_table_slot', 'reservations', ['table_id', 'booking_date', 'booking_time'], unique=False)
+
+    # Backfill end_time for existing bookings; slots stop at midnight.
+    reservations = sa.table('reservations',
+        sa.column('id', sa.Integer()),
+        sa.column('table_id', sa.Integer()),
+        sa.column('booking_date', sa.Date()),
+        sa.column('booking_time', sa.Time()),
+        sa.column('duration', sa.Integer()),
+        sa.column('end_time', sa.Time()),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(
+        reservations.c.id, reservations.c.booking_date, reservations.c.booking_time, reservations.c.duration
+    )).all()
+    for id, booking_date, booking_time, duration in rows:
+        start = datetime.combine(booking_date, booking_time)
+        end = start + timedelta(minutes=duration)
+        connection.execute(
+            reservations.update().where(reservations.c.id == id)
+            .values(end_time=end.time() if end.date() == start.date() else time.max)
+        )
+
+    # Bookings used to flip tables.is_available to 'No', and only deleting the
+    # booking flipped it back. Availability now comes from the booked interval
+    # and 'No' means out of service, so clear the flag on tables that have been
+    # booked. A table set to 'No' without ever being booked keeps it.
+    tables = sa.table('tables', sa.column('id', sa.Integer()), sa.column('is_available', sa.String()))
+    booked = sa.select(reservations.c.id).where(reservations.c.table_id == tables.c.id).exists()
+    connection.execute(tables.update().where(tables.c.is_available == 'No', booked).values(is_available='Yes'))
+
+
+def downgrade():
+    # Put the legacy flag back on tables that still hold a booking.
+    tables = sa.table('tables', sa.column('id', sa.Integer()), sa.column('is_available', sa.String()))
+    reservations = sa.table('reservations', sa.column('table_id', sa.Integer()), sa.column('status', sa.String()))
+    booked = sa.select(reservations.c.table_id).where(
+        reservations.c.table_id == tables.c.id,
+        sa.or_(reservations.c.status.is_(None), sa.func.lower(reservations.c.status) != 'cancelled'),
+    ).exists()
+    op.get_bind().execute(tables.update().where(booked).values(is_available='No'))
+
+    op.drop_index('ix_reservations_table_slot', table_name='reservations')
+    with op.batch_alter_table('reservations') as batch_op:
+        batch_op.drop_column('end_time')
+        batch_op.drop_column('duration')
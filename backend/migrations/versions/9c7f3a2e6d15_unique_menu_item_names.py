@@ -0,0 +1,43 @@
+"""unique menu item names per outlet
+
+Revision ID: 9c7f3a2e6d15
+Revises: b5d0e2c7a913
+Create Date: 2026-10-17 10:12:44.306218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c7f3a2e6d15'
+down_revision = 'b5d0e2c7a913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Menu imports upsert on (outlet_id, name). Older duplicates keep their
+    # rows, and their order history, under a name suffixed with their id; the
+    # lowest id keeps the plain name.
+    menu_items = sa.table('menu_items',
+        sa.column('id', sa.Integer()),
+        sa.column('outlet_id', sa.Integer()),
+        sa.column('name', sa.String()),
+    )
+    connection = op.get_bind()
+    first = sa.select(sa.func.min(menu_items.c.id)).group_by(menu_items.c.outlet_id, menu_items.c.name)
+    duplicates = connection.execute(
+        sa.select(menu_items.c.id, menu_items.c.name)
+        .where(menu_items.c.outlet_id.is_not(None), menu_items.c.name.is_not(None), menu_items.c.id.not_in(first))
+    ).all()
+    for id, name in duplicates:
+        connection.execute(menu_items.update().where(menu_items.c.id == id).values(name=f"{name} ({id})"))
+
+    op.drop_index('ix_menu_items_outlet_id_name', table_name='menu_items')
+    op.create_index('ix_menu_items_outlet_id_name', 'menu_items', ['outlet_id', 'name'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_menu_items_outlet_id_name', table_name='menu_items')
+    op.create_index('ix_menu_items_outlet_id_name', 'menu_items', ['outlet_id', 'name'], unique=False)
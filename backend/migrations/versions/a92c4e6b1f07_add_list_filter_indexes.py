@@ -0,0 +1,31 @@
+"""add list filter indexes
+
+Revision ID: a92c4e6b1f07
+Revises: d7a3e9f1c605
+Create Date: 2026-10-16 21:12:40.318205
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a92c4e6b1f07'
+down_revision = 'd7a3e9f1c605'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_orders_created_at', 'orders', ['created_at']),
+    ('ix_orders_status', 'orders', ['status']),
+    ('ix_reservations_status', 'reservations', ['status']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
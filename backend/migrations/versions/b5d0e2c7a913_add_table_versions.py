@@ -0,0 +1,30 @@
+"""add table versions
+
+Revision ID: b5d0e2c7a913
+Revises: 4b68f44e5639
+Create Date: 2026-10-16 23:41:08.217364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d0e2c7a913'
+down_revision = '4b68f44e5639'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
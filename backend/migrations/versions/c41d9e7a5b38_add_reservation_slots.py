@@ -0,0 +1,76 @@
+"""add reservation slots
+
+Revision ID: c41d9e7a5b38
+Revises: 8e4a61f0c2b7
+Create Date: 2026-10-16 15:21:07.318442
+
+"""
+from datetime import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d9e7a5b38'
+down_revision = '8e4a61f0c2b7'
+branch_labels = None
+depends_on = None
+
+SLOT_MINUTES = 15
+
+
+def upgrade():
+    slots = op.create_table('reservation_slots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reservation_id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=False),
+    sa.Column('booking_date', sa.Date(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['reservation_id'], ['reservations.id'], name=op.f('fk_reservation_slots_reservation_id_reservations')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('table_id', 'booking_date', 'slot')
+    )
+
+    # Backfill slots for live bookings. Where existing bookings already
+    # overlap, the earlier one keeps the table.
+    reservations = sa.table('reservations',
+        sa.column('id', sa.Integer()),
+        sa.column('table_id', sa.Integer()),
+        sa.column('booking_date', sa.Date()),
+        sa.column('booking_time', sa.Time()),
+        sa.column('end_time', sa.Time()),
+        sa.column('status', sa.String()),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(
+            reservations.c.id, reservations.c.table_id, reservations.c.booking_date,
+            reservations.c.booking_time, reservations.c.end_time,
+        )
+        .where(
+            reservations.c.table_id.isnot(None),
+            reservations.c.end_time.isnot(None),
+            sa.or_(reservations.c.status.is_(None), sa.func.lower(reservations.c.status) != 'cancelled'),
+        )
+        .order_by(reservations.c.id)
+    ).all()
+    taken = set()
+    backfill = []
+    for id, table_id, booking_date, booking_time, end_time in rows:
+        start = booking_time.hour * 60 + booking_time.minute
+        end = 24 * 60 if end_time == time.max else end_time.hour * 60 + end_time.minute
+        keys = [(table_id, booking_date, slot) for slot in range(start // SLOT_MINUTES, -(-end // SLOT_MINUTES))]
+        if taken.intersection(keys):
+            continue
+        taken.update(keys)
+        backfill.extend(
+            {'reservation_id': id, 'table_id': table_id, 'booking_date': booking_date, 'slot': slot}
+            for table_id, booking_date, slot in keys
+        )
+    if backfill:
+        op.bulk_insert(slots, backfill)
+
+
+def downgrade():
+    op.drop_table('reservation_slots')
@@ -0,0 +1,38 @@
+"""add lookup indexes
+
+Revision ID: d7a3e9f1c605
+Revises: 5f2b8c0d7e14
+Create Date: 2026-10-16 17:36:12.902614
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3e9f1c605'
+down_revision = '5f2b8c0d7e14'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_menu_items_outlet_id_name', 'menu_items', ['outlet_id', 'name']),
+    ('ix_order_items_menuitem_id', 'order_items', ['menuitem_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_orders_user_id', 'orders', ['user_id']),
+    ('ix_outlets_cuisine_id', 'outlets', ['cuisine_id']),
+    ('ix_outlets_owner_id', 'outlets', ['owner_id']),
+    ('ix_reservation_slots_reservation_id', 'reservation_slots', ['reservation_id']),
+    ('ix_reservations_booking_date', 'reservations', ['booking_date']),
+    ('ix_reservations_order_id', 'reservations', ['order_id']),
+    ('ix_reservations_user_id', 'reservations', ['user_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,74 @@
+"""add search index
+
+Revision ID: e3b8d51a9c26
+Revises: a92c4e6b1f07
+Create Date: 2026-10-16 23:05:12.640915
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b8d51a9c26'
+down_revision = 'a92c4e6b1f07'
+branch_labels = None
+depends_on = None
+
+# (kind code, table, name, category, description), as in search.SOURCES.
+SOURCES = [
+    (1, 'outlets', 'name', None, 'description'),
+    (2, 'menu_items', 'name', 'category', 'description'),
+    (3, 'cuisines', 'name', None, None),
+]
+COLUMNS = 'name, category, description'
+
+
+def _values(row, columns):
+    return ', '.join(f"{row}.{column}" if column else 'NULL' for column in columns)
+
+
+def _tsvector(columns):
+    return ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{label}')"
+        for column, label in zip(columns, 'ABC') if column
+    )
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for code, table, *columns in SOURCES:
+            op.execute(f"CREATE INDEX ix_search_{table} ON {table} USING gin (({_tsvector(columns)}))")
+        return
+    if dialect != 'sqlite':
+        return
+
+    op.execute(
+        f"CREATE VIRTUAL TABLE search_index USING fts5({COLUMNS}, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    for code, table, *columns in SOURCES:
+        insert = "INSERT INTO search_index(rowid, {columns}) VALUES ({row}.id * 4 + {code}, {values});"
+        delete = "DELETE FROM search_index WHERE rowid = old.id * 4 + {code};".format(code=code)
+        new = insert.format(columns=COLUMNS, row='new', code=code, values=_values('new', columns))
+        watched = ', '.join(column for column in columns if column)
+        op.execute(f"CREATE TRIGGER search_{table}_insert AFTER INSERT ON {table} BEGIN {new} END")
+        op.execute(f"CREATE TRIGGER search_{table}_update AFTER UPDATE OF {watched} ON {table} BEGIN {delete} {new} END")
+        op.execute(f"CREATE TRIGGER search_{table}_delete AFTER DELETE ON {table} BEGIN {delete} END")
+        values = ', '.join(column or 'NULL' for column in columns)
+        op.execute(f"INSERT INTO search_index(rowid, {COLUMNS}) SELECT id * 4 + {code}, {values} FROM {table}")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for code, table, *columns in reversed(SOURCES):
+            op.execute(f"DROP INDEX ix_search_{table}")
+        return
+    if dialect != 'sqlite':
+        return
+
+    for code, table, *columns in reversed(SOURCES):
+        for action in ('delete', 'update', 'insert'):
+            op.execute(f"DROP TRIGGER search_{table}_{action}")
+    op.execute("DROP TABLE search_index")
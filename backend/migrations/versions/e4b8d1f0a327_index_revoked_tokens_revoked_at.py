@@ -0,0 +1,25 @@
+"""index revoked tokens by revoked_at
+
+Revision ID: e4b8d1f0a327
+Revises: 9c7f3a2e6d15
+Create Date: 2026-10-17 11:05:21.517043
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d1f0a327'
+down_revision = '9c7f3a2e6d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The blocklist sync re-reads recent revocations by revoked_at.
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens')
@@ -0,0 +1,36 @@
+"""add hourly sales rollups
+
+Revision ID: fa60288a335c
+Revises: e3b8d51a9c26
+Create Date: 2026-10-16 21:14:38.311476
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa60288a335c'
+down_revision = 'e3b8d51a9c26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hourly_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('outlet_id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('menuitem_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('outlet_id', 'hour', 'menuitem_id')
+    )
+    op.create_index('ix_hourly_sales_hour', 'hourly_sales', ['hour'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hourly_sales_hour', table_name='hourly_sales')
+    op.drop_table('hourly_sales')
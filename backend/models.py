@@ -1,9 +1,10 @@
-from sqlalchemy.orm import validates
+from datetime import datetime, time, timedelta
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.sql import func
 
-from config import db, bcrypt
+from config import db
+from passwords import password_hasher
 
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
@@ -26,26 +27,16 @@ class User(db.Model, SerializerMixin):
 
     @password_hash.setter
     def password_hash(self, password):
-        hashed_password = bcrypt.generate_password_hash(password.encode('utf-8')).decode('utf-8')
-        self._password_hash = hashed_password
+        self._password_hash = password_hasher.hash(password)
 
     def authenticate(self, password):
-        return bcrypt.check_password_hash(self._password_hash, password.encode('utf-8'))
-    
-    @validates('name')
-    def validate_name(self, key, name):
-        existing = User.query.filter_by(name=name).first()
-        if existing:
-            raise ValueError("Username must be unique.")
-        return name
-    
-    @validates('email')
-    def validate_email(self, key, email):
-        existing = User.query.filter_by(email=email).first()
-        if existing:
-            raise ValueError("Email must be unique.")
-        return email
-    
+        if not password_hasher.verify(self._password_hash, password):
+            return False
+        # Upgrade hashes made under an older cost factor; the caller commits.
+        if password_hasher.needs_rehash(self._password_hash):
+            self.password_hash = password
+        return True
+
     def __repr__(self):
         return f"<Customer {self.name}, Email: {self.email}>"
     
@@ -65,26 +56,28 @@ class Cuisine(db.Model, SerializerMixin):
 
 class Outlet(db.Model, SerializerMixin):
     __tablename__ = 'outlets'
-    serialize_rules = ('-cuisine.outlets', '-menu_items.outlet', '-owner.outlets')
+    serialize_rules = ('-cuisine.outlets', '-menu_items.outlet', '-owner.outlets', '-kitchen_tickets')
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String)
     contact = db.Column(db.String)
     img_url = db.Column(db.String)
-    cuisine_id = db.Column(db.Integer, db.ForeignKey('cuisines.id'))
+    cuisine_id = db.Column(db.Integer, db.ForeignKey('cuisines.id'), index=True)
     description = db.Column(db.String)
 
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
 
     owner = db.relationship('User', back_populates='outlets')
     cuisine = db.relationship('Cuisine', back_populates='outlets')
     menu_items = db.relationship('MenuItem', back_populates='outlet', cascade='all, delete-orphan')
+    kitchen_tickets = db.relationship('KitchenTicket', back_populates='outlet', cascade='all')
     
     def __repr__(self):
         return f"<Outlet {self.name}, Contact: {self.contact}>"
 
 class MenuItem(db.Model, SerializerMixin):
     __tablename__ = 'menu_items'
+    __table_args__ = (db.Index('ix_menu_items_outlet_id_name', 'outlet_id', 'name', unique=True),)
     serialize_rules = ('-outlet.menu_items', '-order_items.menu_item',)
 
     id = db.Column(db.Integer, primary_key=True)
@@ -102,17 +95,18 @@ class MenuItem(db.Model, SerializerMixin):
 
 class Order(db.Model, SerializerMixin):
     __tablename__ = 'orders'
-    serialize_rules = ('-user.orders', '-order_items.order', '-reservation.order',)
+    serialize_rules = ('-user.orders', '-order_items.order', '-reservation.order', '-kitchen_tickets')
 
     id = db.Column(db.Integer, primary_key=True)
-    status = db.Column(db.String, nullable=False)
+    status = db.Column(db.String, nullable=False, index=True)
     total_price = db.Column(db.Float, nullable=False, default=0)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now(), index=True)
 
     user = db.relationship('User', back_populates='orders')
     order_items = db.relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
     reservation = db.relationship('Reservation', back_populates='order', uselist=False)
+    kitchen_tickets = db.relationship('KitchenTicket', back_populates='order', cascade='all')
     
     @property
     def user_summary(self):
@@ -132,10 +126,10 @@ class OrderItem(db.Model, SerializerMixin):
     serialize_rules = ('-order.order_items', '-menu_item.order_items',)
 
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'))
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), index=True)
     sub_total = db.Column(db.Float)
     quantity = db.Column(db.Integer)
-    menuitem_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'))
+    menuitem_id = db.Column(db.Integer, db.ForeignKey('menu_items.id'), index=True)
 
     order = db.relationship('Order', back_populates='order_items')
     menu_item = db.relationship('MenuItem', back_populates='order_items')
@@ -159,21 +153,27 @@ class Table(db.Model, SerializerMixin):
 
 class Reservation(db.Model, SerializerMixin):
     __tablename__ = 'reservations'
-    serialize_rules = ('-user.reservations', '-order.reservation', '-table.reservations',)
+    __table_args__ = (db.Index('ix_reservations_table_slot', 'table_id', 'booking_date', 'booking_time'),)
+    serialize_rules = ('-user.reservations', '-order.reservation', '-table.reservations', '-slots')
+
+    DEFAULT_DURATION = 90  # minutes
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), index=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), index=True)
     table_id = db.Column(db.Integer, db.ForeignKey('tables.id'))
-    booking_date = db.Column(db.Date, nullable=False)  
+    booking_date = db.Column(db.Date, nullable=False, index=True)
     booking_time = db.Column(db.Time, nullable=False)  
     no_of_people = db.Column(db.Integer)
-    status = db.Column(db.String)
+    status = db.Column(db.String, index=True)
+    duration = db.Column(db.Integer, nullable=False, default=DEFAULT_DURATION, server_default=str(DEFAULT_DURATION))
+    end_time = db.Column(db.Time)
     created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
 
     user = db.relationship('User', back_populates='reservations')
     order = db.relationship('Order', back_populates='reservation')
     table = db.relationship('Table', back_populates='reservations')
+    slots = db.relationship('ReservationSlot', back_populates='reservation', cascade='all, delete-orphan')
     
     @property
     def user_summary(self):
@@ -196,5 +196,141 @@ class Reservation(db.Model, SerializerMixin):
         }
 
 
+    @staticmethod
+    def slot_end(booking_date, booking_time, duration):
+        # Bookings are kept within their day; a slot running past midnight ends at midnight.
+        start = datetime.combine(booking_date, booking_time)
+        end = start + timedelta(minutes=duration)
+        return end.time() if end.date() == start.date() else time.max
+
+    def update_end_time(self):
+        self.end_time = Reservation.slot_end(self.booking_date, self.booking_time, self.duration or Reservation.DEFAULT_DURATION)
+
+    @property
+    def is_cancelled(self):
+        return (self.status or '').lower() == 'cancelled'
+
     def __repr__(self):
         return f"<Reservation ID: {self.id}, Table: {self.table_id}, Status: {self.status}>"
+
+class DailySales(db.Model, SerializerMixin):
+    __tablename__ = 'daily_sales'
+    __table_args__ = (db.UniqueConstraint('outlet_id', 'day', 'menuitem_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    outlet_id = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    menuitem_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailySales Outlet: {self.outlet_id}, Day: {self.day}, Item: {self.menuitem_id}, Qty: {self.quantity}>"
+
+class HourlySales(db.Model, SerializerMixin):
+    __tablename__ = 'hourly_sales'
+    __table_args__ = (db.UniqueConstraint('outlet_id', 'hour', 'menuitem_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    outlet_id = db.Column(db.Integer, nullable=False)
+    hour = db.Column(db.DateTime(timezone=True), nullable=False, index=True)
+    menuitem_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<HourlySales Outlet: {self.outlet_id}, Hour: {self.hour}, Item: {self.menuitem_id}, Qty: {self.quantity}>"
+
+class DailyOutletOrders(db.Model, SerializerMixin):
+    __tablename__ = 'daily_outlet_orders'
+    __table_args__ = (db.UniqueConstraint('outlet_id', 'day', 'status'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    outlet_id = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String, nullable=False)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyOutletOrders Outlet: {self.outlet_id}, Day: {self.day}, Status: {self.status}, Orders: {self.order_count}>"
+
+class ReservationSlot(db.Model, SerializerMixin):
+    # One row per table per SLOT_MINUTES block a live reservation covers. The
+    # unique constraint is what makes double booking impossible, even when two
+    # requests race.
+    __tablename__ = 'reservation_slots'
+    __table_args__ = (db.UniqueConstraint('table_id', 'booking_date', 'slot'),)
+    serialize_rules = ('-reservation.slots',)
+
+    SLOT_MINUTES = 15
+
+    id = db.Column(db.Integer, primary_key=True)
+    reservation_id = db.Column(db.Integer, db.ForeignKey('reservations.id'), nullable=False, index=True)
+    table_id = db.Column(db.Integer, nullable=False)
+    booking_date = db.Column(db.Date, nullable=False)
+    slot = db.Column(db.Integer, nullable=False)
+
+    reservation = db.relationship('Reservation', back_populates='slots')
+
+    @staticmethod
+    def slot_range(booking_time, end_time):
+        start = booking_time.hour * 60 + booking_time.minute
+        end = 24 * 60 if end_time == time.max else end_time.hour * 60 + end_time.minute
+        return range(start // ReservationSlot.SLOT_MINUTES, -(-end // ReservationSlot.SLOT_MINUTES))
+
+    def __repr__(self):
+        return f"<ReservationSlot Table: {self.table_id}, Date: {self.booking_date}, Slot: {self.slot}>"
+
+class RevokedToken(db.Model, SerializerMixin):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = (
+        db.Index('ix_revoked_tokens_expires_at', 'expires_at'),
+        db.Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    expires_at = db.Column(db.DateTime)
+    revoked_at = db.Column(db.DateTime, server_default=func.now())
+
+    def __repr__(self):
+        return f"<RevokedToken JTI: {self.jti}, Expires: {self.expires_at}>"
+
+class KitchenTicket(db.Model, SerializerMixin):
+    # One per order and outlet: the part of an order one kitchen prepares.
+    # status goes queued -> claimed -> done. Deleting the order or the outlet
+    # deletes its tickets. Not delete-orphan: tickets are created from ids.
+    __tablename__ = 'kitchen_tickets'
+    __table_args__ = (
+        db.UniqueConstraint('order_id', 'outlet_id'),
+        db.Index('ix_kitchen_tickets_outlet_id_status', 'outlet_id', 'status', 'completed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    outlet_id = db.Column(db.Integer, db.ForeignKey('outlets.id'), nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String, nullable=False, default='queued')
+    created_at = db.Column(db.DateTime(timezone=True), server_default=func.now())
+    claimed_at = db.Column(db.DateTime(timezone=True))
+    completed_at = db.Column(db.DateTime(timezone=True))
+
+    order = db.relationship('Order', back_populates='kitchen_tickets')
+    outlet = db.relationship('Outlet', back_populates='kitchen_tickets')
+
+    def __repr__(self):
+        return f"<KitchenTicket Order: {self.order_id}, Outlet: {self.outlet_id}, Status: {self.status}>"
+
+class TableVersion(db.Model, SerializerMixin):
+    # A write counter per table, shared by every worker; the catalog ETags and
+    # response cache are derived from it (see caching.py).
+    __tablename__ = 'table_versions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(64), unique=True, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TableVersion {self.table_name}: {self.version}>"
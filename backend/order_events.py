@@ -0,0 +1,200 @@
+import queue
+import threading
+import uuid
+from collections import deque
+
+from flask import Response, request
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from config import app
+from models import MenuItem, Order, OrderItem
+from request_args import int_arg
+from serializers import ORDER_COLUMNS, serialize_order_row
+
+# Order status changes pushed to browsers over Server-Sent Events. Orders
+# created or moved to a new status are collected as a transaction flushes and
+# published once it commits, mirroring the cache's write tracking. The hub
+# encodes each event once and hands the same bytes to every stream watching
+# that order's user, one of its outlets, or all orders. Each stream has a
+# bounded queue; a client too slow to drain it is disconnected, and on
+# reconnect its Last-Event-ID is replayed from a short history. If the
+# history no longer reaches back that far, the client gets a `reset` event
+# and should refetch its list once.
+#
+# The hub lives in this process, like the response cache, so streams only see
+# commits made by the same server process.
+
+ORDER_FIELDS = tuple(getattr(Order, column) for column in ORDER_COLUMNS)
+
+
+class Subscription:
+
+    def __init__(self, key, size):
+        self.key = key
+        self.queue = queue.Queue(size)
+        self.dropped = False
+
+
+class OrderEventHub:
+
+    def __init__(self, replay, queue_size):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.history = deque(maxlen=replay)
+        self.subscribers = {}
+
+    def subscribe(self, key, last_event_id=None):
+        subscription = Subscription(key, self.queue_size)
+        with self.lock:
+            for chunk in self._replay(key, last_event_id):
+                subscription.queue.put_nowait(chunk)
+            self.subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.key]
+
+    def _replay(self, key, last_event_id):
+        # Called with the lock held.
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return [b"event: reset\ndata: {}\n\n"]
+        seq = int(seq)
+        if seq >= self.seq:
+            return []
+        if not self.history or self.history[0][0] > seq + 1:
+            return [b"event: reset\ndata: {}\n\n"]
+        missed = [chunk for event_seq, keys, chunk in self.history if event_seq > seq and key in keys]
+        # Whatever doesn't fit in the queue is covered by a reset.
+        if len(missed) >= self.queue_size:
+            return [b"event: reset\ndata: {}\n\n"]
+        return missed
+
+    def publish(self, order, previous_status, outlet_ids):
+        keys = {('all', None), ('user', order['user_id']), *(('outlet', outlet_id) for outlet_id in outlet_ids)}
+        with self.lock:
+            self.seq += 1
+            data = app.json.dumps({**order, 'previous_status': previous_status, 'outlet_ids': sorted(outlet_ids)})
+            chunk = f"id: {self.epoch}-{self.seq}\nevent: order\ndata: {data}\n\n".encode()
+            self.history.append((self.seq, keys, chunk))
+            for key in keys:
+                for subscription in self.subscribers.get(key, ()):
+                    try:
+                        subscription.queue.put_nowait(chunk)
+                    except queue.Full:
+                        subscription.dropped = True
+
+    def stats(self):
+        with self.lock:
+            return {
+                "subscribers": sum(len(subscribers) for subscribers in self.subscribers.values()),
+                "events": self.seq,
+            }
+
+
+order_events = OrderEventHub(app.config['ORDER_STREAM_REPLAY'], app.config['ORDER_STREAM_QUEUE_SIZE'])
+
+
+# ------------------ WRITE TRACKING ------------------ #
+def _pending(session):
+    return session.info.setdefault('order_events', {})
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_orders(session, flush_context):
+    previous = {}
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, Order):
+            continue
+        if obj in session.new:
+            previous[obj.id] = None
+        else:
+            history = inspect(obj).attrs.status.history
+            if history.has_changes():
+                previous[obj.id] = history.deleted[0] if history.deleted else None
+    if not previous:
+        return
+
+    # Read back the flushed rows (created_at is a server default) and the
+    # outlets the orders' lines belong to, before the transaction commits.
+    connection = session.connection()
+    rows = connection.execute(select(*ORDER_FIELDS).where(Order.id.in_(previous))).all()
+    outlets = {}
+    for order_id, outlet_id in connection.execute(
+        select(OrderItem.order_id, MenuItem.outlet_id)
+        .join(MenuItem, OrderItem.menuitem_id == MenuItem.id)
+        .where(OrderItem.order_id.in_(previous))
+        .distinct()
+    ):
+        outlets.setdefault(order_id, set()).add(outlet_id)
+
+    pending = _pending(session)
+    for row in rows:
+        # Keep the status from before the first flush of the transaction.
+        first_previous = pending[row.id][1] if row.id in pending else previous[row.id]
+        pending[row.id] = (serialize_order_row(row), first_previous, outlets.get(row.id, set()))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_orders(session):
+    for order, previous_status, outlet_ids in session.info.pop('order_events', {}).values():
+        if order['status'] != previous_status:
+            order_events.publish(order, previous_status, outlet_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_orders(session):
+    session.info.pop('order_events', None)
+
+
+# ------------------ STREAM ------------------ #
+def _stream(subscription, heartbeat):
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                chunk = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                # Comments keep proxies from timing out an idle stream, and a
+                # write is how a closed connection gets noticed.
+                yield b": heartbeat\n\n"
+                continue
+            yield chunk
+            if subscription.dropped and subscription.queue.empty():
+                return
+    finally:
+        order_events.unsubscribe(subscription)
+
+
+@app.route('/orders/stream')
+def order_stream():
+    try:
+        outlet_id, user_id = int_arg('outlet_id'), int_arg('user_id')
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if outlet_id is not None and user_id is not None:
+        return {"error": "Filter by outlet_id or user_id, not both."}, 400
+    if outlet_id is not None:
+        key = ('outlet', outlet_id)
+    elif user_id is not None:
+        key = ('user', user_id)
+    else:
+        key = ('all', None)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscription = order_events.subscribe(key, last_event_id)
+    return Response(
+        _stream(subscription, app.config['ORDER_STREAM_HEARTBEAT']),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -0,0 +1,66 @@
+from flask import request
+from sqlalchemy import and_, or_, select, tuple_
+from sqlalchemy.orm import aliased
+
+# Keyset pagination, shared by the Flask resources and the async catalog
+# routes so both page alike. The cursor is the id of the last row of a page,
+# and the next page starts after that row in the requested sort order. Ids
+# are assigned in insert order, so the default id order also pages by
+# created_at. Every list is paged, DEFAULT_PAGE_LIMIT rows at a time unless
+# limit asks for another size, so no response grows with its table.
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+ID_ORDER = (('id', False),)
+
+
+def _page_arg(args, name):
+    value = args.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ValueError(f"{name} must be a positive whole number.")
+    return number
+
+
+def page_args(args=None):
+    # (limit, after) from the query string; Flask's by default.
+    args = request.args if args is None else args
+    limit, after = _page_arg(args, 'limit'), _page_arg(args, 'after')
+    return min(limit or DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT), after
+
+
+def after_cursor(model, sort, after):
+    # Rows past the cursor row in sort order. The row's values are read by the
+    # database rather than bound from Python, so they compare exactly as stored
+    # (SQLite keeps created_at without the microseconds a bound value carries).
+    # Sorts end with the id, so a single key is the id itself, and the cursor
+    # needs no row: it still works after that row is deleted.
+    if len(sort) == 1:
+        return model.id < after if sort[0][1] else model.id > after
+    cursor = aliased(model)
+    columns = [getattr(model, name) for name, _ in sort]
+    values = [select(getattr(cursor, name)).where(cursor.id == after).scalar_subquery() for name, _ in sort]
+    descending = {descending for _, descending in sort}
+    if len(descending) == 1:
+        # One direction throughout: a single row-value range an index can seek.
+        return tuple_(*columns) < tuple_(*values) if descending.pop() else tuple_(*columns) > tuple_(*values)
+    return or_(*(
+        and_(*(column == value for column, value in zip(columns[:n], values[:n])),
+             columns[n] < values[n] if sort[n][1] else columns[n] > values[n])
+        for n in range(len(columns))
+    ))
+
+
+def order_by(model, sort):
+    return [getattr(model, name).desc() if descending else getattr(model, name) for name, descending in sort]
+
+
+def page_of(rows, limit, serialize):
+    # rows holds up to limit + 1 rows; the extra one only says there's more.
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return {"items": [serialize(obj) for obj in rows[:limit]], "next_cursor": next_cursor}
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import app, bcrypt
+
+# bcrypt runs on a small bounded pool instead of on whichever request thread
+# asked for it. bcrypt releases the GIL, so the pool keeps hashing to about one
+# job per core while request threads wait. Once PASSWORD_HASH_MAX_PENDING jobs
+# are queued or running, further callers get PasswordHasherBusy straight away,
+# so a login burst can't tie up every worker thread. With
+# PASSWORD_HASH_WORKERS = 0, hashing runs inline on the calling thread.
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+
+    def __init__(self, rounds, workers, max_pending):
+        self.rounds = rounds
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt') if workers else None
+        self.pending = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        if not self.pending.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.pending.release()
+            raise
+        future.add_done_callback(lambda _: self.pending.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        # Hashes look like $2b$<cost>$<salt+digest>.
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+password_hasher = PasswordHasher(
+    app.config['BCRYPT_LOG_ROUNDS'],
+    app.config['PASSWORD_HASH_WORKERS'],
+    app.config['PASSWORD_HASH_MAX_PENDING'],
+)
@@ -0,0 +1,252 @@
+import threading
+import time
+from collections import Counter
+from itertools import chain
+
+import click
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from config import app, db
+from models import Order, OrderItem
+
+# "Frequently ordered together": for each menu item, the items found in the
+# most orders alongside it. The build reads (order, item) from order_items in
+# chunks straight into arrays and gets every pair count from one sparse
+# product, counts = incidence.T @ incidence, where incidence is the order x
+# item 0/1 matrix; 3M order lines build in about 3s on one core. Each item's
+# top RECOMMENDATIONS_TOP_K row is then kept in a dict, so a lookup is a
+# single dict read.
+#
+# New order lines are added as they commit, like the response cache's write
+# tracking: a line whose item is new to its order adds one to that item's
+# count with every other item in the order, and only the touched rows are
+# re-ranked. Deleted lines, bulk writes and other processes' orders are picked
+# up by a full rebuild every RECOMMENDATIONS_REBUILD_INTERVAL seconds, run on a
+# background thread in each worker.
+
+
+def read_order_lines(chunk_size=100_000):
+    # A raw DBAPI cursor: building a Row per line costs more than the rest of
+    # the build put together.
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT order_id, menuitem_id FROM order_items "
+            "WHERE order_id IS NOT NULL AND menuitem_id IS NOT NULL"
+        )
+        chunks = [np.empty(0, dtype=np.int64)]
+        while rows := cursor.fetchmany(chunk_size):
+            chunks.append(np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)))
+        cursor.close()
+    finally:
+        connection.close()
+    flat = np.concatenate(chunks)
+    return flat[0::2], flat[1::2]
+
+
+def top_k(counts, item_ids, k):
+    # Per row, the k largest counts (ties to the lower item id), from one
+    # lexsort over all nonzeros rather than a sort per row.
+    row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    order = np.lexsort((item_ids[counts.indices], -counts.data, row_of))
+    rank = np.arange(order.size) - counts.indptr[row_of[order]]
+    keep = order[rank < k]
+    if not keep.size:
+        return {}
+    rows = row_of[keep]
+    others = item_ids[counts.indices[keep]].tolist()
+    orders = counts.data[keep].tolist()
+    bounds = np.flatnonzero(np.diff(rows)) + 1
+    table = {}
+    for start, stop in zip(chain((0,), bounds.tolist()), chain(bounds.tolist(), (rows.size,))):
+        table[int(item_ids[rows[start]])] = tuple(zip(others[start:stop], orders[start:stop]))
+    return table
+
+
+def co_occurrence(order_ids, menuitem_ids):
+    _, rows = np.unique(order_ids, return_inverse=True)
+    item_ids, columns = np.unique(menuitem_ids, return_inverse=True)
+    incidence = sparse.csr_matrix(
+        (np.ones(rows.size, dtype=np.int32), (rows, columns)),
+        shape=(rows.max(initial=-1) + 1, item_ids.size),
+    )
+    incidence.data[:] = 1  # an item on two lines of one order counts once
+    counts = (incidence.T @ incidence).tocsr()
+    counts.setdiag(0)
+    counts.eliminate_zeros()
+    return item_ids, counts
+
+
+class Recommendations:
+
+    def __init__(self, k):
+        self.k = k
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.item_ids = np.empty(0, dtype=np.int64)
+        self.index = {}     # menu item id -> row of counts
+        self.counts = None  # item x item orders in common, as of the build
+        self.pending = {}   # menu item id -> Counter of orders added since
+        self.table = {}     # menu item id -> ((other id, orders), ...)
+        self.replay = None  # deltas committed while a build is reading
+        self.built_at = None
+        self.build_seconds = None
+
+    def build(self):
+        with self.build_lock:
+            self._build()
+
+    def ensure_built(self):
+        with self.build_lock:
+            if self.built_at is None:
+                self._build()
+
+    def _build(self):
+        started = time.perf_counter()
+        with self.lock:
+            self.replay = []
+        try:
+            with app.app_context():
+                order_ids, menuitem_ids = read_order_lines()
+            item_ids, counts = co_occurrence(order_ids, menuitem_ids)
+            table = top_k(counts, item_ids, self.k)
+        except BaseException:
+            with self.lock:
+                self.replay = None
+            raise
+        with self.lock:
+            self.item_ids, self.counts, self.table = item_ids, counts, table
+            self.index = {item_id: row for row, item_id in enumerate(item_ids.tolist())}
+            self.pending = {}
+            # A line that committed just as the read began can be counted
+            # twice here; the next build corrects it.
+            replay, self.replay = self.replay, None
+            for deltas in replay:
+                self._apply(deltas)
+            self.built_at = time.monotonic()
+            self.build_seconds = round(time.perf_counter() - started, 3)
+
+    def _rank(self, item_id):
+        # Called with the lock held.
+        merged = Counter(self.pending.get(item_id, ()))
+        row = self.index.get(item_id)
+        if row is not None:
+            start, stop = self.counts.indptr[row], self.counts.indptr[row + 1]
+            for column, orders in zip(self.counts.indices[start:stop].tolist(), self.counts.data[start:stop].tolist()):
+                merged[int(self.item_ids[column])] += orders
+        ranked = sorted(merged.items(), key=lambda pair: (-pair[1], pair[0]))
+        self.table[item_id] = tuple(ranked[:self.k])
+
+    def _apply(self, deltas):
+        for item_id, others in deltas.items():
+            self.pending.setdefault(item_id, Counter()).update(others)
+            self._rank(item_id)
+
+    def apply(self, deltas):
+        with self.lock:
+            if self.replay is not None:
+                self.replay.append(deltas)
+            if self.built_at is not None:
+                self._apply(deltas)
+
+    def lookup(self, item_id, limit):
+        return self.table.get(item_id, ())[:limit]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "items": len(self.table),
+                "pairs": int(self.counts.nnz) if self.counts is not None else 0,
+                "pending_items": len(self.pending),
+                "build_seconds": self.build_seconds,
+                "age_seconds": round(time.monotonic() - self.built_at) if self.built_at is not None else None,
+            }
+
+
+recommendations = Recommendations(app.config['RECOMMENDATIONS_TOP_K'])
+
+
+# ------------------ WRITE TRACKING ------------------ #
+@event.listens_for(Session, 'after_flush')
+def _track_order_lines(session, flush_context):
+    lines = [obj for obj in session.new if isinstance(obj, OrderItem) and obj.menuitem_id is not None]
+    if not lines:
+        return
+    added = {}
+    for line in lines:
+        added.setdefault(line.order_id, set()).add(line.menuitem_id)
+
+    # Items the orders already held. Orders created in this flush hold none.
+    new_orders = {obj.id for obj in session.new if isinstance(obj, Order)}
+    existing = {}
+    earlier = set(added) - new_orders
+    if earlier:
+        for order_id, menuitem_id in session.connection().execute(
+            select(OrderItem.order_id, OrderItem.menuitem_id).distinct()
+            .where(OrderItem.order_id.in_(earlier), OrderItem.id.not_in([line.id for line in lines]))
+        ):
+            existing.setdefault(order_id, set()).add(menuitem_id)
+
+    deltas = session.info.setdefault('co_occurrence', {})
+    for order_id, items in added.items():
+        before = existing.get(order_id, set())
+        after = before | items
+        for item_id in items - before:
+            for other in after - {item_id}:
+                deltas.setdefault(item_id, Counter())[other] += 1
+                if other in before:
+                    deltas.setdefault(other, Counter())[item_id] += 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_order_lines(session):
+    deltas = session.info.pop('co_occurrence', None)
+    if deltas:
+        recommendations.apply(deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_order_lines(session):
+    session.info.pop('co_occurrence', None)
+
+
+# ------------------ REBUILDS ------------------ #
+_started = False
+_lock = threading.Lock()
+
+
+def _run(interval):
+    while True:
+        try:
+            recommendations.build()
+        except Exception:
+            app.logger.exception("Recommendations build failed")
+        time.sleep(interval)
+
+
+@app.before_request
+def start_recommendations():
+    # Started on the first request so each forked worker runs its own thread.
+    global _started
+    if _started:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+        interval = app.config['RECOMMENDATIONS_REBUILD_INTERVAL']
+        if interval:
+            threading.Thread(target=_run, args=(interval,), name='recommendations', daemon=True).start()
+
+
+@app.cli.command('build-recommendations')
+def build_recommendations_command():
+    """Build the co-occurrence table once and report its size and build time."""
+    recommendations.build()
+    stats = recommendations.stats()
+    click.echo(f"Built recommendations for {stats['items']} items from {stats['pairs']} item pairs "
+               f"in {stats['build_seconds']}s.")
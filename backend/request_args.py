@@ -0,0 +1,16 @@
+from flask import request
+
+# Query-string parsing shared by the resources in app.py and the routes
+# registered by other modules. Bad values raise ValueError with a message
+# fit for the 400 response.
+
+
+def int_arg(name, args=None):
+    # args is Flask's request.args unless given (the async app passes its own).
+    value = (request.args if args is None else args).get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number.")
@@ -0,0 +1,175 @@
+from collections import defaultdict
+
+import click
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from config import app, db
+from models import MenuItem, Order, OrderItem, DailySales, DailyOutletOrders, HourlySales
+
+# Daily sales rollups, kept in step with orders and order items inside the same
+# transaction as the write. Session flush hooks find the orders a flush
+# touches, whether a resource changed them or a cascade deleted them with their
+# menu item, outlet, cuisine or user, and read those orders' contributions
+# before and after it. The difference is applied as a delta with an
+# INSERT ... ON CONFLICT DO UPDATE, so concurrent writers never race on
+# creating a bucket.
+#
+# Item sales are also counted per hour, for the rolling windows behind
+# /menu-items/popular; day-sized buckets are too coarse for "last 24 hours".
+
+
+BUCKETS = {
+    DailySales: (('outlet_id', 'day', 'menuitem_id'), ('quantity', 'revenue', 'order_count')),
+    HourlySales: (('outlet_id', 'hour', 'menuitem_id'), ('quantity', 'revenue', 'order_count')),
+    DailyOutletOrders: (('outlet_id', 'day', 'status'), ('order_count',)),
+}
+
+
+def _upsert(session, model, keys, deltas):
+    dialect_insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    stmt = dialect_insert(model).values(**keys, **deltas)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: model.__table__.c[column] + stmt.excluded[column] for column in deltas},
+    )
+    session.execute(stmt)
+
+
+def sales_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_column(column):
+    # The SQL side of sales_hour, rendered the way SQLAlchemy stores datetimes.
+    if db.engine.dialect.name == 'postgresql':
+        return func.date_trunc('hour', column)
+    return func.strftime('%Y-%m-%d %H:00:00.000000', column)
+
+
+def _contributions(session, order_ids):
+    # What the given orders add to each rollup bucket, as the database has them:
+    # {model: {bucket key: [column totals]}}.
+    sales = {DailySales: defaultdict(lambda: [0, 0, 0]), HourlySales: defaultdict(lambda: [0, 0, 0])}
+    outlet_orders = defaultdict(set)
+    if order_ids:
+        rows = session.execute(
+            select(Order.id, Order.created_at, Order.status, MenuItem.outlet_id, MenuItem.id,
+                   OrderItem.quantity, OrderItem.sub_total)
+            .select_from(OrderItem)
+            .join(MenuItem, OrderItem.menuitem_id == MenuItem.id)
+            .join(Order, OrderItem.order_id == Order.id)
+            .where(Order.id.in_(order_ids))
+        )
+        for order_id, created_at, status, outlet_id, menuitem_id, quantity, sub_total in rows:
+            for totals in (sales[DailySales][(outlet_id, created_at.date(), menuitem_id)],
+                           sales[HourlySales][(outlet_id, sales_hour(created_at), menuitem_id)]):
+                totals[0] += quantity or 0
+                totals[1] += sub_total or 0
+                totals[2] += 1
+            # The order counts once per outlet, however many of its lines it holds.
+            outlet_orders[(outlet_id, created_at.date(), status)].add(order_id)
+    return {**sales, DailyOutletOrders: {keys: [len(ids)] for keys, ids in outlet_orders.items()}}
+
+
+def _touched_orders(session):
+    # Orders whose lines, status or menu items this flush changes, including
+    # the ones it deletes outright or through a cascade.
+    order_ids, menu_item_ids = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        attrs = inspect(obj).attrs
+        if isinstance(obj, Order):
+            order_ids.add(obj.id)
+        elif isinstance(obj, OrderItem):
+            order_ids.update(attrs.order_id.history.sum())
+            order_ids.update(order.id for order in attrs.order.history.sum() if order is not None)
+        elif isinstance(obj, MenuItem) and obj not in session.new and (
+            obj in session.deleted or attrs.outlet_id.history.has_changes() or attrs.outlet.history.has_changes()
+        ):
+            menu_item_ids.add(obj.id)
+    if menu_item_ids:
+        order_ids.update(session.scalars(
+            select(OrderItem.order_id).where(OrderItem.menuitem_id.in_(menu_item_ids)).distinct()
+        ))
+    order_ids.discard(None)
+    return order_ids
+
+
+# ------------------ WRITE TRACKING ------------------ #
+@event.listens_for(Session, 'before_flush')
+def _read_rollups(session, flush_context, instances):
+    order_ids = _touched_orders(session)
+    session.info['rollups_before'] = (order_ids, _contributions(session, order_ids))
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_rollups(session, flush_context):
+    order_ids, before = session.info.pop('rollups_before', (set(), None))
+    order_ids = order_ids | _touched_orders(session)
+    if not order_ids:
+        return
+    before = before or _contributions(session, ())
+    after = _contributions(session, order_ids)
+    for model, (key_columns, columns) in BUCKETS.items():
+        old, new = before[model], after[model]
+        # In key order, so concurrent writers take bucket locks alike.
+        for key in sorted(old.keys() | new.keys()):
+            zeros = [0] * len(columns)
+            deltas = [new_total - old_total for old_total, new_total in zip(old.get(key, zeros), new.get(key, zeros))]
+            if not any(deltas):
+                continue
+            keys = dict(zip(key_columns, key))
+            _upsert(session, model, keys, dict(zip(columns, deltas)))
+            if key not in new:
+                # Drop buckets nothing counts towards any more, as a rebuild would.
+                session.execute(delete(model).where(
+                    *(getattr(model, column) == value for column, value in keys.items()), model.order_count <= 0,
+                ))
+
+
+def rebuild_rollups():
+    day = func.date(Order.created_at)
+    lines = (
+        db.session.query()
+        .select_from(OrderItem)
+        .join(MenuItem, OrderItem.menuitem_id == MenuItem.id)
+        .join(Order, OrderItem.order_id == Order.id)
+    )
+    hour = _hour_column(Order.created_at)
+    db.session.query(DailySales).delete()
+    db.session.query(HourlySales).delete()
+    db.session.query(DailyOutletOrders).delete()
+    db.session.execute(insert(DailySales).from_select(
+        ['outlet_id', 'day', 'menuitem_id', 'quantity', 'revenue', 'order_count'],
+        lines.with_entities(
+            MenuItem.outlet_id, day, MenuItem.id,
+            func.coalesce(func.sum(OrderItem.quantity), 0),
+            func.coalesce(func.sum(OrderItem.sub_total), 0),
+            func.count(OrderItem.id),
+        ).group_by(MenuItem.outlet_id, day, MenuItem.id),
+    ))
+    db.session.execute(insert(HourlySales).from_select(
+        ['outlet_id', 'hour', 'menuitem_id', 'quantity', 'revenue', 'order_count'],
+        lines.with_entities(
+            MenuItem.outlet_id, hour, MenuItem.id,
+            func.coalesce(func.sum(OrderItem.quantity), 0),
+            func.coalesce(func.sum(OrderItem.sub_total), 0),
+            func.count(OrderItem.id),
+        ).group_by(MenuItem.outlet_id, hour, MenuItem.id),
+    ))
+    db.session.execute(insert(DailyOutletOrders).from_select(
+        ['outlet_id', 'day', 'status', 'order_count'],
+        lines.with_entities(
+            MenuItem.outlet_id, day, Order.status, func.count(func.distinct(Order.id)),
+        ).group_by(MenuItem.outlet_id, day, Order.status),
+    ))
+    db.session.commit()
+
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Backfill the daily and hourly sales rollups from existing orders."""
+    rebuild_rollups()
+    click.echo(f"Rebuilt {DailySales.query.count()} daily sales rows, {HourlySales.query.count()} hourly "
+               f"sales rows and {DailyOutletOrders.query.count()} daily outlet order rows.")
@@ -0,0 +1,358 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+import click
+from sqlalchemy import event, inspect, null, select, text
+from sqlalchemy.orm import Session
+
+from config import app, db
+from models import Cuisine, MenuItem, Outlet
+from serializers import serialize_cuisine, serialize_menu_item, serialize_outlet
+
+# Full-text search over outlets (name, description), menu items (name,
+# description, category) and cuisines (name).
+#
+# On SQLite every searchable row has a row in the FTS5 table search_index,
+# keyed by rowid = id * 4 + kind, and triggers on the three tables keep it in
+# step with every write, bulk menu imports included. Ranking is bm25 with
+# names weighted above categories and categories above descriptions. On
+# Postgres the same weights go into a tsvector expression per table, matched
+# against a GIN index on that expression, so nothing needs keeping in sync.
+# Each search term is prefix-matched and all of them must match.
+#
+# Terms that match nothing (typos: "margarita", "shawarmaa") fall back to an
+# in-memory trigram index in this process, which matches words by trigram
+# similarity like pg_trgm and tops up the results when full-text search
+# returns fewer than asked for. It serves alone if the database has no
+# search_index (an app.db made by create_all before `flask rebuild-search-index`
+# was run). Committed ORM writes are applied to it as they happen; bulk
+# statements and writes from other processes are picked up by a rebuild, on
+# the next search after a bulk write and at most SEARCH_FUZZY_TTL seconds
+# after the last one.
+
+KINDS = {'outlet': 1, 'menu_item': 2, 'cuisine': 3}
+KIND_NAMES = {code: kind for kind, code in KINDS.items()}
+MODELS = {'outlet': Outlet, 'menu_item': MenuItem, 'cuisine': Cuisine}
+SERIALIZERS = {'outlet': serialize_outlet, 'menu_item': serialize_menu_item, 'cuisine': serialize_cuisine}
+
+# Searched columns per kind, with their weights: bm25 column weights on SQLite,
+# tsvector labels on Postgres and word weights in the trigram index.
+COLUMNS = ('name', 'category', 'description')
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+TS_LABELS = ('A', 'B', 'C')
+FUZZY_WEIGHTS = (1.0, 0.8, 0.6)
+SOURCES = {
+    'outlet': ('outlets', ('name', None, 'description')),
+    'menu_item': ('menu_items', ('name', 'category', 'description')),
+    'cuisine': ('cuisines', ('name', None, None)),
+}
+SOURCE_TABLES = {table for table, _ in SOURCES.values()}
+
+MAX_TERMS = 8
+
+
+def words(value):
+    # Lowercased words with accents stripped, as unicode61 remove_diacritics
+    # tokenizes them.
+    if not value:
+        return []
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return re.findall(r'\w+', value.lower())
+
+
+# ------------------ SQLITE FTS5 ------------------ #
+def _sqlite_ddl():
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        f"{', '.join(COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ]
+    for kind, (table, columns) in SOURCES.items():
+        rowid = f"{{row}}.id * 4 + {KINDS[kind]}"
+        values = ', '.join(f"{{row}}.{column}" if column else 'NULL' for column in columns)
+        insert = f"INSERT INTO search_index(rowid, {', '.join(COLUMNS)}) VALUES ({rowid}, {values});"
+        delete = f"DELETE FROM search_index WHERE rowid = {rowid};"
+        watched = ', '.join(column for column in columns if column)
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert.format(row='new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_update AFTER UPDATE OF {watched} ON {table} "
+            f"BEGIN {delete.format(row='old')} {insert.format(row='new')} END",
+            f"CREATE TRIGGER IF NOT EXISTS search_{table}_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete.format(row='old')} END",
+        ]
+    return statements
+
+
+def _sqlite_fill():
+    statements = ["DELETE FROM search_index"]
+    for kind, (table, columns) in SOURCES.items():
+        values = ', '.join(column or 'NULL' for column in columns)
+        statements.append(
+            f"INSERT INTO search_index(rowid, {', '.join(COLUMNS)}) "
+            f"SELECT id * 4 + {KINDS[kind]}, {values} FROM {table}"
+        )
+    statements.append("INSERT INTO search_index(search_index) VALUES ('optimize')")
+    return statements
+
+
+def _sqlite_search(terms, kinds, limit):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    codes = ', '.join(str(KINDS[kind]) for kind in kinds)
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, bm25(search_index, {', '.join(map(str, BM25_WEIGHTS))}) AS rank "
+            f"FROM search_index WHERE search_index MATCH :match AND rowid % 4 IN ({codes}) "
+            "ORDER BY rank LIMIT :limit"
+        ),
+        {'match': match, 'limit': limit},
+    )
+    return [((KIND_NAMES[rowid % 4], rowid // 4), round(-rank, 4)) for rowid, rank in rows]
+
+
+# ------------------ POSTGRES TSVECTOR ------------------ #
+def tsvector(columns):
+    # Must match the expressions the ix_search_* GIN indexes were built on.
+    return ' || '.join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{label}')"
+        for column, label in zip(columns, TS_LABELS) if column
+    )
+
+
+def _postgres_ddl():
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_search_{table} ON {table} USING gin (({tsvector(columns)}))"
+        for table, columns in SOURCES.values()
+    ]
+
+
+def _postgres_search(terms, kinds, limit):
+    query = ' & '.join(f"'{term}':*" for term in terms)
+    hits = []
+    for kind in kinds:
+        table, columns = SOURCES[kind]
+        rows = db.session.execute(
+            text(
+                f"SELECT id, ts_rank({tsvector(columns)}, query) AS rank "
+                f"FROM {table}, to_tsquery('simple', :query) AS query "
+                f"WHERE {tsvector(columns)} @@ query ORDER BY rank DESC, id LIMIT :limit"
+            ),
+            {'query': query, 'limit': limit},
+        )
+        hits += [((kind, id), round(rank, 4)) for id, rank in rows]
+    return sorted(hits, key=lambda hit: -hit[1])[:limit]
+
+
+_fts_ready = False
+
+
+def fts_search(terms, kinds, limit):
+    # Returns None when the database has no full-text index to search.
+    global _fts_ready
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        return _postgres_search(terms, kinds, limit)
+    if dialect != 'sqlite':
+        return None
+    if not _fts_ready:
+        _fts_ready = inspect(db.engine).has_table('search_index')
+        if not _fts_ready:
+            return None
+    return _sqlite_search(terms, kinds, limit)
+
+
+def rebuild_search_index():
+    if db.engine.dialect.name == 'sqlite':
+        statements = _sqlite_ddl() + _sqlite_fill()
+    elif db.engine.dialect.name == 'postgresql':
+        statements = _postgres_ddl()
+    else:
+        statements = []
+    for statement in statements:
+        db.session.execute(text(statement))
+    db.session.commit()
+    fuzzy_index.mark_stale()
+
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Create the full-text search index and its triggers, and refill it."""
+    rebuild_search_index()
+    click.echo(f"Rebuilt the search index for {db.engine.dialect.name}.")
+
+
+# ------------------ TRIGRAM FALLBACK ------------------ #
+@lru_cache(maxsize=65536)
+def trigrams(word):
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _document(obj):
+    kind = next(kind for kind, model in MODELS.items() if isinstance(obj, model))
+    _, columns = SOURCES[kind]
+    return (kind, obj.id), tuple(getattr(obj, column) if column else None for column in columns)
+
+
+class TrigramIndex:
+
+    def __init__(self, threshold, ttl):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.built_at = None
+        self.documents = {}  # (kind, id) -> {word: weight}
+        self.postings = {}   # word -> {(kind, id): weight}
+        self.grams = {}      # trigram -> {word}
+
+    def _add(self, key, values):
+        document = {}
+        for value, weight in zip(values, FUZZY_WEIGHTS):
+            for word in words(value):
+                document[word] = max(document.get(word, 0), weight)
+        self.documents[key] = document
+        for word, weight in document.items():
+            if word not in self.postings:
+                self.postings[word] = {}
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+            self.postings[word][key] = weight
+
+    def _remove(self, key):
+        for word in self.documents.pop(key, ()):
+            postings = self.postings[word]
+            del postings[key]
+            if postings:
+                continue
+            del self.postings[word]
+            for gram in trigrams(word):
+                self.grams[gram].discard(word)
+                if not self.grams[gram]:
+                    del self.grams[gram]
+
+    def rebuild(self):
+        # Holds the lock while reading, so a commit applied meanwhile can't
+        # be overwritten by the older rows.
+        with self.lock:
+            self.documents, self.postings, self.grams = {}, {}, {}
+            for kind, (table, columns) in SOURCES.items():
+                model = MODELS[kind]
+                fields = (getattr(model, column) if column else null() for column in columns)
+                for id, *values in db.session.execute(select(model.id, *fields)):
+                    self._add((kind, id), values)
+            self.built_at = time.monotonic()
+
+    def mark_stale(self):
+        with self.lock:
+            self.built_at = None
+
+    def ensure_fresh(self):
+        if self.built_at is None or time.monotonic() - self.built_at > self.ttl:
+            self.rebuild()
+
+    def apply(self, documents):
+        with self.lock:
+            if self.built_at is None:
+                return
+            for key, values in documents.items():
+                self._remove(key)
+                if values is not None:
+                    self._add(key, values)
+
+    def search(self, terms, kinds, limit, exclude=()):
+        # A document's score is the mean over the terms of its best
+        # similarity * weight; every term has to match one of its words.
+        with self.lock:
+            totals = None
+            for term in terms:
+                grams = trigrams(term)
+                shared = Counter()
+                for gram in grams:
+                    shared.update(self.grams.get(gram, ()))
+                scores = {}
+                for word, count in shared.items():
+                    similarity = count / (len(grams) + len(trigrams(word)) - count)
+                    if similarity < self.threshold:
+                        continue
+                    for key, weight in self.postings[word].items():
+                        scores[key] = max(scores.get(key, 0), similarity * weight)
+                totals = scores if totals is None else {
+                    key: totals[key] + score for key, score in scores.items() if key in totals
+                }
+                if not totals:
+                    return []
+        hits = [
+            (key, round(total / len(terms), 4)) for key, total in totals.items()
+            if key[0] in kinds and key not in exclude
+        ]
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits[:limit]
+
+    def stats(self):
+        with self.lock:
+            return {"documents": len(self.documents), "words": len(self.postings), "built": self.built_at is not None}
+
+
+fuzzy_index = TrigramIndex(app.config['SEARCH_FUZZY_THRESHOLD'], app.config['SEARCH_FUZZY_TTL'])
+
+
+# ------------------ WRITE TRACKING ------------------ #
+@event.listens_for(Session, 'after_flush')
+def _track_documents(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Outlet, MenuItem, Cuisine)):
+            key, values = _document(obj)
+            session.info.setdefault('search_documents', {})[key] = None if obj in session.deleted else values
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_documents(orm_execute_state):
+    # Bulk statements (menu imports) bypass the flush; rebuild instead.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and table.name in SOURCE_TABLES:
+            orm_execute_state.session.info['search_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_documents(session):
+    documents = session.info.pop('search_documents', None)
+    if session.info.pop('search_stale', False):
+        fuzzy_index.mark_stale()
+    elif documents:
+        fuzzy_index.apply(documents)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_documents(session):
+    session.info.pop('search_documents', None)
+    session.info.pop('search_stale', None)
+
+
+# ------------------ SEARCH ------------------ #
+def search(query, kinds, limit):
+    terms = list(dict.fromkeys(words(query)))[:MAX_TERMS]
+    if not terms:
+        return []
+    hits = [(key, score, 'fts') for key, score in fts_search(terms, kinds, limit) or ()]
+    if len(hits) < limit:
+        fuzzy_index.ensure_fresh()
+        seen = {key for key, _, _ in hits}
+        hits += [(key, score, 'fuzzy') for key, score in fuzzy_index.search(terms, kinds, limit - len(hits), seen)]
+
+    ids = {}
+    for (kind, id), _, _ in hits:
+        ids.setdefault(kind, []).append(id)
+    rows = {}
+    for kind, kind_ids in ids.items():
+        model = MODELS[kind]
+        rows.update(((kind, obj.id), obj) for obj in db.session.scalars(select(model).where(model.id.in_(kind_ids))))
+    # A fuzzy hit can outlive its row until the next rebuild; skip it.
+    return [
+        {"type": key[0], "id": key[1], "score": score, "match": match, "item": SERIALIZERS[key[0]](rows[key])}
+        for key, score, match in hits if key in rows
+    ]
@@ -1,5 +1,7 @@
 from app import app, db
-from models import User, Cuisine, Outlet, MenuItem, Table, Order, OrderItem, Reservation
+from rollups import rebuild_rollups
+from search import rebuild_search_index
+from models import User, Cuisine, Outlet, MenuItem, Table, Order, OrderItem, Reservation, ReservationSlot
 from datetime import datetime, timedelta
 
 def seed_data():
@@ -130,8 +132,20 @@ def seed_data():
         status="confirmed"
         )
 
+        reservation1.update_end_time()
+        reservation2.update_end_time()
+
         db.session.add_all([order1, order_item1, reservation1, order2, order_item2, reservation2])
+        db.session.flush()
+
+        db.session.add_all(
+            ReservationSlot(reservation=reservation, table_id=reservation.table_id, booking_date=reservation.booking_date, slot=slot)
+            for reservation in (reservation1, reservation2) if not reservation.is_cancelled
+            for slot in ReservationSlot.slot_range(reservation.booking_time, reservation.end_time)
+        )
         db.session.commit()
+        rebuild_rollups()
+        rebuild_search_index()
 
         print("Seed data added successfully.")
 
@@ -0,0 +1,107 @@
+from operator import attrgetter
+
+from models import SerializerMixin
+
+# Precompiled serializers for the shapes the list/detail resources return.
+# Each one reads a fixed set of attributes and nested relationships, producing
+# the same JSON as the matching to_dict(rules=...) call without re-parsing the
+# rules and reflecting over the mapper on every row.
+
+DATE_FORMAT = SerializerMixin.date_format
+DATETIME_FORMAT = SerializerMixin.datetime_format
+TIME_FORMAT = SerializerMixin.time_format
+
+
+def _formatter(fmt):
+    def format_value(value):
+        return value.strftime(fmt)
+    return format_value
+
+
+format_date = _formatter(DATE_FORMAT)
+format_datetime = _formatter(DATETIME_FORMAT)
+format_time = _formatter(TIME_FORMAT)
+
+
+def compile_serializer(columns, formats=None, one=None, many=None):
+    columns = tuple(columns)
+    get_columns = attrgetter(*columns) if len(columns) > 1 else (lambda obj: (getattr(obj, columns[0]),))
+    formats = tuple((formats or {}).items())
+    one = tuple((one or {}).items())
+    many = tuple((many or {}).items())
+
+    def serialize(obj):
+        data = dict(zip(columns, get_columns(obj)))
+        for key, format_value in formats:
+            value = data[key]
+            if value is not None:
+                data[key] = format_value(value)
+        for key, nested in one:
+            value = getattr(obj, key)
+            data[key] = nested(value) if value is not None else None
+        for key, nested in many:
+            data[key] = [nested(value) for value in getattr(obj, key)]
+        return data
+
+    return serialize
+
+
+USER_COLUMNS = ('id', 'name', 'email', 'phone_no', 'role')
+CUISINE_COLUMNS = ('id', 'name', 'img_url')
+OUTLET_COLUMNS = ('id', 'name', 'contact', 'img_url', 'cuisine_id', 'description', 'owner_id')
+MENU_ITEM_COLUMNS = ('id', 'name', 'description', 'price', 'category', 'outlet_id')
+ORDER_COLUMNS = ('id', 'status', 'total_price', 'user_id', 'created_at')
+ORDER_ITEM_COLUMNS = ('id', 'order_id', 'sub_total', 'quantity', 'menuitem_id')
+TABLE_COLUMNS = ('id', 'table_number', 'capacity', 'is_available')
+KITCHEN_TICKET_COLUMNS = ('id', 'order_id', 'outlet_id', 'priority', 'status', 'created_at', 'claimed_at', 'completed_at')
+RESERVATION_COLUMNS = ('id', 'user_id', 'order_id', 'table_id', 'booking_date', 'booking_time', 'no_of_people', 'status', 'duration', 'end_time', 'created_at')
+
+ORDER_FORMATS = {'created_at': format_datetime}
+KITCHEN_TICKET_FORMATS = {'created_at': format_datetime, 'claimed_at': format_datetime, 'completed_at': format_datetime}
+RESERVATION_FORMATS = {'booking_date': format_date, 'booking_time': format_time, 'end_time': format_time, 'created_at': format_datetime}
+
+serialize_user = compile_serializer(USER_COLUMNS)
+serialize_cuisine = compile_serializer(CUISINE_COLUMNS)
+serialize_table = compile_serializer(TABLE_COLUMNS)
+serialize_order_item = compile_serializer(ORDER_ITEM_COLUMNS)
+serialize_order_row = compile_serializer(ORDER_COLUMNS, formats=ORDER_FORMATS)
+serialize_reservation = compile_serializer(RESERVATION_COLUMNS, formats=RESERVATION_FORMATS)
+serialize_kitchen_ticket = compile_serializer(KITCHEN_TICKET_COLUMNS, formats=KITCHEN_TICKET_FORMATS)
+
+# Outlet owner as nested under a menu item. The owner's own orders and
+# reservations are emitted as plain rows; to_dict recursed through them
+# without bound.
+serialize_owner = compile_serializer(
+    USER_COLUMNS,
+    many={'orders': serialize_order_row, 'reservations': serialize_reservation},
+)
+
+serialize_outlet = compile_serializer(OUTLET_COLUMNS)
+serialize_outlet_with_cuisine = compile_serializer(OUTLET_COLUMNS, one={'cuisine': serialize_cuisine})
+serialize_outlet_full = compile_serializer(
+    OUTLET_COLUMNS,
+    one={'cuisine': serialize_cuisine, 'owner': serialize_owner},
+)
+
+serialize_menu_item = compile_serializer(MENU_ITEM_COLUMNS)
+serialize_menu_item_with_outlet = compile_serializer(MENU_ITEM_COLUMNS, one={'outlet': serialize_outlet_full})
+
+serialize_order_item_with_menu_item = compile_serializer(
+    ORDER_ITEM_COLUMNS,
+    one={'menu_item': serialize_menu_item_with_outlet},
+)
+
+serialize_reservation_user = compile_serializer(('id', 'name', 'email'))
+
+serialize_order = compile_serializer(
+    ORDER_COLUMNS,
+    formats=ORDER_FORMATS,
+    one={'user': serialize_user},
+    many={'order_items': serialize_order_item_with_menu_item},
+)
+
+serialize_reservation_with_summaries = compile_serializer(
+    RESERVATION_COLUMNS,
+    formats=RESERVATION_FORMATS,
+    one={'user': serialize_reservation_user, 'table': serialize_table},
+)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import click
+
+from config import app, db
+
+# In WAL mode, commits land in app.db-wal until a checkpoint copies them back
+# into app.db. SQLite checkpoints on its own once the WAL passes 1000 pages,
+# but only from whichever request happens to commit at that point, and it never
+# shrinks the file. Each worker therefore runs a PASSIVE checkpoint, which never
+# blocks readers or writers, every SQLITE_CHECKPOINT_INTERVAL seconds.
+# `flask sqlite-checkpoint` runs a TRUNCATE checkpoint that also resets the WAL.
+
+_started = False
+_lock = threading.Lock()
+
+
+def checkpoint(mode='PASSIVE'):
+    # Returns (busy, wal pages, pages checkpointed).
+    with db.engine.connect() as connection:
+        return tuple(connection.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").one())
+
+
+def _run(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            with app.app_context():
+                checkpoint()
+        except Exception:
+            app.logger.exception("SQLite checkpoint failed")
+
+
+@app.before_request
+def start_checkpointer():
+    # Started on the first request so each forked worker runs its own thread.
+    global _started
+    if _started:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+        interval = app.config['SQLITE_CHECKPOINT_INTERVAL']
+        if app.config['SQLITE_PRODUCTION_MODE'] and interval and db.engine.dialect.name == 'sqlite':
+            threading.Thread(target=_run, args=(interval,), name='sqlite-checkpoint', daemon=True).start()
+
+
+@app.cli.command('sqlite-checkpoint')
+def sqlite_checkpoint_command():
+    """Checkpoint the SQLite WAL into the database file and truncate it."""
+    busy, wal_pages, checkpointed = checkpoint('TRUNCATE')
+    click.echo(f"Checkpointed {checkpointed} of {wal_pages} WAL pages{' (blocked by readers)' if busy else ''}.")
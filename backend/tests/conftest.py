@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+import pytest
+
+# config.py binds the engine when it's imported, so the scratch database has
+# to be in the environment before the app is.
+_database = os.path.join(tempfile.mkdtemp(), 'test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_database}'
+
+from app import app as flask_app  # noqa: E402
+from caching import response_cache, table_versions  # noqa: E402
+from config import db  # noqa: E402
+
+
+def pytest_unconfigure(config):
+    if os.path.exists(_database):
+        os.remove(_database)
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+    # The next test's tables get a fresh epoch; don't serve this one's bodies.
+    response_cache.clear()
+    table_versions.synced_at = None
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
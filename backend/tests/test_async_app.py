@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event
+from starlette.testclient import TestClient
+
+import async_app
+from config import db
+from models import Cuisine, MenuItem, Outlet, User
+
+PATHS = [
+    '/cuisines', '/outlets', '/outlets?fields=id,cuisine', '/outlets?owner_id=1', '/outlets/1',
+    '/menu-items?include=outlet&limit=1',
+]
+
+
+@pytest.fixture
+def async_client(app):
+    with app.app_context():
+        owner = User(name='owner', email='owner@example.com', role='outlet owner', _password_hash='unused')
+        db.session.add(Outlet(name='Mama Oliech', owner=owner, cuisine=Cuisine(name='Luo'), menu_items=[
+            MenuItem(name='Fish', price=800), MenuItem(name='Ugali', price=100),
+        ]))
+        db.session.commit()
+    return TestClient(async_app.app)
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_async_routes_answer_like_flask(client, async_client, path):
+    expected = client.get(path)
+    response = async_client.get(path)
+    assert response.status_code == expected.status_code == 200
+    assert response.content == expected.data
+    assert response.headers['ETag'] == expected.headers['ETag']
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_not_modified_runs_no_query(async_client, path):
+    etag = async_client.get(path).headers['ETag']
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_app.engine.sync_engine, 'before_cursor_execute', record)
+    try:
+        response = async_client.get(path, headers={'If-None-Match': etag})
+    finally:
+        event.remove(async_app.engine.sync_engine, 'before_cursor_execute', record)
+    assert response.status_code == 304
+    assert statements == []
+
+
+def test_writes_change_the_tag(client, async_client):
+    etag = async_client.get('/cuisines').headers['ETag']
+    assert client.post('/cuisines', json={'name': 'Swahili'}).status_code == 201
+    response = async_client.get('/cuisines', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.parametrize('path', [
+    '/cuisines?limit=0', '/outlets?after=abc', '/outlets?owner_id=abc', '/menu-items?outlet_id=abc', '/menu-items?limit=-1',
+])
+def test_bad_arguments_match_flask(client, async_client, path):
+    expected = client.get(path)
+    response = async_client.get(path)
+    assert response.status_code == expected.status_code == 400
+    assert response.json() == expected.get_json()
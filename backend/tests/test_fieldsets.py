@@ -0,0 +1,31 @@
+import pytest
+
+from config import db
+from models import Cuisine, Outlet, User
+
+
+@pytest.fixture
+def outlet(app):
+    with app.app_context():
+        owner = User(name='owner', email='owner@example.com', role='outlet owner', _password_hash='unused')
+        db.session.add(Outlet(name='Mama Oliech', owner=owner, cuisine=Cuisine(name='Luo')))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('query, error', [
+    # /outlets only allows the cuisine to be embedded.
+    ('fields=id,owner', "Unknown field: owner"),
+    ('include=owner', "Unknown include: owner"),
+    ('fields=owner.name', "Unknown include: owner"),
+    ('fields=id,nickname', "Unknown field: nickname"),
+])
+def test_relationships_outside_allowed_are_rejected(client, outlet, query, error):
+    response = client.get(f'/outlets?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_allowed_relationship_named_in_fields_is_embedded(client, outlet):
+    response = client.get('/outlets?fields=name,cuisine')
+    assert response.status_code == 200
+    assert response.get_json()['items'] == [{'name': 'Mama Oliech', 'cuisine': {'id': 1, 'name': 'Luo', 'img_url': None}}]
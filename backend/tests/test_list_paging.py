@@ -0,0 +1,36 @@
+from config import db
+from models import Cuisine, Order, Outlet, User
+
+# The frontend shows growing lists a page at a time, newest first, and asks
+# the server for only the rows a view needs.
+
+
+def _owner(n):
+    return User(name=f'owner{n}', email=f'owner{n}@example.com', role='outlet owner', _password_hash='unused')
+
+
+def test_newest_first_pages_past_a_deleted_cursor(app, client):
+    with app.app_context():
+        user = _owner(0)
+        db.session.add_all(Order(user=user, status='pending', total_price=n) for n in range(5))
+        db.session.commit()
+
+    first = client.get('/orders?sort=-id&limit=2').get_json()
+    assert [order['id'] for order in first['items']] == [5, 4]
+    # The last order shown is deleted before the next page is asked for.
+    assert client.delete(f"/orders/{first['next_cursor']}").status_code in (200, 204)
+    second = client.get(f"/orders?sort=-id&limit=2&after={first['next_cursor']}").get_json()
+    assert [order['id'] for order in second['items']] == [3, 2]
+
+
+def test_outlets_narrow_to_an_owner(app, client):
+    with app.app_context():
+        cuisine = Cuisine(name='Swahili')
+        owners = [_owner(n) for n in range(2)]
+        db.session.add_all(Outlet(name=f'outlet{n}', cuisine=cuisine, owner=owners[n % 2]) for n in range(4))
+        db.session.commit()
+        owner_id = owners[1].id
+
+    outlets = client.get(f'/outlets?owner_id={owner_id}').get_json()['items']
+    assert [outlet['name'] for outlet in outlets] == ['outlet1', 'outlet3']
+    assert client.get('/outlets?owner_id=abc').status_code == 400
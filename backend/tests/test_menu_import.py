@@ -0,0 +1,85 @@
+import json
+import threading
+
+import pytest
+
+from config import db
+from menu_import import validate_row
+from models import MenuItem, Outlet
+
+
+@pytest.mark.parametrize('fmt, price, expected', [
+    ('csv', '12', 12),
+    ('csv', ' 0 ', 0),
+    ('ndjson', 12, 12),
+    ('ndjson', 12.0, 12),
+])
+def test_whole_prices_are_accepted(fmt, price, expected):
+    assert validate_row({'name': 'Pilau', 'price': price}, fmt)['price'] == expected
+
+
+@pytest.mark.parametrize('fmt, price', [
+    ('csv', '12.5'),
+    ('csv', ''),
+    ('ndjson', 12.5),
+    ('ndjson', True),
+    ('ndjson', '12'),
+    ('ndjson', None),
+])
+def test_other_prices_are_rejected(fmt, price):
+    with pytest.raises(ValueError, match='price must be a whole number'):
+        validate_row({'name': 'Pilau', 'price': price}, fmt)
+
+
+@pytest.fixture
+def outlet_id(app):
+    with app.app_context():
+        outlet = Outlet(name='Mama Oliech')
+        db.session.add(outlet)
+        db.session.commit()
+        return outlet.id
+
+
+def _import(app, outlet_id, rows):
+    body = ''.join(json.dumps(row) + '\n' for row in rows)
+    return app.test_client().post(
+        f'/outlets/{outlet_id}/menu-items/import?format=ndjson', data=body, content_type='application/x-ndjson',
+    )
+
+
+def _menu(app, outlet_id):
+    with app.app_context():
+        return sorted(
+            (item.name, item.price, item.category)
+            for item in MenuItem.query.filter_by(outlet_id=outlet_id)
+        )
+
+
+def test_import_updates_dishes_by_name(app, outlet_id):
+    first = _import(app, outlet_id, [{'name': 'Pilau', 'price': 300, 'category': 'Mains'}, {'name': 'Chai', 'price': 50}])
+    assert first.get_json() == {'inserted': 2, 'updated': 0, 'errors': []}
+    # Fields a row leaves out keep their values.
+    second = _import(app, outlet_id, [{'name': 'Pilau', 'price': 350}, {'name': 'Mandazi', 'price': True}])
+    assert second.get_json() == {
+        'inserted': 0, 'updated': 1, 'errors': [{'row': 2, 'error': 'price must be a whole number.'}],
+    }
+    assert _menu(app, outlet_id) == [('Chai', 50, None), ('Pilau', 350, 'Mains')]
+
+
+def test_concurrent_imports_store_each_dish_once(app, outlet_id):
+    rows = [{'name': f'Dish {n}', 'price': 100 + n} for n in range(200)]
+    start = threading.Barrier(4)
+    statuses = []
+
+    def run():
+        start.wait()
+        statuses.append(_import(app, outlet_id, rows).status_code)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 4
+    assert _menu(app, outlet_id) == sorted((row['name'], row['price'], None) for row in rows)
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.mark.parametrize('query, error', [
+    ('outlet_id=abc', "outlet_id must be a number."),
+    ('user_id=1.5', "user_id must be a number."),
+    ('outlet_id=1&user_id=2', "Filter by outlet_id or user_id, not both."),
+])
+def test_stream_rejects_bad_filters(client, query, error):
+    # A filter that doesn't parse must not fall back to every outlet's orders.
+    response = client.get(f'/orders/stream?{query}')
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import models
+import passwords
+from config import db
+from models import User
+from passwords import PasswordHasher
+
+EMAIL = 'owner@example.com'
+PASSWORD = 'correct horse'
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    # Low cost so a burst of real bcrypt checks stays quick.
+    hasher = PasswordHasher(rounds=4, workers=2, max_pending=4)
+    monkeypatch.setattr(models, 'password_hasher', hasher)
+    yield hasher
+    hasher.executor.shutdown()
+
+
+@pytest.fixture
+def user(app, hasher):
+    with app.app_context():
+        user = User(name='owner', email=EMAIL, phone_no=700000000, role='outlet owner')
+        user.password_hash = PASSWORD
+        db.session.add(user)
+        db.session.commit()
+
+
+def _login(app, password):
+    return app.test_client().post('/login', json={'email': EMAIL, 'password': password}).status_code
+
+
+def test_logins_past_the_pending_limit_are_turned_away(app, user, monkeypatch):
+    # Checks block until released, so the first four logins hold every slot.
+    release = threading.Event()
+    lock = threading.Lock()
+    running = most_running = 0
+    check = passwords.bcrypt.check_password_hash
+
+    def blocking_check(password_hash, password):
+        nonlocal running, most_running
+        with lock:
+            running += 1
+            most_running = max(most_running, running)
+        release.wait(10)
+        with lock:
+            running -= 1
+        return check(password_hash, password)
+
+    monkeypatch.setattr(passwords.bcrypt, 'check_password_hash', blocking_check)
+    with ThreadPoolExecutor(8) as pool:
+        logins = [pool.submit(_login, app, PASSWORD) for _ in range(8)]
+        # The rest answer without waiting for a slot.
+        deadline = time.monotonic() + 10
+        while sum(login.done() for login in logins) < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        turned_away = [login.result() for login in logins if login.done()]
+        release.set()
+        statuses = [login.result(10) for login in logins]
+
+    assert turned_away == [503] * 4
+    assert sorted(statuses) == [200] * 4 + [503] * 4
+    assert most_running == 2  # the pool's workers
+
+
+def test_wrong_passwords_are_rejected_under_load(app, user):
+    def login(password):
+        # Retry turned-away logins, as a client honouring Retry-After would.
+        while (status := _login(app, password)) == 503:
+            time.sleep(0.01)
+        return status
+
+    attempts = [PASSWORD, 'wrong horse', '', PASSWORD.upper()] * 8
+    with ThreadPoolExecutor(16) as pool:
+        statuses = list(pool.map(login, attempts))
+
+    for password, status in zip(attempts, statuses):
+        assert status == (200 if password == PASSWORD else 401), password
+
+
+def test_login_rehashes_at_the_new_cost(app, user, monkeypatch):
+    # The user was hashed at cost 4; raising it upgrades the hash on login.
+    stronger = PasswordHasher(rounds=5, workers=0, max_pending=1)
+    monkeypatch.setattr(models, 'password_hasher', stronger)
+
+    assert _login(app, 'wrong horse') == 401
+    with app.app_context():
+        assert User.query.one()._password_hash.startswith('$2b$04$')
+    assert _login(app, PASSWORD) == 200
+    with app.app_context():
+        stored = User.query.one()._password_hash
+    assert stored.startswith('$2b$05$')
+    assert not stronger.needs_rehash(stored)
+    assert _login(app, PASSWORD) == 200
@@ -0,0 +1,65 @@
+from datetime import date, time
+
+import pytest
+from sqlalchemy import event
+
+from caching import response_cache, table_versions
+from config import db
+from models import Cuisine, MenuItem, Order, OrderItem, Outlet, Reservation, Table, User
+
+# The list endpoints eager-load what their default response embeds, so the
+# statements a request runs shouldn't grow with the rows it returns.
+
+
+def _seed(start, stop):
+    cuisine = Cuisine.query.first() or Cuisine(name='Swahili')
+    for n in range(start, stop):
+        # Every row gets its own owner, outlet and table, so a lazy load per
+        # row would show up as extra statements.
+        owner = User(name=f'owner{n}', email=f'owner{n}@example.com', phone_no=n, role='outlet owner',
+                     _password_hash='unused')
+        outlet = Outlet(name=f'outlet{n}', cuisine=cuisine, owner=owner)
+        menu_item = MenuItem(name=f'dish{n}', price=100, outlet=outlet)
+        order = Order(user=owner, status='pending', total_price=200, order_items=[
+            OrderItem(menu_item=menu_item, quantity=1, sub_total=100),
+            OrderItem(menu_item=menu_item, quantity=1, sub_total=100),
+        ])
+        table = Table(table_number=n + 1, capacity=4, is_available='Yes')
+        db.session.add(Reservation(user=owner, order=order, table=table, booking_date=date(2030, 1, 1),
+                                   booking_time=time(12), end_time=time(13, 30), no_of_people=2, status='confirmed'))
+    db.session.commit()
+
+
+def _statements(app, path):
+    client = app.test_client()
+    client.get(path)  # first-request setup isn't what's being counted
+    response_cache.clear()
+    executed = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    return len(response.get_json()['items']), len(executed)
+
+
+@pytest.mark.parametrize('path', ['/orders', '/reservations', '/menu-items', '/outlets'])
+def test_list_statements_dont_grow_with_rows(app, path, monkeypatch):
+    # Keep version syncs out of the counted requests.
+    monkeypatch.setattr(table_versions, 'sync_interval', 3600)
+    with app.app_context():
+        _seed(0, 2)
+    few = _statements(app, path)
+    with app.app_context():
+        _seed(2, 20)
+    many = _statements(app, path)
+
+    assert (few[0], many[0]) == (2, 20)
+    assert few[1] == many[1]
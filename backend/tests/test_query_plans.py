@@ -0,0 +1,117 @@
+from datetime import date, datetime, time
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+import search
+from config import db
+from models import Cuisine, MenuItem, Order, OrderItem, Outlet, Reservation, Table, User
+from search import rebuild_search_index
+
+# Replays the read endpoints, EXPLAINs every filtered SELECT they issue, and
+# fails if one falls back to a full table scan. Unfiltered list queries read
+# the whole table by design and are skipped.
+
+PATHS = [
+    '/users', '/users/{user}',
+    '/cuisines', '/cuisines/{cuisine}',
+    '/outlets', '/outlets?owner_id={user}', '/outlets/{outlet}', '/outlets/{outlet}/analytics',
+    '/menu-items', '/menu-items?outlet_id={outlet}', '/menu-items?limit=5&after={menu_item}', '/menu-items/{menu_item}',
+    '/orders', '/orders?limit=5&after={order}', '/orders/{order}',
+    '/orders?outlet_id={outlet}&limit=20', '/orders?status=pending&limit=20', '/orders?user_id={user}&sort=-created_at&limit=20',
+    '/orders?created_from=2030-01-01&created_to=2030-01-31', '/orders?sort=-created_at&limit=5&after={order}',
+    '/orders?sort=-id&status=pending&outlet_id={outlet}&limit=5&after={order}',
+    '/order-items', '/order-items/{order_item}',
+    '/tables', '/tables/{table}', '/tables/available?date=2030-01-01&time=19:00:00&party_size=2',
+    '/reservations', '/reservations?limit=5&after={reservation}', '/reservations/{reservation}',
+    '/reservations?outlet_id={outlet}', '/reservations?status=Cancelled', '/reservations?table_id={table}&sort=booking_date,booking_time',
+    '/reservations?user_id={user}', '/reservations?sort=-id&limit=5&after={reservation}',
+    '/reservations?date_from=2030-01-01&date_to=2030-01-31', '/reservations?sort=-booking_date&limit=5&after={reservation}',
+    '/menu-items/{menu_item}/recommendations', '/menu-items/popular', '/menu-items/popular?window=24h&outlet_id={outlet}', '/menu-items/popular?window=30d&cuisine_id={cuisine}',
+    '/menu-items/popular?by=outlet', '/menu-items/popular?by=cuisine',
+    '/search?q=chicken', '/search?q=chiken&type=menu_item',
+    '/outlets/{outlet}/kitchen/queue',
+]
+
+# Lookup tables small enough that a scan is cheaper than an index.
+SMALL_TABLES = {'cuisines', 'tables'}
+
+
+def _seed():
+    cuisine = Cuisine(name='Swahili')
+    for n in range(3):
+        owner = User(name=f'owner{n}', email=f'owner{n}@example.com', phone_no=n, role='outlet owner',
+                     _password_hash='unused')
+        outlet = Outlet(name=f'outlet{n}', cuisine=cuisine, owner=owner)
+        menu_item = MenuItem(name=f'chicken {n}', price=100, outlet=outlet)
+        order = Order(user=owner, status='pending', total_price=100, created_at=datetime(2030, 1, 1, 12),
+                      order_items=[OrderItem(menu_item=menu_item, quantity=1, sub_total=100)])
+        table = Table(table_number=n + 1, capacity=4, is_available='Yes')
+        db.session.add(Reservation(user=owner, order=order, table=table, booking_date=date(2030, 1, 1),
+                                   booking_time=time(12), end_time=time(13, 30), no_of_people=2, status='confirmed'))
+    db.session.commit()
+    rebuild_search_index()
+    first = {model: db.session.query(db.func.min(model.id)).scalar() for model in
+             (User, Cuisine, Outlet, MenuItem, Order, OrderItem, Table, Reservation)}
+    return {
+        'user': first[User], 'cuisine': first[Cuisine], 'outlet': first[Outlet], 'menu_item': first[MenuItem],
+        'order': first[Order], 'order_item': first[OrderItem], 'table': first[Table],
+        'reservation': first[Reservation],
+    }
+
+
+def _scans(connection, statement, parameters):
+    details = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    # FTS5 reports a MATCH lookup as a virtual table scan with an M constraint.
+    # Scans of co-routines and materialized subqueries read their results,
+    # not a table.
+    derived = {detail.split()[1] for detail in details if detail.startswith(('CO-ROUTINE ', 'MATERIALIZE '))}
+    return [
+        detail for detail in details
+        if detail.startswith('SCAN ') and not detail.startswith('SCAN CONSTANT')
+        and detail.split()[1] not in SMALL_TABLES and detail.split()[1] not in derived
+        and not ('VIRTUAL TABLE INDEX' in detail and ':M' in detail)
+    ]
+
+
+def _is_filtered(statement):
+    return ' WHERE ' in ' '.join(statement.split()).upper()
+
+
+@pytest.fixture
+def search_index(app, monkeypatch):
+    # drop_all leaves the FTS table behind; don't let later tests search it.
+    monkeypatch.setattr(search, '_fts_ready', False)
+    yield
+    with app.app_context():
+        db.session.execute(db.text("DROP TABLE IF EXISTS search_index"))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_filtered_queries_use_an_index(app, search_index, path):
+    with app.app_context():
+        ids = _seed()
+        token = create_access_token(identity={'id': ids['user'], 'role': 'outlet owner'})
+        engine = db.engine
+    captured = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = app.test_client().get(path.format(**ids), headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+
+    with engine.connect() as connection:
+        scans = {
+            ' '.join(statement.split()): found
+            for statement, parameters in captured if _is_filtered(statement)
+            for found in [_scans(connection, statement, parameters)] if found
+        }
+    assert scans == {}
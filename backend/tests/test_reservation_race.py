@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config import db
+from models import Reservation, Table, User
+
+BOOKINGS = 300
+
+# Hundreds of clients book the same table for the same slot at once. The slot
+# claim is enforced by the database, so exactly one booking may win.
+
+
+@pytest.fixture(params=[False, True], ids=['default', 'production'])
+def sqlite_mode(app, request, monkeypatch):
+    # Production mode is applied as connections open; start from a fresh pool.
+    monkeypatch.setitem(app.config, 'SQLITE_PRODUCTION_MODE', request.param)
+    with app.app_context():
+        db.engine.dispose()
+    yield request.param
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_one_of_many_concurrent_bookings_wins(app, sqlite_mode):
+    with app.app_context():
+        user = User(name='diner', email='diner@example.com', role='customer', _password_hash='unused')
+        table = Table(table_number=1, capacity=4, is_available='Yes')
+        db.session.add_all([user, table])
+        db.session.commit()
+        booking = {
+            'user_id': user.id, 'table_id': table.id, 'booking_date': '2030-01-01',
+            'booking_time': '19:00:00', 'duration': 90, 'no_of_people': 2,
+        }
+
+    def book(n):
+        # Starts staggered by a quarter hour, so most overlap without matching.
+        minutes = 19 * 60 + 15 * (n % 4)
+        body = {**booking, 'booking_time': f"{minutes // 60:02}:{minutes % 60:02}:00"}
+        return app.test_client().post('/reservations', json=body).status_code
+
+    with ThreadPoolExecutor(32) as pool:
+        statuses = list(pool.map(book, range(BOOKINGS)))
+
+    assert statuses.count(201) == 1
+    assert statuses.count(409) == BOOKINGS - 1
+    with app.app_context():
+        assert Reservation.query.count() == 1
@@ -0,0 +1,116 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from config import db
+from models import Cuisine, DailyOutletOrders, DailySales, HourlySales, MenuItem, Outlet, User
+from rollups import rebuild_rollups
+
+# Every write path has to leave the rollups where rebuild_rollups() would put
+# them, including deletes that reach order lines through a cascade.
+
+
+def _rows(model, *columns):
+    return sorted(
+        tuple(round(value, 6) if isinstance(value, float) else value for value in row)
+        for row in db.session.query(*(getattr(model, column) for column in columns))
+    )
+
+
+def _rollups():
+    sales = ('outlet_id', 'menuitem_id', 'quantity', 'revenue', 'order_count')
+    return {
+        'daily_sales': _rows(DailySales, 'day', *sales),
+        'hourly_sales': _rows(HourlySales, 'hour', *sales),
+        'daily_outlet_orders': _rows(DailyOutletOrders, 'outlet_id', 'day', 'status', 'order_count'),
+    }
+
+
+def _assert_matches_rebuild(app):
+    with app.app_context():
+        live = _rollups()
+        rebuild_rollups()
+        assert live == _rollups()
+
+
+@pytest.fixture
+def catalog(app):
+    # Two owners with an outlet each under different cuisines, plus a
+    # customer; ids come back as plain values.
+    with app.app_context():
+        customer = User(name='customer', email='customer@example.com', role='customer', _password_hash='unused')
+        outlets = []
+        for n in range(2):
+            owner = User(name=f'owner{n}', email=f'owner{n}@example.com', role='outlet owner',
+                         _password_hash='unused')
+            outlet = Outlet(name=f'outlet{n}', owner=owner, cuisine=Cuisine(name=f'cuisine{n}'), menu_items=[
+                MenuItem(name=f'dish{n}a', price=100), MenuItem(name=f'dish{n}b', price=250),
+            ])
+            outlets.append(outlet)
+        db.session.add_all([customer, *outlets])
+        db.session.commit()
+        return {
+            'customer': customer.id,
+            'owners': [outlet.owner_id for outlet in outlets],
+            'cuisines': [outlet.cuisine_id for outlet in outlets],
+            'outlets': [outlet.id for outlet in outlets],
+            'items': [item.id for outlet in outlets for item in outlet.menu_items],
+        }
+
+
+@pytest.fixture
+def orders(client, catalog):
+    # One order across both outlets, one from a single outlet.
+    items = catalog['items']
+    ids = []
+    for cart in ([(items[0], 2), (items[1], 1), (items[2], 3)], [(items[3], 1)]):
+        response = client.post('/checkout', json={
+            'user_id': catalog['customer'],
+            'items': [{'menuitem_id': id, 'quantity': quantity} for id, quantity in cart],
+        })
+        assert response.status_code == 201
+        ids.append(response.get_json())
+    return ids
+
+
+def test_checkout_matches_rebuild(app, orders):
+    _assert_matches_rebuild(app)
+
+
+def _order_item_id(order):
+    return order['order_items'][0]['id']
+
+
+WRITES = {
+    'add order item': lambda client, catalog, orders: client.post('/order-items', json={
+        'order_id': orders[1]['id'], 'menuitem_id': catalog['items'][0], 'quantity': 4, 'sub_total': 400,
+    }),
+    'change order item': lambda client, catalog, orders: client.patch(
+        f"/order-items/{_order_item_id(orders[0])}", json={'quantity': 5, 'sub_total': 500},
+    ),
+    'delete order item': lambda client, catalog, orders: client.delete(f"/order-items/{_order_item_id(orders[0])}"),
+    'change order status': lambda client, catalog, orders: client.patch(
+        f"/orders/{orders[0]['id']}", json={'status': 'delivered'},
+    ),
+    'delete order': lambda client, catalog, orders: client.delete(f"/orders/{orders[0]['id']}"),
+    'move menu item': lambda client, catalog, orders: client.patch(
+        f"/menu-items/{catalog['items'][0]}", json={'outlet_id': catalog['outlets'][1]},
+    ),
+    'delete menu item': lambda client, catalog, orders: client.delete(f"/menu-items/{catalog['items'][0]}"),
+    'delete outlet': lambda client, catalog, orders: client.delete(f"/outlets/{catalog['outlets'][0]}"),
+    'delete cuisine': lambda client, catalog, orders: client.delete(f"/cuisines/{catalog['cuisines'][1]}"),
+    'delete user': lambda client, catalog, orders: client.delete(
+        f"/users/{catalog['customer']}", headers={'Authorization': f"Bearer {_token(client.application)}"},
+    ),
+}
+
+
+def _token(app):
+    with app.app_context():
+        return create_access_token(identity={'id': 0, 'role': 'admin'})
+
+
+@pytest.mark.parametrize('write', WRITES)
+def test_writes_match_rebuild(app, client, catalog, orders, write):
+    response = WRITES[write](client, catalog, orders)
+    assert response.status_code in (200, 201), response.get_data(as_text=True)
+    _assert_matches_rebuild(app)
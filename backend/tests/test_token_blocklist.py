@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from config import db
+from models import RevokedToken
+from token_blocklist import DatabaseBlocklistStore, TokenBlocklist
+
+
+def _blocklist():
+    # Syncs on every check, and never rebuilds during a test.
+    return TokenBlocklist(DatabaseBlocklistStore(overlap=30), sync_interval=0, prune_interval=3600, capacity=100)
+
+
+def _revoke_elsewhere(jti, id, revoked_at):
+    # A revocation made by another worker, straight into the shared table.
+    with db.engine.begin() as connection:
+        connection.execute(insert(RevokedToken).values(id=id, jti=jti, revoked_at=revoked_at))
+
+
+def test_sync_picks_up_another_workers_revocation(app):
+    with app.app_context():
+        blocklist = _blocklist()
+        assert not blocklist.is_revoked('a')
+        _revoke_elsewhere('a', 1, datetime(2030, 1, 1, 12))
+        assert blocklist.is_revoked('a')
+
+
+def test_sync_picks_up_a_revocation_that_committed_late(app):
+    # The revocation with id 5 was assigned its id and timestamp first, but
+    # committed only after id 10 had been read.
+    stamped = datetime(2030, 1, 1, 12)
+    with app.app_context():
+        blocklist = _blocklist()
+        _revoke_elsewhere('early', 10, stamped + timedelta(seconds=1))
+        assert blocklist.is_revoked('early')
+        _revoke_elsewhere('late', 5, stamped)
+        assert blocklist.is_revoked('late')
+
+
+def test_sync_rereads_only_the_overlap(app):
+    stamped = datetime(2030, 1, 1, 12)
+    with app.app_context():
+        store = DatabaseBlocklistStore(overlap=30)
+        _revoke_elsewhere('old', 1, stamped - timedelta(minutes=5))
+        _revoke_elsewhere('recent', 2, stamped - timedelta(seconds=10))
+        _revoke_elsewhere('newest', 3, stamped)
+        jtis, marker = store.since(None)
+        assert sorted(jtis) == ['newest', 'old', 'recent'] and marker == stamped
+        jtis, marker = store.since(marker)
+        assert sorted(jtis) == ['newest', 'recent'] and marker == stamped
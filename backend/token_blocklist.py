@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import click
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from config import app, db, jwt
+from models import RevokedToken
+
+# Revoked JWTs, shared by every worker through the revoked_tokens table. Each
+# process keeps a Bloom filter of the jtis revoked so far: a token the filter
+# has never seen is cleared without touching the database, and only a possible
+# hit is confirmed against the store. The filter pulls newly revoked jtis every
+# JWT_BLOCKLIST_SYNC_INTERVAL seconds, which bounds how long a logout on one
+# worker takes to reach the others. Each pull re-reads the last
+# JWT_BLOCKLIST_SYNC_OVERLAP seconds of revocations, so one that commits after
+# a later one was already seen still arrives. Entries are pruned once the token
+# has expired, since an expired token is rejected before the blocklist is asked.
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # hash() is salted per process, which is fine for a per-process filter.
+        first, second = hash(key), hash((key, 'bloom'))
+        size = self.size
+        for i in range(self.hashes):
+            yield (first + i * second) % size
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        # Most lookups miss, and a miss usually stops at the first clear bit.
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class DatabaseBlocklistStore:
+    # Uses its own connections, so a revocation or a prune never rides on (or
+    # commits) the request's session. Any object with the same four methods can
+    # stand in for it.
+
+    def __init__(self, overlap):
+        self.overlap = timedelta(seconds=overlap)
+
+    def add(self, jti, expires_at):
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(RevokedToken).values(jti=jti, expires_at=expires_at))
+        except IntegrityError:
+            pass  # already revoked
+
+    def contains(self, jti):
+        with db.engine.connect() as connection:
+            return connection.execute(
+                select(RevokedToken.id).where(RevokedToken.jti == jti).limit(1)
+            ).first() is not None
+
+    def since(self, marker):
+        # Returns the jtis revoked after marker (all of them for None), and the
+        # marker to resume from. Ids and revoked_at are both assigned before a
+        # revocation commits, so a slow commit can land behind rows already
+        # read; re-reading an overlap on the database's own clock picks it up.
+        query = select(RevokedToken.jti, RevokedToken.revoked_at)
+        if marker is not None:
+            query = query.where(RevokedToken.revoked_at >= marker - self.overlap)
+        with db.engine.connect() as connection:
+            rows = connection.execute(query).all()
+        return [jti for jti, _ in rows], max((revoked_at for _, revoked_at in rows if revoked_at), default=marker)
+
+    def prune(self, now):
+        with db.engine.begin() as connection:
+            return connection.execute(delete(RevokedToken).where(RevokedToken.expires_at < now)).rowcount
+
+
+class TokenBlocklist:
+
+    def __init__(self, store, sync_interval, prune_interval, capacity):
+        self.store = store
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.filter = None
+        self.marker = None
+        self.synced_at = self.pruned_at = None
+
+    def revoke(self, jti, exp=None):
+        expires_at = datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None) if exp else None
+        self.store.add(jti, expires_at)
+        self._refresh()
+        with self.lock:
+            self.filter.add(jti)
+
+    def is_revoked(self, jti):
+        self._refresh()
+        return jti in self.filter and self.store.contains(jti)
+
+    def prune(self):
+        with self.lock:
+            return self._rebuild(time.monotonic())
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self.synced_at is not None and now - self.synced_at < self.sync_interval:
+            return
+        with self.lock:
+            if self.synced_at is not None and now - self.synced_at < self.sync_interval:
+                return  # another thread synced while this one waited
+            if self.filter is None or now - self.pruned_at >= self.prune_interval:
+                self._rebuild(now)
+            else:
+                jtis, self.marker = self.store.since(self.marker)
+                for jti in jtis:
+                    self.filter.add(jti)
+            self.synced_at = now
+
+    def _rebuild(self, now):
+        # Pruned jtis can't be taken out of a Bloom filter, so start a new one.
+        pruned = self.store.prune(_utcnow())
+        jtis, marker = self.store.since(None)
+        bloom = BloomFilter(max(self.capacity, len(jtis)))
+        for jti in jtis:
+            bloom.add(jti)
+        self.filter, self.marker, self.pruned_at = bloom, marker, now
+        return pruned
+
+
+token_blocklist = TokenBlocklist(
+    DatabaseBlocklistStore(app.config['JWT_BLOCKLIST_SYNC_OVERLAP']),
+    app.config['JWT_BLOCKLIST_SYNC_INTERVAL'],
+    app.config['JWT_BLOCKLIST_PRUNE_INTERVAL'],
+    app.config['JWT_BLOCKLIST_BLOOM_CAPACITY'],
+)
+
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    return token_blocklist.is_revoked(jwt_payload["jti"])
+
+
+@app.cli.command('prune-token-blocklist')
+def prune_token_blocklist_command():
+    """Drop revoked tokens that have since expired."""
+    click.echo(f"Pruned {token_blocklist.prune()} expired tokens.")
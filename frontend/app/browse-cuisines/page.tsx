@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from 'react';
 import { useSearchParams } from 'next/navigation';
-import { fetchCuisines, fetchOutlets, fetchMenuItems } from '@/lib/api';
+import { fetchCuisines, fetchOutlets, fetchMenuItemsByOutlet } from '@/lib/api';
 
 interface MenuItem {
   id: number;
@@ -24,7 +24,6 @@ interface Restaurant {
   };
   description: string;
   cuisine_id: number;
-  menuItems?: MenuItem[];
 }
 
 interface Cuisine {
@@ -37,6 +36,7 @@ export default function BrowseCuisines() {
   const [restaurants, setRestaurants] = useState<Restaurant[]>([]);
   const [cuisines, setCuisines] = useState<Cuisine[]>([]);
   const [menuItems, setMenuItems] = useState<MenuItem[]>([]);
+  const [loadingMenu, setLoadingMenu] = useState(false);
   const [loading, setLoading] = useState(true);
 
   const searchParams = useSearchParams();
@@ -51,22 +51,13 @@ export default function BrowseCuisines() {
       try {
         setLoading(true);
         
-        const [cuisinesData, restaurantsData, menuItemsData] = await Promise.all([
+        const [cuisinesData, restaurantsData] = await Promise.all([
           fetchCuisines(),
           fetchOutlets(),
-          fetchMenuItems(),
         ]);
 
         setCuisines(cuisinesData);
         setRestaurants(restaurantsData);
-        setMenuItems(menuItemsData);
-
-        const restaurantsWithMenus = restaurantsData.map((restaurant: any) => ({
-          ...restaurant,
-          menuItems: menuItemsData.filter((item: MenuItem) => item.outlet_id === restaurant.id)
-        }));
-
-        setRestaurants(restaurantsWithMenus);
       } catch (error) {
         console.error('Failed to fetch data:', error);
       } finally {
@@ -77,15 +68,6 @@ export default function BrowseCuisines() {
     fetchData();
   }, []);
 
-  if (loading) {
-    return (
-      <div className="flex flex-col justify-center items-center min-h-screen space-y-4">
-        <div className="w-12 h-12 border-4 border-orange-500 border-solid rounded-full border-t-transparent animate-spin"></div>
-        <p className="text-orange-600 text-lg">Loading cuisines...</p>
-      </div>
-    );
-  }
-
   const filteredRestaurants = restaurants.filter((restaurant) => {
     const cuisineName = restaurant.cuisine?.name || '';
     const matchesCuisine = selectedCuisine === '' || cuisineName === selectedCuisine;
@@ -104,6 +86,29 @@ export default function BrowseCuisines() {
   const selectedRestaurantData = restaurants.find((r) => r.id === selectedRestaurant) ||
     (restaurantsForCuisine.length === 1 ? restaurantsForCuisine[0] : null);
 
+  // Only the menu being shown is fetched, not every outlet's.
+  const menuOutletId = selectedRestaurantData?.id;
+  useEffect(() => {
+    setMenuItems([]);
+    if (menuOutletId === undefined) return;
+    let current = true;
+    setLoadingMenu(true);
+    fetchMenuItemsByOutlet(menuOutletId.toString())
+      .then(items => { if (current) setMenuItems(items); })
+      .catch(error => console.error('Failed to fetch menu:', error))
+      .finally(() => { if (current) setLoadingMenu(false); });
+    return () => { current = false; };
+  }, [menuOutletId]);
+
+  if (loading) {
+    return (
+      <div className="flex flex-col justify-center items-center min-h-screen space-y-4">
+        <div className="w-12 h-12 border-4 border-orange-500 border-solid rounded-full border-t-transparent animate-spin"></div>
+        <p className="text-orange-600 text-lg">Loading cuisines...</p>
+      </div>
+    );
+  }
+
   return (
     <div className="relative">
       <div className="mb-8">
@@ -189,9 +194,6 @@ export default function BrowseCuisines() {
               >
                 <h3 className="text-xl font-bold text-gray-800 dark:text-white">{restaurant.name}</h3>
                 <p className="text-lg text-gray-600 dark:text-gray-300 mt-2">{restaurant.description}</p>
-                <p className="text-lg text-orange-600 dark:text-orange-400 mt-3 font-semibold">
-                  {restaurant.menuItems?.length || 0} dishes available
-                </p>
               </button>
             ))}
           </div>
@@ -212,9 +214,13 @@ export default function BrowseCuisines() {
             </button>
           </div>
           
-          {selectedRestaurantData.menuItems && selectedRestaurantData.menuItems.length > 0 ? (
+          {loadingMenu ? (
+            <div className="text-center py-12">
+              <p className="text-xl text-gray-500 dark:text-gray-400">Loading menu...</p>
+            </div>
+          ) : menuItems.length > 0 ? (
             <div className="grid md:grid-cols-2 gap-6">
-              {selectedRestaurantData.menuItems.map((menuItem) => (
+              {menuItems.map((menuItem) => (
                 <div
                   key={menuItem.id}
                   className="border-2 border-gray-200 dark:border-gray-600 rounded-xl p-6 bg-white dark:bg-gray-700 hover:shadow-lg transition-all duration-300"
@@ -300,9 +306,6 @@ export default function BrowseCuisines() {
                   <p className="text-gray-600 dark:text-gray-300 text-lg mb-4 line-clamp-3">
                     {restaurant.description}
                   </p>
-                  <p className="text-sm text-gray-500 dark:text-gray-400 mb-4">
-                    {restaurant.menuItems?.length || 0} menu items available
-                  </p>
                   <button
                     onClick={() => setSelectedRestaurant(restaurant.id)}
                     className="w-full bg-gradient-to-r from-orange-500 to-red-500 text-white px-6 py-3 rounded-xl text-lg font-semibold hover:from-orange-600 hover:to-red-600 transition-all duration-300 transform hover:scale-105 shadow-lg"
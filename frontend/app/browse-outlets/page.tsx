@@ -2,7 +2,8 @@
             
 import Image from 'next/image';
 import Link from 'next/link';
-import { useEffect, useState } from 'react';
+import { useEffect } from 'react';
+import { usePagedList } from '@/lib/usePagedList';
 
 interface Restaurant {
   id: number;
@@ -13,7 +14,8 @@ interface Restaurant {
 }
 
 export default function BrowseOutlets() {
-  const [restaurants, setRestaurants] = useState<Restaurant[]>([]);
+  // A page of outlets at a time.
+  const { items: restaurants, hasMore, loading, error, loadMore } = usePagedList<Restaurant>('/outlets');
   const getValidImageUrl = (rawUrl: string): string => {
     try {
       const urlObj = new URL(rawUrl);
@@ -25,19 +27,10 @@ export default function BrowseOutlets() {
   };
 
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const outletsRes = await fetch('http://localhost:5555/outlets');
-
-        const outletsData = await outletsRes.json();
-
-        setRestaurants(outletsData);
-      } catch (error) {
-        console.error("Failed to fetch data:", error);
-      }
-    };
-    fetchData();
-  }, []);
+    if (error) {
+      console.error("Failed to fetch data:", error);
+    }
+  }, [error]);
 
   const displayRestaurants = restaurants;
 
@@ -82,6 +75,18 @@ export default function BrowseOutlets() {
           </div>
         ))}
       </div>
+
+      {hasMore && (
+        <div className="mt-8 text-center">
+          <button
+            onClick={loadMore}
+            disabled={loading}
+            className="bg-gradient-to-r from-orange-500 to-red-500 text-white px-6 py-3 rounded-md font-medium hover:from-orange-600 hover:to-red-600 transition-colors disabled:opacity-50"
+          >
+            {loading ? 'Loading...' : 'Load More Outlets'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
@@ -2,6 +2,8 @@
 
 import { useState, useEffect } from 'react';
 import { Clock, CheckCircle, Truck, Package, Trash2 } from 'lucide-react';
+import { fetchOutlets } from '@/lib/api';
+import { usePagedList } from '@/lib/usePagedList';
 
 interface Order {
   id: string;
@@ -22,36 +24,28 @@ interface Order {
 }
 
 export default function OrderManagement() {
-  const [orders, setOrders] = useState<Order[]>([]);
   const [restaurants, setRestaurants] = useState<{ id: string; name: string }[]>([]);
-  const [orderItems, setOrderItems] = useState<Order[]>([]);
   const [selectedStatus, setSelectedStatus] = useState<string>('all');
   const [selectedRestaurant, setSelectedRestaurant] = useState<string>('all');
 
   const isOwner = typeof window !== 'undefined' && localStorage.getItem('userType') === 'owner';
 
-  useEffect(() => {
-    const fetchOrders = async () => {
-      
-      const fetchedOrders: Order[] = await fetch('http://localhost:5555/orders').then(res => res.json());
-      setOrders(fetchedOrders);
-    };
+  // Newest first, filtered by the server, a page at a time.
+  const orderParams: Record<string, string> = { sort: '-id' };
+  if (selectedStatus !== 'all') orderParams.status = selectedStatus;
+  if (selectedRestaurant !== 'all') orderParams.outlet_id = selectedRestaurant;
+  const {
+    items: orders, setItems: setOrders, hasMore, loading, loadMore,
+  } = usePagedList<Order>('/orders', orderParams, { enabled: isOwner });
 
+  useEffect(() => {
     const fetchRestaurants = async () => {
       
-      const fetchedRestaurants = await fetch('http://localhost:5555/outlets').then(res => res.json());
+      const fetchedRestaurants = await fetchOutlets();
       setRestaurants(fetchedRestaurants);
     };
 
-    const fetchOrderItems = async () => {
-      const fetchedOrderItems = await fetch('http://localhost:5555/order-items').then(res => res.json());
-      setOrderItems(fetchedOrderItems);
-    };
-    
-
-    fetchOrders();
     fetchRestaurants();
-    fetchOrderItems();
   }, []);
 
   if (!isOwner) {
@@ -82,9 +76,10 @@ export default function OrderManagement() {
     }).then(res => res.json());
 
     
-    setOrders(orders.map(order => (order.id === orderId ? updatedOrder : order)));
-    setSelectedStatus('all'); 
-    setSelectedRestaurant('all'); 
+    // An order that no longer matches the status filter leaves the list.
+    setOrders(orders
+      .map(order => (order.id === orderId ? updatedOrder : order))
+      .filter(order => selectedStatus === 'all' || order.status === selectedStatus));
   };
 
   const deleteOrder = async(orderId: string) => {
@@ -95,16 +90,8 @@ export default function OrderManagement() {
 
     // Update local state
     setOrders(orders.filter(order => order.id !== orderId));
-    setSelectedStatus('all');
-    setSelectedRestaurant('all');
   };
 
-  const filteredOrders = orders.filter(order => {
-    const statusMatch = selectedStatus === 'all' || order.status === selectedStatus;
-    const restaurantMatch = selectedRestaurant === 'all' || order.restaurantId === selectedRestaurant;
-    return statusMatch && restaurantMatch;
-  });
-
   const getStatusIcon = (status: Order['status']) => {
     switch (status) {
       case 'pending':
@@ -189,7 +176,7 @@ export default function OrderManagement() {
 
         {/* Orders List */}
         <div className="space-y-6">
-          {filteredOrders.length === 0 ? (
+          {orders.length === 0 ? (
             <div className="bg-white dark:bg-gray-800 rounded-xl shadow-lg p-12 text-center">
               <Package className="w-16 h-16 text-gray-400 mx-auto mb-4" />
               <h3 className="text-2xl font-bold text-gray-800 dark:text-white mb-2">No Orders Found</h3>
@@ -198,7 +185,7 @@ export default function OrderManagement() {
               </p>
             </div>
           ) : (
-            filteredOrders.map((order) => (
+            orders.map((order) => (
               <div key={order.id} className="bg-white dark:bg-gray-800 rounded-xl shadow-lg p-6">
                 <div className="flex justify-between items-start mb-4">
                   <div>
@@ -313,6 +300,18 @@ export default function OrderManagement() {
             ))
           )}
         </div>
+
+        {hasMore && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loading}
+              className="bg-gradient-to-r from-orange-500 to-red-500 text-white px-8 py-3 rounded-xl font-bold hover:from-orange-600 hover:to-red-600 transition-all duration-300 disabled:opacity-50"
+            >
+              {loading ? 'Loading...' : 'Load More Orders'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
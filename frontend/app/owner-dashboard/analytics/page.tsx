@@ -38,60 +38,24 @@ export default function OwnerAnalytics() {
       try {
         setLoading(true);
         
-        const [reservationsRes, ordersRes, menuItemsRes] = await Promise.all([
-          fetch('http://localhost:5555/reservations'),
-          fetch('http://localhost:5555/orders'),
-          fetch('http://localhost:5555/menu-items')
-        ]);
-
-        let reservations = await reservationsRes.json();
-        let orders = await ordersRes.json();
-        const menuItems = await menuItemsRes.json();
-
-        if (selectedOutlet) {
-          const outletMenuItems = menuItems.filter((item: any) => item.outlet_id === parseInt(selectedOutlet));
-          const outletMenuItemIds = outletMenuItems.map((item: any) => item.id);
-          
-          orders = orders.filter((order: any) => {
-            return order.order_items?.some((item: any) => outletMenuItemIds.includes(item.menu_item?.id));
-          });
-
-        }
-
         const today = new Date().toISOString().split('T')[0];
-        const todayOrders = orders.filter((order: any) => 
-          order.created_at && order.created_at.startsWith(today)
-        );
-
-        const dishCounts: { [key: string]: number } = {};
-        orders.forEach((order: any) => {
-          if (order.order_items) {
-            order.order_items.forEach((item: any) => {
-              const dishName = item.menu_item?.name || 'Unknown Dish';
-              dishCounts[dishName] = (dishCounts[dishName] || 0) + item.quantity;
-            });
-          }
-        });
-
-        const mostOrderedDish = Object.keys(dishCounts).reduce((a, b) => 
-          dishCounts[a] > dishCounts[b] ? a : b, 'No orders yet'
-        );
+        const [overallRes, todayRes] = await Promise.all([
+          fetch(`http://localhost:5555/outlets/${selectedOutlet}/analytics`),
+          fetch(`http://localhost:5555/outlets/${selectedOutlet}/analytics?from=${today}&to=${today}`)
+        ]);
 
-        const totalRevenue = orders.reduce((sum: number, order: any) => 
-          sum + (order.total_price || 0), 0
-        );
+        const overall = await overallRes.json();
+        const todayStats = await todayRes.json();
 
-        const completedOrders = orders.filter((order: any) => 
-          order.status === 'delivered'
-        ).length;
+        const completedOrders = overall.orders_by_status?.delivered || 0;
 
         setAnalyticsData({
-          totalReservations: reservations.length,
-          totalOrdersToday: todayOrders.length,
-          mostOrderedDish,
-          totalRevenue,
+          totalReservations: overall.reservation_count,
+          totalOrdersToday: todayStats.order_count,
+          mostOrderedDish: overall.top_items?.[0]?.name || 'No orders yet',
+          totalRevenue: overall.revenue,
           averageRating: 4.2, 
-          completionRate: orders.length > 0 ? Math.round((completedOrders / orders.length) * 100) : 0
+          completionRate: overall.order_count > 0 ? Math.round((completedOrders / overall.order_count) * 100) : 0
         });
 
       } catch (error) {
@@ -4,6 +4,8 @@ import { useState, useEffect } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import Swal from 'sweetalert2';
 import { Plus, Edit, Trash2, Save, X } from 'lucide-react';
+import { MENU_ITEM_PARAMS, fetchOutlets } from '@/lib/api';
+import { usePagedList } from '@/lib/usePagedList';
 
 interface MenuItem {
   id: number;
@@ -20,8 +22,7 @@ interface Outlet {
 }
 
 export default function MenuManagement() {
-  const { selectedOutlet } = useAuth();
-  const [menuItems, setMenuItems] = useState<MenuItem[]>([]);
+  const { user, selectedOutlet } = useAuth();
   const [outlets, setOutlets] = useState<Outlet[]>([]);
   const [loading, setLoading] = useState(true);
   const [editingItem, setEditingItem] = useState<number | null>(null);
@@ -37,24 +38,21 @@ export default function MenuManagement() {
 
   const isOwner = typeof window !== 'undefined' && localStorage.getItem('userType') === 'owner';
 
+  // Only the selected outlet's menu, if one is selected in context, a page at
+  // a time.
+  const {
+    items: menuItems, setItems: setMenuItems, hasMore, loading: loadingMenu, loadMore,
+  } = usePagedList<MenuItem>(
+    '/menu-items',
+    selectedOutlet ? { ...MENU_ITEM_PARAMS, outlet_id: selectedOutlet } : MENU_ITEM_PARAMS,
+    { enabled: isOwner }
+  );
+
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [menuRes, outletsRes] = await Promise.all([
-          fetch('http://localhost:5555/menu-items'),
-          fetch('http://localhost:5555/outlets')
-        ]);
-
-        const menuData = await menuRes.json();
-        const outletsData = await outletsRes.json();
-
-        // Filter menu items by outlet ID if provided in context
-        const filteredMenuData = selectedOutlet 
-          ? menuData.filter((item: MenuItem) => item.outlet_id === parseInt(selectedOutlet))
-          : menuData;
-
-        setMenuItems(filteredMenuData);
-        setOutlets(outletsData);
+        // The owner's own outlets, to add items to.
+        setOutlets(await fetchOutlets(user?.id || '0'));
         
         // Set default outlet_id for new items if outlet ID is provided
         if (selectedOutlet) {
@@ -75,7 +73,7 @@ export default function MenuManagement() {
     if (isOwner) {
       fetchData();
     }
-  }, [isOwner, selectedOutlet]);
+  }, [isOwner, selectedOutlet, user]);
 
   useEffect(() => {
     const updateEditingItemData = () => {
@@ -432,7 +430,19 @@ export default function MenuManagement() {
           ))}
         </div>
 
-        {menuItems.length === 0 && (
+        {hasMore && (
+          <div className="mt-6 sm:mt-8 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMenu}
+              className="bg-orange-500 text-white px-6 py-3 rounded-lg font-medium hover:bg-orange-600 transition-colors disabled:opacity-50"
+            >
+              {loadingMenu ? 'Loading...' : 'Load More Items'}
+            </button>
+          </div>
+        )}
+
+        {menuItems.length === 0 && !loadingMenu && (
           <div className="text-center py-8 sm:py-12">
             <p className="text-lg sm:text-xl text-gray-500 dark:text-gray-400">No menu items found</p>
             <button
@@ -4,6 +4,7 @@ import { useState, useEffect } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import Swal from 'sweetalert2';
 import { Clock, CheckCircle, Truck, Package, Trash2 } from 'lucide-react';
+import { usePagedList } from '@/lib/usePagedList';
 
 interface Order {
   id: number;
@@ -26,49 +27,34 @@ interface Order {
 
 export default function OrderManagement() {
   const { selectedOutlet } = useAuth();
-  const [orders, setOrders] = useState<Order[]>([]);
-  const [loading, setLoading] = useState(true);
   const [selectedStatus, setSelectedStatus] = useState<string>('all');
 
   const isOwner = typeof window !== 'undefined' && localStorage.getItem('userType') === 'owner';
 
+  // The server narrows orders to the selected outlet's and status, newest
+  // first, a page at a time.
+  const orderParams: Record<string, string> = { sort: '-id' };
+  if (selectedOutlet) orderParams.outlet_id = selectedOutlet;
+  if (selectedStatus !== 'all') orderParams.status = selectedStatus;
+  const {
+    items: orders, setItems: setOrders, hasMore, loading, error, loadMore,
+  } = usePagedList<Order>('/orders', orderParams, { enabled: isOwner });
+  const [loaded, setLoaded] = useState(false);
+
   useEffect(() => {
-    const fetchOrders = async () => {
-      try {
-        const response = await fetch('http://localhost:5555/orders');
-        const data = await response.json();
-        
-        const menuItemsResponse = await fetch('http://localhost:5555/menu-items');
-        const menuItemsData = await menuItemsResponse.json();
-        
-        if (selectedOutlet) {
-          const outletMenuItems = menuItemsData.filter((item: any) => item.outlet_id === parseInt(selectedOutlet));
-          const outletMenuItemIds = outletMenuItems.map((item: any) => item.id);
-          
-          const filteredOrders = data.filter((order: Order) => {
-            return order.order_items?.some((item: any) => outletMenuItemIds.includes(item.menu_item?.id));
-          });
-          
-          setOrders(filteredOrders);
-        } else {
-          setOrders(data);
-        }
-      } catch (error) {
-        console.error('Failed to fetch orders:', error);
-        Swal.fire({
-          icon: 'error',
-          title: 'Error',
-          text: 'Failed to fetch orders. Please try again.'
-        });
-      } finally {
-        setLoading(false);
-      }
-    };
+    if (!loading) setLoaded(true);
+  }, [loading]);
 
-    if (isOwner) {
-      fetchOrders();
+  useEffect(() => {
+    if (error) {
+      console.error('Failed to fetch orders:', error);
+      Swal.fire({
+        icon: 'error',
+        title: 'Error',
+        text: 'Failed to fetch orders. Please try again.'
+      });
     }
-  }, [isOwner, selectedOutlet]);
+  }, [error]);
 
   const updateOrderStatus = async (orderId: number, newStatus: Order['status']) => {
     try {
@@ -79,11 +65,10 @@ export default function OrderManagement() {
       });
 
       if (response.ok) {
-        setOrders(orders.map(order => 
-          order.id === orderId 
-            ? { ...order, status: newStatus }
-            : order
-        ));
+        // An order that no longer matches the status filter leaves the list.
+        setOrders(orders
+          .map(order => order.id === orderId ? { ...order, status: newStatus } : order)
+          .filter(order => selectedStatus === 'all' || order.status === selectedStatus));
         
         Swal.fire({
           icon: 'success',
@@ -148,10 +133,6 @@ export default function OrderManagement() {
     }
   };
 
-  const filteredOrders = orders.filter(order => {
-    return selectedStatus === 'all' || order.status === selectedStatus;
-  });
-
   const getStatusIcon = (status: Order['status']) => {
     switch (status) {
       case 'pending':
@@ -193,7 +174,7 @@ export default function OrderManagement() {
     );
   }
 
-  if (loading) {
+  if (!loaded) {
     return (
       <div className="min-h-screen bg-gray-50 dark:bg-gray-900 flex items-center justify-center">
         <div className="animate-spin rounded-full h-32 w-32 border-b-2 border-orange-500"></div>
@@ -233,7 +214,7 @@ export default function OrderManagement() {
 
         {/* Orders List */}
         <div className="space-y-4 sm:space-y-6">
-          {filteredOrders.length === 0 ? (
+          {orders.length === 0 ? (
             <div className="bg-white dark:bg-gray-800 rounded-xl shadow-lg p-8 sm:p-12 text-center">
               <Package className="w-12 h-12 sm:w-16 sm:h-16 text-gray-400 mx-auto mb-4" />
               <h3 className="text-xl sm:text-2xl font-bold text-gray-800 dark:text-white mb-2">No Orders Found</h3>
@@ -242,7 +223,7 @@ export default function OrderManagement() {
               </p>
             </div>
           ) : (
-            filteredOrders.map((order) => (
+            orders.map((order) => (
               <div key={order.id} className="bg-white dark:bg-gray-800 rounded-xl shadow-lg p-4 sm:p-6">
                 <div className="flex flex-col sm:flex-row sm:justify-between sm:items-start gap-3 sm:gap-4 mb-4">
                   <div>
@@ -346,6 +327,18 @@ export default function OrderManagement() {
             ))
           )}
         </div>
+
+        {hasMore && (
+          <div className="mt-6 sm:mt-8 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loading}
+              className="bg-orange-500 text-white px-6 py-3 rounded-lg font-medium hover:bg-orange-600 transition-colors disabled:opacity-50"
+            >
+              {loading ? 'Loading...' : 'Load More Orders'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -6,13 +6,15 @@ import { useAuth } from '@/contexts/AuthContext';
 import { useRouter } from 'next/navigation';
 import Swal from 'sweetalert2';
 import { Plus } from 'lucide-react';
+import { fetchCuisines, fetchMenuItemsByOutlet, fetchOutletAnalytics, fetchOutlets } from '@/lib/api';
 
 
 export default function OwnerDashboard() {
   const { user, isLoggedIn, selectedOutlet, setSelectedOutlet } = useAuth();
   const router = useRouter();
   const [outlets, setOutlets] = useState([]);
-  const [orders, setOrders] = useState([]);
+  const [totalRevenue, setTotalRevenue] = useState(0);
+  const [ordersToday, setOrdersToday] = useState(0);
   const [menuItems, setMenuItems] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showAddOutlet, setShowAddOutlet] = useState(false);
@@ -44,15 +46,7 @@ export default function OwnerDashboard() {
   const fetchData = async () => {
     try {
       setLoading(true);
-      const [outletsRes, cuisinesRes] = await Promise.all([
-        fetch('http://localhost:5555/outlets'),
-        fetch('http://localhost:5555/cuisines'),
-      ]);
-      
-      const outletsData = await outletsRes.json();
-      const cuisinesData = await cuisinesRes.json();
-        
-      const userOutlets = outletsData.filter((outlet: any) => outlet.owner_id === parseInt(user?.id || '0'));
+      const [userOutlets, cuisinesData] = await Promise.all([fetchOutlets(user?.id || '0'), fetchCuisines()]);
       
       setOutlets(userOutlets);
       setCuisines(cuisinesData);
@@ -77,22 +71,16 @@ export default function OwnerDashboard() {
     
     try {
       setLoading(true);
-      const [ordersRes, menuItemsRes] = await Promise.all([
-        fetch('http://localhost:5555/orders'),
-        fetch('http://localhost:5555/menu-items'),
+      // Totals come from the server's rollups rather than every order.
+      const today = new Date().toISOString().split('T')[0];
+      const [allTime, todays, outletMenuItems] = await Promise.all([
+        fetchOutletAnalytics(selectedOutlet),
+        fetchOutletAnalytics(selectedOutlet, { from: today, to: today }),
+        fetchMenuItemsByOutlet(selectedOutlet),
       ]);
       
-      const ordersData = await ordersRes.json();
-      const menuItemsData = await menuItemsRes.json();
-      
-      const outletMenuItems = menuItemsData.filter((item: any) => item.outlet_id === parseInt(selectedOutlet));
-      const outletMenuItemIds = outletMenuItems.map((item: any) => item.id);
-      
-      const filteredOrders = ordersData.filter((order: any) => {
-        return order.order_items?.some((item: any) => outletMenuItemIds.includes(item.menu_item?.id));
-      });
-      
-      setOrders(filteredOrders);
+      setTotalRevenue(allTime.revenue);
+      setOrdersToday(todays.order_count);
       setMenuItems(outletMenuItems);
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error);
@@ -177,14 +165,6 @@ export default function OwnerDashboard() {
   const selectedOutletData = outlets.find((outlet: any) => outlet.id.toString() === selectedOutlet);
   const outletQueryParam = selectedOutlet ? `?outlet=${selectedOutlet}` : '';
   
-  // Calculate metrics
-  const totalRevenue = orders.reduce((sum: number, order: any) => sum + (order.total_price || 0), 0);
-  
-  const today = new Date().toISOString().split('T')[0];
-  const ordersToday = orders.filter((order: any) => 
-    order.created_at && order.created_at.startsWith(today)
-  ).length;
-  
   const totalMenuItems = menuItems.length;
   
   const handleOutletChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
@@ -4,6 +4,8 @@ import { useState, useEffect } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import { Calendar, Users, Clock, Plus, Trash2, CheckCircle, AlertCircle } from 'lucide-react';
 import Swal from 'sweetalert2';
+import { fetchTables } from '@/lib/api';
+import { usePagedList } from '@/lib/usePagedList';
 
 
 interface Reservation {
@@ -45,7 +47,6 @@ interface FormErrors {
 
 export default function ReservationManagement() {
   const { selectedOutlet } = useAuth();
-  const [reservations, setReservations] = useState<Reservation[]>([]);
   const [tables, setTables] = useState<Table[]>([]);
   const [loading, setLoading] = useState(true);
   const [showAddForm, setShowAddForm] = useState(false);
@@ -63,24 +64,18 @@ export default function ReservationManagement() {
 
   const isOwner = typeof window !== 'undefined' && localStorage.getItem('userType') === 'owner';
 
-    useEffect(() => {
-    const fetchReservationData = async () => {
+  // Newest first, a page at a time.
+  const {
+    items: reservations, setItems: setReservations, hasMore, loading: loadingReservations, loadMore, reload,
+  } = usePagedList<Reservation>('/reservations', { sort: '-id' }, { enabled: isOwner });
+
+  useEffect(() => {
+    const fetchTableData = async () => {
       try {
         setLoading(true);
-        
-        const [reservationsRes, tablesRes] = await Promise.all([
-          fetch('http://localhost:5555/reservations'),
-          fetch('http://localhost:5555/tables')
-        ]);
-
-        const reservationsData = await reservationsRes.json();
-        const tablesData = await tablesRes.json();
-
-        setReservations(reservationsData);
-        setTables(tablesData);
+        setTables(await fetchTables());
       } catch (error) {
         console.error('Failed to fetch reservation data:', error);
-        setReservations([]);
         setTables([
           { id: 1, table_number: 1, capacity: 4, status: 'available', is_available: 'Yes' },
           { id: 2, table_number: 2, capacity: 6, status: 'available', is_available: 'Yes' },
@@ -92,7 +87,7 @@ export default function ReservationManagement() {
     };
 
     if (isOwner) {
-      fetchReservationData();
+      fetchTableData();
     }
   }, [isOwner]);
 
@@ -230,20 +225,9 @@ const handleAddReservation = async () => {
           showConfirmButton: false
         });
 
-        const [reservationsRes, tablesRes] = await Promise.all([
-          fetch('http://localhost:5555/reservations'),
-          fetch('http://localhost:5555/tables')
-        ]);
-
-        if (reservationsRes.ok && tablesRes.ok) {
-          let reservationsData = await reservationsRes.json();
-          const tablesData = await tablesRes.json();
-          if (selectedOutlet) {
-            reservationsData = reservationsData.filter((reservation: any) => reservation.table?.outlet_id === parseInt(selectedOutlet));
-          }
-          setReservations(reservationsData);
-          setTables(tablesData);
-        }
+        // Back to the first page, where the new reservation now is.
+        reload();
+        setTables(await fetchTables());
       } else {
         const errorData = await reservationResponse.json();
         Swal.fire({
@@ -293,11 +277,7 @@ const handleAddReservation = async () => {
             showConfirmButton: false
           });
 
-          const tablesRes = await fetch('http://localhost:5555/tables');
-          if (tablesRes.ok) {
-            const tablesData = await tablesRes.json();
-            setTables(tablesData);
-          }
+          setTables(await fetchTables());
         } else {
           Swal.fire('Error', 'Failed to delete reservation. Please try again.', 'error');
         }
@@ -596,6 +576,18 @@ const handleAddReservation = async () => {
             ))
           )}
         </div>
+
+        {hasMore && (
+          <div className="mt-8 text-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingReservations}
+              className="bg-orange-500 text-white px-6 py-3 rounded-lg font-medium hover:bg-orange-600 transition-colors disabled:opacity-50"
+            >
+              {loadingReservations ? 'Loading...' : 'Load More Reservations'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
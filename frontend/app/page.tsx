@@ -4,6 +4,7 @@ import Link from 'next/link';
 import { useEffect, useState } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useRouter } from 'next/navigation';
+import { fetchPage } from '@/lib/api';
 
 export default function Home() {
   const { user, isLoggedIn } = useAuth();
@@ -40,14 +41,14 @@ export default function Home() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const outletsRes = await fetch('http://localhost:5555/outlets');
-        const cuisinesRes = await fetch('http://localhost:5555/cuisines');
-
-        const outletsData = await outletsRes.json();
-        const cuisinesData = await cuisinesRes.json();
-
-        setRestaurants(outletsData);
-        setCuisines(cuisinesData);
+        // Only the four of each shown here.
+        const [outletsPage, cuisinesPage] = await Promise.all([
+          fetchPage('/outlets', {}, null, 4),
+          fetchPage('/cuisines', {}, null, 4),
+        ]);
+
+        setRestaurants(outletsPage.items);
+        setCuisines(cuisinesPage.items);
       } catch (error) {
         console.error("Failed to fetch data:", error);
       }
@@ -2,6 +2,7 @@
 
 import { useState, useEffect } from 'react';
 import Link from 'next/link';
+import { fetchOutlets, fetchPopularMenuItems } from '@/lib/api';
 
 interface MenuItem {
   id: number;
@@ -22,12 +23,14 @@ export default function PopularDishes() {
   useEffect(() => {
     const fetchMenuItems = async () => {
       try {
-        const response = await fetch('http://localhost:5555/menu-items');
-        const data = await response.json();
+        // The server ranks dishes by what was ordered; only the top few come back.
+        const [data, outlets] = await Promise.all([fetchPopularMenuItems('30d', 50), fetchOutlets()]);
+        const outletsById: Record<number, MenuItem['outlet']> = {};
+        outlets.forEach((outlet: any) => { outletsById[outlet.id] = outlet; });
         
-        const mainItems = data.filter((item: MenuItem) => 
-          item.category && item.category.toLowerCase() === 'main'
-        );
+        const mainItems = data
+          .filter((item: MenuItem) => item.category && item.category.toLowerCase() === 'main')
+          .map((item: MenuItem) => ({ ...item, outlet: outletsById[item.outlet_id] }));
         
         setMenuItems(mainItems);
         setLoading(false);
@@ -4,7 +4,7 @@ import { useEffect, useState } from 'react';
 import { useRouter, useSearchParams } from 'next/navigation';
 import Swal from 'sweetalert2';
 import { useAuth } from '@/contexts/AuthContext';
-import { fetchTables, fetchReservations, createReservation, deleteReservation } from '@/lib/api';
+import { fetchTables, fetchUserReservations, createReservation, deleteReservation } from '@/lib/api';
 
 interface Table {
   id: number;
@@ -90,12 +90,10 @@ export default function Reservations() {
       const tablesData = await fetchTables();
       setTables(tablesData);
 
-      const reservationsData = await fetchReservations();
+      // Only this user's reservations come back from the server.
+      const reservationsData = user?.id ? await fetchUserReservations(user.id) : [];
       
-      const userReservations = reservationsData.filter((res: Reservation) => {
-          if (!user?.id) return false;
-          return res.user_id === Number(user.id) && res.status !== 'cancelled';
-      });
+      const userReservations = reservationsData.filter((res: Reservation) => res.status !== 'cancelled');
       
       setReservations(userReservations);
       
@@ -179,28 +179,77 @@ export const clearCart = () => {
   }
 };
 
+// List endpoints return one page at a time as { items, next_cursor }; pass
+// next_cursor back as `after` to get the page that follows.
+const PAGE_LIMIT = 100;
+
+export interface Page<T = any> {
+  items: T[];
+  next_cursor: number | null;
+}
+
+export const fetchPage = async (
+  endpoint: string,
+  params: Record<string, string> = {},
+  after: number | null = null,
+  limit: number = PAGE_LIMIT
+): Promise<Page> => {
+  const query = new URLSearchParams({ ...params, limit: limit.toString() });
+  if (after !== null) {
+    query.set('after', after.toString());
+  }
+  return apiRequest(`${endpoint}?${query}`);
+};
+
+// Every row of a list, page by page. Only for lists that stay small: lookup
+// tables like cuisines and tables, or rows narrowed by params to one outlet,
+// owner or user. Lists that grow with use, like orders and reservations, are
+// shown a page at a time with usePagedList.
+export const fetchAllPages = async (endpoint: string, params: Record<string, string> = {}) => {
+  const items: any[] = [];
+  let after: number | null = null;
+  do {
+    const page: Page = await fetchPage(endpoint, params, after);
+    items.push(...page.items);
+    after = page.next_cursor;
+  } while (after !== null);
+  return items;
+};
+
 // Cuisines API
 export const fetchCuisines = async () => {
-  return apiRequest('/cuisines');
+  return fetchAllPages('/cuisines');
 };
 
-// Outlets API
-export const fetchOutlets = async () => {
-  return apiRequest('/outlets');
+// Outlets API, optionally only one owner's.
+export const fetchOutlets = async (ownerId?: string | number) => {
+  return fetchAllPages('/outlets', ownerId ? { owner_id: ownerId.toString() } : {});
 };
 
 export const fetchOutletById = async (id: string) => {
   return apiRequest(`/outlets/${id}`);
 };
 
-// Menu Items API
-export const fetchMenuItems = async () => {
-  return apiRequest('/menu-items');
+// Revenue and order counts for an outlet, from the server's daily rollups;
+// from and to (YYYY-MM-DD) narrow it to those days.
+export const fetchOutletAnalytics = async (outletId: string, range: { from?: string; to?: string } = {}) => {
+  const params = new URLSearchParams(range as Record<string, string>);
+  return apiRequest(`/outlets/${outletId}/analytics?${params}`);
 };
 
+// Menu Items API. Only the outlet is embedded: the default response also
+// carries the owner's orders, so any new order would evict it from the cache.
+export const MENU_ITEM_PARAMS = { include: 'outlet' };
+
 export const fetchMenuItemsByOutlet = async (outletId: string) => {
-  const allItems = await fetchMenuItems();
-  return allItems.filter((item: any) => item.outlet_id.toString() === outletId);
+  return fetchAllPages('/menu-items', { ...MENU_ITEM_PARAMS, outlet_id: outletId });
+};
+
+// The most ordered dishes over period ('24h', '7d' or '30d'), ranked by the server.
+export const fetchPopularMenuItems = async (period: string = '7d', limit: number = 10) => {
+  const params = new URLSearchParams({ window: period, limit: limit.toString() });
+  const { items } = await apiRequest(`/menu-items/popular?${params}`);
+  return items.map((entry: { menu_item: any }) => entry.menu_item);
 };
 
 // Orders API
@@ -215,10 +264,6 @@ export const createOrder = async (orderData: {
   });
 };
 
-export const fetchOrders = async () => {
-  return apiRequest('/orders');
-};
-
 // Order Items API
 export const createOrderItem = async (orderItemData: {
   order_id: number;
@@ -234,12 +279,13 @@ export const createOrderItem = async (orderItemData: {
 
 // Tables API
 export const fetchTables = async () => {
-  return apiRequest('/tables');
+  return fetchAllPages('/tables');
 };
 
-export const fetchAvailableTables = async () => {
-  const tables = await fetchTables();
-  return tables.filter((table: any) => table.is_available === 'Yes');
+// Tables that seat partySize and are free for the slot starting at date/time.
+export const fetchAvailableTables = async (date: string, time: string, partySize: number = 1) => {
+  const params = new URLSearchParams({ date, time, party_size: partySize.toString() });
+  return apiRequest(`/tables/available?${params}`);
 };
 
 // Reservations API
@@ -258,8 +304,9 @@ export const createReservation = async (reservationData: {
   });
 };
 
-export const fetchReservations = async () => {
-  return apiRequest('/reservations');
+// One user's reservations.
+export const fetchUserReservations = async (userId: string | number) => {
+  return fetchAllPages('/reservations', { user_id: userId.toString() });
 };
 
 export const deleteReservation = async (reservationId: string) => {
@@ -268,34 +315,27 @@ export const deleteReservation = async (reservationId: string) => {
   });
 };
 
-// Complete order creation with items
+// Complete order creation with items, in one request and one transaction.
+// Prices and totals are computed by the backend from the menu.
 export const createCompleteOrder = async (orderData: {
   user_id: number;
   items: Array<{
     menuitem_id: number;
     quantity: number;
-    sub_total: number;
+    sub_total?: number;
   }>;
-  total_price: number;
+  total_price?: number;
 }) => {
-  // Create the order first
-  const order = await createOrder({
-    user_id: orderData.user_id,
-    total_price: orderData.total_price,
-    status: 'pending'
-  });
-
-  // Create order items
-  const orderItems = await Promise.all(
-    orderData.items.map(item =>
-      createOrderItem({
-        order_id: order.id,
+  const { order_items: orderItems, ...order } = await apiRequest('/checkout', {
+    method: 'POST',
+    body: JSON.stringify({
+      user_id: orderData.user_id,
+      items: orderData.items.map(item => ({
         menuitem_id: item.menuitem_id,
         quantity: item.quantity,
-        sub_total: item.sub_total,
-      })
-    )
-  );
+      })),
+    }),
+  });
 
   return { order, orderItems };
 };
@@ -0,0 +1,66 @@
+'use client';
+
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { fetchPage } from '@/lib/api';
+
+// A list shown a page at a time: the first page loads on mount, and loadMore
+// appends the page after the last row shown, using the server's next_cursor.
+// The server applies params (filters and sort), so changing them starts over
+// from the first page instead of filtering rows already downloaded.
+export function usePagedList<T = any>(
+  endpoint: string,
+  params: Record<string, string> = {},
+  { limit = 20, enabled = true }: { limit?: number; enabled?: boolean } = {}
+) {
+  const [items, setItems] = useState<T[]>([]);
+  const [cursor, setCursor] = useState<number | null>(null);
+  const [loading, setLoading] = useState(enabled);
+  const [error, setError] = useState<Error | null>(null);
+  const [reloads, setReloads] = useState(0);
+  const query = JSON.stringify(params);
+  // The list the latest request belongs to; answers for an older one are dropped.
+  const current = useRef('');
+
+  useEffect(() => {
+    if (!enabled) return;
+    const list = `${endpoint}?${query}#${reloads}`;
+    current.current = list;
+    setLoading(true);
+    setError(null);
+    fetchPage(endpoint, JSON.parse(query), null, limit)
+      .then(page => {
+        if (current.current !== list) return;
+        setItems(page.items);
+        setCursor(page.next_cursor);
+      })
+      .catch(err => {
+        if (current.current !== list) return;
+        setItems([]);
+        setCursor(null);
+        setError(err);
+      })
+      .finally(() => {
+        if (current.current === list) setLoading(false);
+      });
+  }, [endpoint, query, limit, enabled, reloads]);
+
+  const loadMore = useCallback(async () => {
+    if (cursor === null || loading) return;
+    const list = current.current;
+    setLoading(true);
+    try {
+      const page = await fetchPage(endpoint, JSON.parse(query), cursor, limit);
+      if (current.current !== list) return;
+      setItems(prev => [...prev, ...page.items]);
+      setCursor(page.next_cursor);
+    } catch (err) {
+      if (current.current === list) setError(err as Error);
+    } finally {
+      if (current.current === list) setLoading(false);
+    }
+  }, [endpoint, query, limit, cursor, loading]);
+
+  const reload = useCallback(() => setReloads(n => n + 1), []);
+
+  return { items, setItems, hasMore: cursor !== null, loading, error, loadMore, reload };
+}